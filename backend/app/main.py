@@ -1,26 +1,85 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-import motor.motor_asyncio
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
+import asyncio
+import logging
 import os
+import tempfile
+
+# Load environment variables before the services read their settings
+load_dotenv()
+
 # Import router modules
 from app.routes import user, task, skill, availability
+from app.services.assignment_jobs import assignment_queue
+from app.services.cache_sync import cache_sync
+from app.services.candidate_scores import candidate_sync
+from app.services.indexes import ensure_indexes
+from app.services.inference_client import close_inference_client, score_memo_stats
+from app.services.metrics import MetricsMiddleware, registry
+from app.services.profile_loader import profile_cache
+from app.services.repository import DEFAULT_DB_NAME, close_repository, create_client, get_repository, init_repository
+from app.services.scoring import scorers
+from app.services.task_allocation import score_cache
+from app.services.task_summary import ensure_completed_counters, summary_cache
+from app.services.identity import identity_cache
+from app.services.process_lock import ProcessLock
+from app.services.workload import ensure_load_counters
+
+logger = logging.getLogger("app")
 
-# Load environment variables
-load_dotenv()
 uri = os.getenv("MONGO_URL")
 
+# Sibling workers started by app.serve (SERVE_WORKERS > 1) elect one candidate score sync per host and database
+candidate_sync_lock = ProcessLock(os.getenv(
+    "CANDIDATE_SYNC_LOCK",
+    os.path.join(tempfile.gettempdir(), f"{os.getenv('MONGO_DB_NAME', DEFAULT_DB_NAME)}.candidate-sync.lock"),
+))
+
 # Lifespan context manager for MongoDB connection
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Initialize MongoDB client
-    app.mongodb = motor.motor_asyncio.AsyncIOMotorClient(uri).task_allocation_db
-    print("MongoDB client connected")  # For debugging
+    # Startup: Initialize MongoDB client and the repository handed to routes and services
+    client = create_client(uri)
+    app.state.repository = init_repository(client[os.getenv("MONGO_DB_NAME", DEFAULT_DB_NAME)])
+    logger.info("MongoDB client connected")
+    # Create any missing indexes (a no-op once they exist); MONGO_ENSURE_INDEXES=false skips it
+    if os.getenv("MONGO_ENSURE_INDEXES", "true").lower() not in ("0", "false", "no"):
+        try:
+            indexes = await ensure_indexes(app.state.repository)
+            logger.info(f"MongoDB indexes ensured on {', '.join(indexes)}")
+        except Exception as e:
+            logger.error(f"MongoDB index creation failed: {e}")
+    # Scorer backends load lazily on first use unless warm-up is requested
+    if os.getenv("SCORER_WARMUP", "").lower() in ("1", "true", "yes"):
+        try:
+            await asyncio.to_thread(scorers.warm)
+            logger.info(f"Scorer {scorers.default} warmed up")
+        except Exception as e:
+            logger.error(f"Scorer {scorers.default} warm-up failed: {e}")
+    # Count open tasks per employee and completed tasks per supervisor on first start, before assignment and summaries rely on them
+    await ensure_load_counters(app.state.repository)
+    await ensure_completed_counters(app.state.repository)
+    # Start the background assignment workers
+    await assignment_queue.start()
+    # Every worker drops cached users, profiles and rankings that other processes have written
+    await cache_sync.start()
+    # Keep materialized candidate scores current (change streams, or polling on a standalone server)
+    if int(os.getenv("SERVE_WORKERS", "1")) <= 1 or candidate_sync_lock.acquire():
+        await candidate_sync.start()
+    else:
+        logger.info("Candidate score sync runs in another worker")
     yield
-    # Shutdown: Close MongoDB client
-    app.mongodb.client.close()
-    print("MongoDB client closed")  # For debugging
+    # Shutdown: let running jobs finish, stop the workers and inference thread pool, then close MongoDB client
+    await candidate_sync.stop()
+    await cache_sync.stop()
+    await assignment_queue.stop(drain_timeout=float(os.getenv("ASSIGNMENT_DRAIN_TIMEOUT", "10")))
+    candidate_sync_lock.release()
+    close_inference_client()
+    close_repository()
+    logger.info("MongoDB client closed")
 
 # Create FastAPI instance with lifespan
 app = FastAPI(title="Task Allocation API", lifespan=lifespan)
@@ -32,8 +91,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Pagination cursor for GET /tasks/
 )
 
+# Per-route latency, in-flight and MongoDB command metrics (SLOW_REQUEST_MS logs slow requests)
+app.add_middleware(MetricsMiddleware)
+
 # Include routers with proper prefixes
 app.include_router(user.router, prefix="/users", tags=["users"])
 app.include_router(task.router, prefix="/tasks", tags=["tasks"])
@@ -45,6 +108,33 @@ app.include_router(availability.router, prefix="/availability", tags=["availabil
 async def root():
     return {"message": "Welcome to Task Allocation API"}
 
+# Health of MongoDB and the scorer backends (probe=true scores a dummy row)
+@app.get("/health")
+async def health(probe: bool = False):
+    try:
+        await get_repository().database.command("ping")
+        mongo = {"healthy": True}
+    except Exception as e:
+        mongo = {"healthy": False, "error": str(e)}
+    scorer_health = await asyncio.to_thread(scorers.health, probe) if probe else scorers.health()
+    return {"mongo": mongo, "scorers": scorer_health, "candidate_sync": candidate_sync.stats(), "cache_sync": cache_sync.stats()}
+
+# Cache statistics for sizing
+@app.get("/cache/stats")
+async def cache_stats():
+    return {
+        "profiles": profile_cache.stats(),
+        "identities": identity_cache.stats(),
+        "scores": score_cache.stats(),
+        "task_summaries": summary_cache.stats(),
+        "score_memo": score_memo_stats(),
+    }
+
+# Prometheus scrape endpoint
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
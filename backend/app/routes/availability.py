@@ -1,7 +1,19 @@
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from ..models.availability import Availability
-from ..services.database import get_collection
-from bson import ObjectId
+from ..services.repository import Repository, get_repository
+from ..services.availability_index import (
+    availability_lease, availability_span, compact_user_availability, covering_index, from_timestamp, plan_compaction, to_timestamp,
+)
+from ..services.leases import LeaseBusy, leases
+from ..services.profile_loader import invalidate_profile, load_user_profile
+from ..services.serialization import DocumentResponse, serialize_documents
+from ..services.bulk import error_result, run_bulk, write_errors
+from ..services.identity import resolve_user, resolve_users, user_keys
+from ..services.versions import availability_resource, bump_versions, current_etag, etag_headers, not_modified
+from collections import defaultdict
+from pymongo import DeleteMany, InsertOne
+from pymongo.errors import BulkWriteError
+from datetime import datetime
 from typing import List
 import logging
 
@@ -12,71 +24,166 @@ logging.basicConfig(level=logging.INFO)
 router = APIRouter()
 
 @router.post("/", response_model=Availability)
-async def set_availability(availability: Availability, request: Request):
+async def set_availability(availability: Availability, repo: Repository = Depends(get_repository)):
     """Set a user's availability after verifying the user exists."""
-    collection = await get_collection("availability", request)
-    
-    # Check if user exists
-    users_collection = await get_collection("users", request)
-    user = None
-    
-    try:
-        # Attempt to interpret user_id as an ObjectId
-        user = await users_collection.find_one({"_id": ObjectId(availability.user_id)})
-    except ValueError:
-        # If not a valid ObjectId, assume it's a clerk_id
-        user = await users_collection.find_one({"clerk_id": availability.user_id})
-    except Exception as e:
-        logger.error(f"Error checking user existence: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error while verifying user")
+    collection = repo.availability
     
+    # Check if user exists (ObjectId string or clerk_id)
+    user = await resolve_user(availability.user_id, repo)
     if not user:
         raise HTTPException(status_code=400, detail="User not found")
     
-    # Insert the availability
-    availability_dict = availability.model_dump()
+    # Windows are stored under the user's ObjectId string; older ones may still hold the clerk_id
+    user_id, *aliases = user_keys(user)
+    
+    available_from = to_timestamp(availability.available_from)
+    available_to = to_timestamp(availability.available_to)
+    if available_from >= available_to:
+        raise HTTPException(status_code=400, detail="available_from must be before available_to")
+    
+    # Merge the new window into the user's stored windows
     try:
-        result = await collection.insert_one(availability_dict)
+        windows = await compact_user_availability(collection, user_id, (available_from, available_to), aliases)
+        invalidate_profile(user_id)
+        await bump_versions([availability_resource(user_id)])
+    except LeaseBusy:
+        raise HTTPException(status_code=409, detail="Availability is being updated by another request; retry")
     except Exception as e:
-        logger.error(f"Failed to insert availability: {e}")
+        logger.error(f"Failed to set availability: {e}")
         raise HTTPException(status_code=500, detail="Failed to set availability")
     
-    if result.inserted_id:
-        availability_dict["id"] = str(result.inserted_id)
-        return Availability(**availability_dict)
+    # Return the merged window that now contains the submitted one
+    for window in windows:
+        if to_timestamp(window["available_from"]) <= available_from and to_timestamp(window["available_to"]) >= available_to:
+            window["id"] = str(window["_id"])
+            return Availability(**window)
     
     raise HTTPException(status_code=500, detail="Failed to set availability")
 
-@router.get("/{user_id}", response_model=List[Availability])
-async def get_availability(user_id: str, request: Request):
-    """Retrieve a user's availability, supporting both ObjectId and clerk_id."""
-    collection = await get_collection("availability", request)
-    
-    # Assume user_id in availability is clerk_id by default
-    availabilities = await collection.find({"user_id": user_id}).to_list(None)
-    
-    # If no availabilities found and user_id might be an ObjectId, resolve clerk_id
-    if not availabilities and len(user_id) == 24:
+@router.post("/bulk")
+async def set_availability_bulk(request: Request, repo: Repository = Depends(get_repository)):
+    """
+    Set many availability windows from a JSON array or an NDJSON body.
+    Windows are merged per user exactly like POST /availability/, but each
+    batch costs one user lookup, one read of the affected users' windows and
+    one unordered bulk_write, made under the users' leases. Each item reports
+    the merged window containing it.
+    """
+    collection = repo.availability
+
+    async def handle_batch(batch):
+        users = await resolve_users((item.user_id for _, item in batch), repo)
+        results = {}
+        windows_by_user = defaultdict(list)
+        owner_by_key = {}
+        for index, item in batch:
+            window = (to_timestamp(item.available_from), to_timestamp(item.available_to))
+            if item.user_id not in users:
+                results[index] = error_result(index, "User not found")
+            elif window[0] >= window[1]:
+                results[index] = error_result(index, "available_from must be before available_to")
+            else:
+                keys = user_keys(users[item.user_id])
+                owner_by_key.update((key, keys[0]) for key in keys)
+                windows_by_user[keys[0]].append((index, window))
+        if not windows_by_user:
+            return [results[index] for index, _ in batch]
+
+        # The batch's users are merged under their leases, as POST /availability/ does
+        failed_users = {}
         try:
-            users_collection = await get_collection("users", request)
-            user = await users_collection.find_one({"_id": ObjectId(user_id)})
-            if user and "clerk_id" in user:
-                logger.info(f"Resolved ObjectId {user_id} to clerk_id {user['clerk_id']}")
-                availabilities = await collection.find({"user_id": user["clerk_id"]}).to_list(None)
-        except ValueError:
-            logger.debug(f"User_id {user_id} is not a valid ObjectId, skipping clerk_id lookup")
-        except Exception as e:
-            logger.error(f"Error resolving clerk_id from ObjectId {user_id}: {e}")
+            async with leases(availability_lease(user_id) for user_id in windows_by_user):
+                # Includes windows still stored under a clerk_id, which compaction re-keys
+                existing = defaultdict(list)
+                async for doc in collection.find({"user_id": {"$in": list(owner_by_key)}}):
+                    existing[owner_by_key[doc["user_id"]]].append(doc)
+
+                operations, owners, merged = [], [], {}
+                for user_id, items in windows_by_user.items():
+                    stale, missing, merged[user_id] = plan_compaction(user_id, existing[user_id], [window for _, window in items])
+                    if stale:
+                        operations.append(DeleteMany({"_id": {"$in": stale}}))
+                        owners.append(user_id)
+                    for doc in missing:
+                        operations.append(InsertOne(doc))
+                        owners.append(user_id)
+
+                if operations:
+                    try:
+                        await collection.bulk_write(operations, ordered=False)
+                    except BulkWriteError as e:
+                        for position, message in write_errors(e).items():
+                            failed_users[owners[position]] = message
+        except LeaseBusy:
+            for user_id, items in windows_by_user.items():
+                for index, _ in items:
+                    results[index] = error_result(index, "Availability is being updated by another request; retry")
+            return [results[index] for index, _ in batch]
+
+        await bump_versions(availability_resource(user_id) for user_id in windows_by_user)
+        for user_id, items in windows_by_user.items():
+            invalidate_profile(user_id)
+            for index, (start, end) in items:
+                if user_id in failed_users:
+                    results[index] = error_result(index, failed_users[user_id])
+                    continue
+                window = next(
+                    doc for doc in merged[user_id]
+                    if to_timestamp(doc["available_from"]) <= start and to_timestamp(doc["available_to"]) >= end
+                )
+                results[index] = {
+                    "index": index,
+                    "status": "merged",
+                    "id": str(window.get("_id")),
+                    "user_id": user_id,
+                    "available_from": window["available_from"],
+                    "available_to": window["available_to"],
+                }
+        return [results[index] for index, _ in batch]
+
+    return DocumentResponse(await run_bulk(request, Availability, handle_batch))
+
+@router.get("/", response_model=List[Availability])
+async def find_available(
+    repo: Repository = Depends(get_repository),
+    available_from: datetime = Query(..., alias="from"),
+    available_to: datetime = Query(..., alias="to"),
+):
+    """Return the availability windows that fully cover [from, to], one per free user."""
+    start, end = to_timestamp(available_from), to_timestamp(available_to)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="from must be before to")
+    collection = repo.availability
+    span = await availability_span(collection)
+    if span is None:
+        return DocumentResponse([])
     
-    result_availabilities = []
-    for avail in availabilities:
-        try:
-            avail["id"] = str(avail["_id"])
-            # Remove _id to avoid Pydantic validation issues if not in model
-            avail.pop("_id", None)
-            result_availabilities.append(Availability(**avail))
-        except Exception as e:
-            logger.error(f"Error parsing availability document {avail}: {e}")
-            raise HTTPException(status_code=500, detail="Error processing availability data")
+    # Stored windows are merged per user, so at most one window per user can cover the range;
+    # walk the index whose bound leaves fewer windows to check
+    windows = await collection.find({
+        "available_from": {"$lte": from_timestamp(start)},
+        "available_to": {"$gte": from_timestamp(end)},
+    }).hint(covering_index(start, end, span)).to_list(None)
+    
+    return DocumentResponse(serialize_documents(windows, Availability))
+
+@router.get("/{user_id}", response_model=List[Availability])
+async def get_availability(user_id: str, request: Request):
+    """Retrieve a user's availability, supporting both ObjectId and clerk_id. Honours If-None-Match."""
+    user = await resolve_user(user_id)
+    if not user:
+        return DocumentResponse([])
+    resource = availability_resource(str(user["_id"]))
+    etag = await current_etag(resource)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
     
-    return result_availabilities
\ No newline at end of file
+    # Availability is served from the cached profile, which matches both ObjectId and clerk_id
+    try:
+        profile = await load_user_profile(user_id, {resource: etag})
+    except Exception as e:
+        logger.error(f"Error loading availability for {user_id}: {e}")
+        raise HTTPException(status_code=500, detail="Error processing availability data")
+    availabilities = profile["availability"] if profile else []
+    return DocumentResponse(serialize_documents(availabilities, Availability), headers=etag_headers(etag))
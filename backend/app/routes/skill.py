@@ -1,32 +1,35 @@
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Depends, Request
 from ..models.skill import Skill
-from ..services.database import get_collection
-from bson import ObjectId
+from ..services.repository import Repository, get_repository
+from ..services.skill_index import skill_index
+from ..services.profile_loader import invalidate_profile, load_user_profile
+from ..services.serialization import DocumentResponse, serialize_documents
+from ..services.bulk import error_result, run_bulk, write_errors
+from ..services.identity import resolve_user, resolve_users, user_keys
+from ..services.versions import bump_versions, current_etag, etag_headers, not_modified, skills_resource
+from datetime import datetime, timezone
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from typing import List
 
 router = APIRouter()
 
 @router.post("/", response_model=Skill)
-async def add_skill(skill: Skill, request: Request):
-    collection = await get_collection("skills", request)
-    
-    # Check if user exists
-    users_collection = await get_collection("users", request)
-    user = None
-    
-    # Try to find by ObjectId
-    try:
-        user = await users_collection.find_one({"_id": ObjectId(skill.user_id)})
-    except:
-        # If not valid ObjectId, try to find by clerk_id
-        user = await users_collection.find_one({"clerk_id": skill.user_id})
+async def add_skill(skill: Skill, repo: Repository = Depends(get_repository)):
+    collection = repo.skills
     
+    # Check if user exists (ObjectId string or clerk_id)
+    user = await resolve_user(skill.user_id, repo)
     if not user:
         raise HTTPException(status_code=400, detail="User not found")
     
+    # Skills are stored under the user's ObjectId string; older ones may still hold the clerk_id
+    keys = user_keys(user)
+    skill.user_id = keys[0]
+    
     # Check if this skill already exists for this user
     existing_skill = await collection.find_one({
-        "user_id": skill.user_id,
+        "user_id": {"$in": keys},
         "skill_name": skill.skill_name
     })
     
@@ -34,44 +37,97 @@ async def add_skill(skill: Skill, request: Request):
         # Update existing skill
         result = await collection.update_one(
             {"_id": existing_skill["_id"]},
-            {"$set": {"proficiency_level": skill.proficiency_level}}
+            {"$set": {"user_id": skill.user_id, "proficiency_level": skill.proficiency_level, "updated_at": datetime.now(timezone.utc)}}
         )
         if result.modified_count > 0:
+            skill_index.remove(existing_skill["user_id"], skill.skill_name)
+            skill_index.update(skill.user_id, skill.skill_name, skill.proficiency_level)
+            invalidate_profile(skill.user_id)
+            await bump_versions([skills_resource(skill.user_id)])
             updated_skill = await collection.find_one({"_id": existing_skill["_id"]})
             updated_skill["id"] = str(updated_skill["_id"])
             return Skill(**updated_skill)
     else:
         # Insert new skill
         skill_dict = skill.dict()
+        skill_dict["updated_at"] = datetime.now(timezone.utc)  # Picked up by the candidate score poller
         result = await collection.insert_one(skill_dict)
         if result.inserted_id:
+            skill_index.update(skill.user_id, skill.skill_name, skill.proficiency_level)
+            invalidate_profile(skill.user_id)
+            await bump_versions([skills_resource(skill.user_id)])
             skill_dict["id"] = str(result.inserted_id)
             return Skill(**skill_dict)
     
     raise HTTPException(status_code=500, detail="Failed to add skill")
 
+@router.post("/bulk")
+async def add_skills_bulk(request: Request, repo: Repository = Depends(get_repository)):
+    """
+    Add or update many skills from a JSON array or an NDJSON body.
+    Users are checked with one query per batch and skills are upserted on
+    (user_id, skill_name) with one unordered bulk_write.
+    """
+    collection = repo.skills
+
+    async def handle_batch(batch):
+        users = await resolve_users((skill.user_id for _, skill in batch), repo)
+        results = {}
+        valid = []
+        for index, skill in batch:
+            if skill.user_id in users:
+                valid.append((index, skill, user_keys(users[skill.user_id])))
+            else:
+                results[index] = error_result(index, "User not found")
+
+        upserted, failures = {}, {}
+        now = datetime.now(timezone.utc)
+        if valid:
+            operations = [
+                UpdateOne(
+                    {"user_id": {"$in": keys}, "skill_name": skill.skill_name},
+                    {"$set": {"user_id": keys[0], "proficiency_level": skill.proficiency_level, "updated_at": now}},
+                    upsert=True,
+                )
+                for _, skill, keys in valid
+            ]
+            try:
+                upserted = (await collection.bulk_write(operations, ordered=False)).upserted_ids
+            except BulkWriteError as e:
+                upserted = {item["index"]: item["_id"] for item in e.details.get("upserted", [])}
+                failures = write_errors(e)
+
+        for position, (index, skill, keys) in enumerate(valid):
+            if position in failures:
+                results[index] = error_result(index, failures[position])
+                continue
+            for alias in keys[1:]:
+                skill_index.remove(alias, skill.skill_name)
+            skill_index.update(keys[0], skill.skill_name, skill.proficiency_level)
+            invalidate_profile(keys[0])
+            status = "created" if position in upserted else "updated"
+            results[index] = {"index": index, "status": status, "user_id": keys[0], "skill_name": skill.skill_name}
+        # Bump every user in the batch, since an unordered bulk_write may have applied some writes before failing
+        await bump_versions(skills_resource(keys[0]) for _, _, keys in valid)
+        return [results[index] for index, _ in batch]
+
+    return DocumentResponse(await run_bulk(request, Skill, handle_batch))
+
 @router.get("/{user_id}", response_model=List[Skill])
 async def get_skills(user_id: str, request: Request):
-    collection = await get_collection("skills", request)
-    
-    # Try to match by user_id directly first
-    skills = await collection.find({"user_id": user_id}).to_list(None)
-    
-    # If no skills found and the ID looks like it could be an ObjectId, try to match by clerk_id
-    if not skills and len(user_id) == 24:
-        try:
-            # Find the user by ObjectId to get their clerk_id
-            users_collection = await get_collection("users", request)
-            user = await users_collection.find_one({"_id": ObjectId(user_id)})
-            if user:
-                # Now look for skills with that clerk_id
-                skills = await collection.find({"user_id": user["clerk_id"]}).to_list(None)
-        except:
-            pass
+    """A user's skills, with an ETag; If-None-Match answers 304 without reading them."""
+    user = await resolve_user(user_id)
+    if not user:
+        return []
+    resource = skills_resource(str(user["_id"]))
+    etag = await current_etag(resource)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
     
-    result_skills = []
-    for skill in skills:
-        skill["id"] = str(skill["_id"])
-        result_skills.append(Skill(**skill))
+    # Skills are served from the cached profile, which matches both ObjectId and clerk_id
+    profile = await load_user_profile(user_id, {resource: etag})
+    if not profile:
+        return []
     
-    return result_skills
+    return DocumentResponse(serialize_documents(profile["skills"], Skill), headers=etag_headers(etag))
@@ -1,66 +1,164 @@
-from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from ..models.task import Task
-from ..services.database import get_collection
+from ..services.repository import Repository, get_repository
+from ..services.serialization import DocumentResponse, dumps, serialize_document, serialize_documents
+from ..services.assignment_jobs import assignment_queue
+from ..services.batch_allocation import assign_pending_tasks, DEFAULT_CAPACITY
+from ..services.task_allocation import rank_candidates, score_cache
+from ..services.task_summary import move_completed, summarize_tasks
+from ..services.identity import resolve_user
+from ..services.workload import move_load
+from ..services.versions import (
+    assignee_tasks_resource, bump_versions, current_etag, etag_headers, not_modified, supervisor_tasks_resource, task_resources,
+)
 from bson import ObjectId
-from typing import List
-import json
+from pymongo import ReturnDocument
+from datetime import datetime, timezone
+from typing import List, Optional
 
 router = APIRouter()
 
 # Updated dependency to enforce supervisor-only access
-async def check_supervisor(user_id: str, request: Request):
-    collection = await get_collection("users", request)
-    # Try lookup by ObjectId
-    try:
-        user = await collection.find_one({"_id": ObjectId(user_id)})
-    except:
-        # If not valid ObjectId, try by clerk_id
-        user = await collection.find_one({"clerk_id": user_id})
-    
+async def check_supervisor(user_id: str, repo: Repository = Depends(get_repository)):
+    user = await resolve_user(user_id, repo)
     if not user or user.get("role") != "supervisor":
         raise HTTPException(status_code=403, detail="Only supervisors can create tasks")
     return user
 
 @router.post("/", response_model=Task)
-async def create_task(task: Task, request: Request):
+async def create_task(task: Task, repo: Repository = Depends(get_repository)):
     # Check if supervisor exists
-    users_collection = await get_collection("users", request)
-    supervisor = await users_collection.find_one({"clerk_id": task.supervisor_id})
+    supervisor = await resolve_user(task.supervisor_id, repo)
     if not supervisor or supervisor.get("role") != "supervisor":
         raise HTTPException(status_code=400, detail="Invalid supervisor")
     
-    collection = await get_collection("tasks", request)
+    collection = repo.tasks
     task_dict = task.dict()
+    task_dict["updated_at"] = datetime.now(timezone.utc)  # Picked up by the candidate score poller
     result = await collection.insert_one(task_dict)
     
     if result.inserted_id:
-        task_dict["id"] = str(result.inserted_id)
-        return Task(**task_dict)
+        await move_completed(None, task_dict, repo)
+        await bump_versions(task_resources(task_dict))
+        await move_load(None, task_dict, repo)
+        # Assignment runs in the background; poll GET /tasks/{id}/assignment for the outcome
+        await assignment_queue.enqueue(str(result.inserted_id))
+        # The Task fields plus the new id, which clients need for the assignment status
+        return DocumentResponse({"id": str(result.inserted_id), **serialize_document(task_dict, Task)})
     raise HTTPException(status_code=500, detail="Failed to create task")
 
+MAX_PAGE_SIZE = 1000
+
+async def _stream_tasks(cursor, model=None):
+    """Write tasks as NDJSON as the cursor yields them, shaped like the non-streamed list."""
+    async for task in cursor:
+        yield dumps(serialize_document(task, model)) + b"\n"
+
 @router.get("/", response_model=List[Task])
-async def get_tasks(user_id: str, role: str, request: Request):
-    collection = await get_collection("tasks", request)
+async def get_tasks(
+    request: Request,
+    user_id: str,
+    role: str,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    fields: Optional[str] = None,
+    stream: bool = False,
+    repo: Repository = Depends(get_repository),
+):
+    """
+    List a supervisor's or employee's tasks in _id order.
+    Pass limit (and the X-Next-Cursor header of the previous page as after)
+    for keyset pagination, fields for a comma-separated projection, and
+    stream=true for an NDJSON stream.
+    Responses carry an ETag; If-None-Match answers 304 without running the query.
+    """
+    collection = repo.tasks
     
     if role == "supervisor":
-        tasks = await collection.find({"supervisor_id": user_id}).to_list(None)
+        query = {"supervisor_id": user_id}
+        resource = supervisor_tasks_resource(user_id)
     elif role == "employee":
-        tasks = await collection.find({"assigned_to": user_id}).to_list(None)
+        query = {"assigned_to": user_id}
+        resource = assignee_tasks_resource(user_id)
     else:
         raise HTTPException(status_code=400, detail="Invalid role")
     
-    result_tasks = []
-    for task in tasks:
-        task["id"] = str(task["_id"])
-        # Convert ObjectId to string for JSON serialization
-        task_dict = json.loads(json.dumps(task, default=str))
-        result_tasks.append(Task(**task_dict))
+    # Each page, projection and format of the list is its own representation
+    etag = await current_etag(resource, variant=request.url.query)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    
+    if after:
+        if not ObjectId.is_valid(after):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query["_id"] = {"$gt": ObjectId(after)}
+    
+    projection = None
+    if fields:
+        projection = {field: 1 for field in fields.split(",") if field}
+    
+    cursor = collection.find(query, projection).sort("_id", 1)
+    if limit:
+        cursor = cursor.limit(limit)
+    
+    if stream:
+        # Projected documents do not satisfy the Task model, so they stream as-is
+        return StreamingResponse(_stream_tasks(cursor, None if projection else Task), media_type="application/x-ndjson", headers=etag_headers(etag))
     
-    return result_tasks
+    tasks = await cursor.to_list(None)
+    headers = etag_headers(etag)
+    if limit and len(tasks) == limit:
+        headers["X-Next-Cursor"] = str(tasks[-1]["_id"])
+    
+    # Projected documents do not satisfy the Task model, so return them as-is
+    if projection:
+        return DocumentResponse(serialize_documents(tasks), headers=headers)
+    return DocumentResponse(serialize_documents(tasks, Task), headers=headers)
+
+# Declared before the /{task_id} routes so "summary" is never read as a task id
+@router.get("/summary")
+async def get_task_summary(supervisor_id: str):
+    """Counts by status, overdue open tasks and per-assignee load for a supervisor's tasks."""
+    return DocumentResponse(await summarize_tasks(supervisor_id))
+
+@router.post("/assign-batch")
+async def assign_batch(supervisor_id: Optional[str] = None, capacity: int = DEFAULT_CAPACITY):
+    """Assign every pending task (optionally for one supervisor) with a global matching."""
+    if capacity < 1:
+        raise HTTPException(status_code=400, detail="Capacity must be at least 1")
+    try:
+        return await assign_pending_tasks(supervisor_id, capacity)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/{task_id}/assignment")
+async def get_assignment_status(task_id: str):
+    """
+    Report the status of the background assignment job for a task: queued,
+    running, succeeded, failed, or waiting while every candidate is at capacity.
+    """
+    job = await assignment_queue.get_status(task_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="No assignment job for this task")
+    return DocumentResponse({"task_id": job.pop("_id"), **job})
+
+MAX_CANDIDATES = 100
+
+@router.get("/{task_id}/candidates")
+async def get_candidates(task_id: str, k: int = Query(10, ge=1, le=MAX_CANDIDATES)):
+    """Top-k employees for a task with scores and feature breakdowns, from the stored candidate_scores where present."""
+    if not ObjectId.is_valid(task_id):
+        raise HTTPException(status_code=400, detail="Invalid task id")
+    try:
+        return DocumentResponse(await rank_candidates(task_id, k))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
 @router.patch("/{task_id}", response_model=Task)
-async def update_task(task_id: str, task_update: dict, request: Request):
-    collection = await get_collection("tasks", request)
+async def update_task(task_id: str, task_update: dict, repo: Repository = Depends(get_repository)):
+    collection = repo.tasks
     
     # Handle date fields properly if they exist in the update
     for date_field in ["due_date", "start_date"]:
@@ -68,15 +166,23 @@ async def update_task(task_id: str, task_update: dict, request: Request):
             # The model will handle the conversion when we return the Task
             pass
     
-    updated_task = await collection.find_one_and_update(
-        {"_id": ObjectId(task_id)}, {"$set": task_update}, return_document=True
+    # Read the task as it was in the same write, so the lists it leaves and the load
+    # counters are adjusted from exactly the state this update replaced
+    task_update = {**task_update, "updated_at": datetime.now(timezone.utc)}
+    previous = await collection.find_one_and_update(
+        {"_id": ObjectId(task_id)}, {"$set": task_update}, return_document=ReturnDocument.BEFORE
     )
     
-    if updated_task:
-        updated_task["id"] = str(updated_task["_id"])
-        # Convert ObjectId to string for JSON serialization
-        updated_task_dict = json.loads(json.dumps(updated_task, default=str))
-        return Task(**updated_task_dict)
+    if previous:
+        updated_task = {**previous, **task_update}
+        await move_completed(previous, updated_task, repo)
+        await bump_versions(task_resources(previous, updated_task))
+        if await move_load(previous, updated_task, repo):
+            # Completing or reassigning the task freed a slot for tasks waiting on capacity
+            await assignment_queue.wake_waiting()
+        # Dates or required skills may have changed, so drop any cached ranking
+        score_cache.pop(task_id)
+        return DocumentResponse(serialize_document(updated_task, Task))
     
     raise HTTPException(status_code=404, detail="Task not found")
 
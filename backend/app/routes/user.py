@@ -1,13 +1,19 @@
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, HTTPException, Depends, Request
 from ..models.user import User
-from ..services.database import get_collection
-from bson import ObjectId
+from ..services.repository import Repository, get_repository
+from ..services.profile_loader import invalidate_profile
+from ..services.serialization import DocumentResponse, serialize_document
+from ..services.bulk import error_result, run_bulk, write_errors
+from ..services.identity import invalidate_user, remember_user, user_query
+from datetime import datetime, timezone
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 
 router = APIRouter()
 
 @router.post("/", response_model=User)
-async def create_user(user: User, request: Request):
-    collection = await get_collection("users", request)
+async def create_user(user: User, repo: Repository = Depends(get_repository)):
+    collection = repo.users
     
     # Check if user with this clerk_id already exists
     existing_user = await collection.find_one({"clerk_id": user.clerk_id})
@@ -16,49 +22,81 @@ async def create_user(user: User, request: Request):
     
     # Insert the new user
     user_dict = user.dict()
+    user_dict["updated_at"] = datetime.now(timezone.utc)  # Picked up by the candidate score poller
     result = await collection.insert_one(user_dict)
     
     if result.inserted_id:
+        remember_user({**user_dict, "_id": result.inserted_id})
         # Return the user with the id field set
         user_dict["id"] = str(result.inserted_id)
         return User(**user_dict)
     
     raise HTTPException(status_code=500, detail="Failed to create user")
 
+@router.post("/bulk")
+async def create_users_bulk(request: Request, repo: Repository = Depends(get_repository)):
+    """
+    Create many users from a JSON array or an NDJSON body. Users whose
+    clerk_id already exists are reported as errors, as with POST /users/.
+    """
+    collection = repo.users
+
+    async def handle_batch(batch):
+        # $setOnInsert makes the upsert create-only, so existing users are untouched
+        now = datetime.now(timezone.utc)
+        operations = [
+            UpdateOne({"clerk_id": user.clerk_id}, {"$setOnInsert": {**user.dict(), "updated_at": now}}, upsert=True)
+            for _, user in batch
+        ]
+        try:
+            result = await collection.bulk_write(operations, ordered=False)
+            upserted, failures = result.upserted_ids, {}
+        except BulkWriteError as e:
+            upserted = {item["index"]: item["_id"] for item in e.details.get("upserted", [])}
+            failures = write_errors(e)
+
+        results = []
+        for position, (index, user) in enumerate(batch):
+            if position in upserted:
+                remember_user({**user.dict(), "_id": upserted[position]})
+                results.append({"index": index, "status": "created", "id": str(upserted[position]), "clerk_id": user.clerk_id})
+            elif position in failures:
+                results.append(error_result(index, failures[position]))
+            else:
+                results.append(error_result(index, "User with this clerk_id already exists"))
+        return results
+
+    return DocumentResponse(await run_bulk(request, User, handle_batch))
+
 @router.get("/{user_id}", response_model=User)
-async def get_user(user_id: str, request: Request):
-    collection = await get_collection("users", request)
+async def get_user(user_id: str, repo: Repository = Depends(get_repository)):
+    collection = repo.users
     
-    # Try to find by ObjectId first
-    try:
-        user = await collection.find_one({"_id": ObjectId(user_id)})
-    except:
-        # If not a valid ObjectId, try to find by clerk_id
-        user = await collection.find_one({"clerk_id": user_id})
+    # ObjectId string or clerk_id, in one query
+    user = await collection.find_one(user_query(user_id))
     
     if user:
-        user["id"] = str(user["_id"])
-        return User(**user)
+        remember_user(user)
+        return DocumentResponse(serialize_document(user, User))
     
     raise HTTPException(status_code=404, detail="User not found")
 
 @router.patch("/{user_id}", response_model=User)
-async def update_user(user_id: str, user_update: dict, request: Request):
-    collection = await get_collection("users", request)
+async def update_user(user_id: str, user_update: dict, repo: Repository = Depends(get_repository)):
+    collection = repo.users
+    user_update = {**user_update, "updated_at": datetime.now(timezone.utc)}
     
-    try:
-        # Try as ObjectId first
-        object_id = ObjectId(user_id)
-        updated_user = await collection.find_one_and_update(
-            {"_id": object_id}, {"$set": user_update}, return_document=True
-        )
-    except:
-        # If not a valid ObjectId, try to find by clerk_id
-        updated_user = await collection.find_one_and_update(
-            {"clerk_id": user_id}, {"$set": user_update}, return_document=True
-        )
+    # The role or clerk_id may change, so forget the cached identity first
+    invalidate_user(user_id)
+    updated_user = await collection.find_one_and_update(
+        user_query(user_id), {"$set": user_update}, return_document=True
+    )
     
     if updated_user:
+        invalidate_user(str(updated_user["_id"]))
+        remember_user(updated_user)
+        invalidate_profile(user_id)
+        invalidate_profile(str(updated_user["_id"]))
         updated_user["id"] = str(updated_user["_id"])
         return User(**updated_user)
     
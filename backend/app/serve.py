@@ -0,0 +1,158 @@
+# backend/app/serve.py
+"""
+Production entry point: several uvicorn worker processes behind one socket.
+
+    cd backend
+    python -m app.serve                          # one worker per available core
+    python -m app.serve --workers 4 --port 8000
+
+Settings come from flags or the environment (flags win):
+
+    WEB_CONCURRENCY            worker processes (default: cores available to this process)
+    HOST / PORT                bind address (default 0.0.0.0:8000)
+    MONGO_TOTAL_POOL_SIZE      MongoDB connections for the whole server, split evenly
+                               into each worker's MONGO_MAX_POOL_SIZE unless that is set
+    GRACEFUL_SHUTDOWN_TIMEOUT  seconds in-flight requests get after SIGTERM (default 30)
+    KEEPALIVE_TIMEOUT          idle keep-alive seconds (default 5; raise behind a load balancer)
+    LOG_LEVEL                  default info
+    ACCESS_LOG                 per-request log lines (default off; /metrics covers traffic)
+
+The other MONGO_* pool and timeout settings (see repository.get_pool_settings)
+apply per worker as they are. uvloop and httptools are used when installed.
+
+On SIGTERM or Ctrl+C the server stops accepting, waits for in-flight
+requests, then runs each worker's lifespan shutdown. That shutdown gives
+running assignment jobs ASSIGNMENT_DRAIN_TIMEOUT seconds, stops the candidate
+score sync and closes the MongoDB client. Only one worker per host runs the
+candidate score sync (see main.lifespan). On a multi-host deployment, set
+CANDIDATE_SYNC=off on all but one host. Every worker runs the cache sync
+(cache_sync.py), which drops cached users, profiles and rankings when
+another worker or host writes them.
+
+Load test: benchmarks/bench_workers.py starts this server at several worker
+counts, against in-memory data or a scratch database, and reports requests
+per second for each.
+"""
+import argparse
+import copy
+import importlib.util
+import logging
+import logging.config
+import os
+import socket
+from typing import Optional
+import uvicorn
+from uvicorn.config import LOGGING_CONFIG
+from uvicorn.protocols.http.h11_impl import H11Protocol
+
+try:
+    from uvicorn.protocols.http.httptools_impl import HttpToolsProtocol
+except ImportError:
+    HttpToolsProtocol = None
+
+logger = logging.getLogger("app.serve")
+
+LOG_FORMAT = "%(asctime)s [%(process)d] %(levelprefix)s %(name)s: %(message)s"
+
+def available_cores() -> int:
+    """Cores this process may run on (respects taskset/cgroup affinity where the OS reports it)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def event_loop() -> str:
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+def set_nodelay(transport):
+    """
+    With workers > 1 uvicorn binds the shared socket itself with proto 0, so
+    asyncio skips TCP_NODELAY on accepted connections and every keep-alive
+    response waits ~40 ms on the client's delayed ACK.
+    """
+    sock = transport.get_extra_info("socket")
+    if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+class H11NoDelayProtocol(H11Protocol):
+    def connection_made(self, transport):
+        set_nodelay(transport)
+        super().connection_made(transport)
+
+if HttpToolsProtocol is not None:
+    class HttpToolsNoDelayProtocol(HttpToolsProtocol):
+        def connection_made(self, transport):
+            set_nodelay(transport)
+            super().connection_made(transport)
+
+def http_protocol():
+    return H11NoDelayProtocol if HttpToolsProtocol is None else HttpToolsNoDelayProtocol
+
+def configure_pools(workers: int):
+    """
+    Size each worker's MongoDB pool from MONGO_TOTAL_POOL_SIZE. Workers
+    inherit the environment, and create_client reads MONGO_MAX_POOL_SIZE.
+    """
+    total = os.getenv("MONGO_TOTAL_POOL_SIZE")
+    if total and not os.getenv("MONGO_MAX_POOL_SIZE"):
+        os.environ["MONGO_MAX_POOL_SIZE"] = str(max(1, int(total) // workers))
+
+def log_config(level: str) -> dict:
+    """uvicorn's logging config with the worker pid on every line, also applied to the app's loggers."""
+    config = copy.deepcopy(LOGGING_CONFIG)
+    config["formatters"]["default"]["fmt"] = LOG_FORMAT
+    config["formatters"]["access"]["fmt"] = "%(asctime)s [%(process)d] %(levelprefix)s %(client_addr)s - \"%(request_line)s\" %(status_code)s"
+    config["root"] = {"handlers": ["default"], "level": level.upper()}
+    return config
+
+def run(
+    app: str = "app.main:app",
+    host: str = "0.0.0.0",
+    port: int = 8000,
+    workers: Optional[int] = None,
+    graceful_timeout: int = 30,
+    keepalive_timeout: int = 5,
+    log_level: str = "info",
+    access_log: bool = False,
+):
+    workers = workers or available_cores()
+    configure_pools(workers)
+    # Tells the lifespan hook it shares the host with sibling workers
+    os.environ["SERVE_WORKERS"] = str(workers)
+    loop, http = event_loop(), http_protocol()
+    config = log_config(log_level)
+    logging.config.dictConfig(config)
+    logger.info(
+        f"Starting {workers} worker(s) on {host}:{port} (loop={loop}, http={http.__name__}, "
+        f"mongo pool={os.getenv('MONGO_MAX_POOL_SIZE', 'default')} per worker)"
+    )
+    uvicorn.run(
+        app,
+        host=host,
+        port=port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        lifespan="on",
+        timeout_graceful_shutdown=graceful_timeout,
+        timeout_keep_alive=keepalive_timeout,
+        log_config=config,
+        log_level=log_level,
+        access_log=access_log,
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the API with multiple worker processes.")
+    parser.add_argument("--app", default="app.main:app", help="ASGI app import string (the load test swaps in benchmarks.memory_app:app)")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "0")) or None,
+                        help="Worker processes (default: available cores)")
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", "30")))
+    parser.add_argument("--keepalive-timeout", type=int, default=int(os.getenv("KEEPALIVE_TIMEOUT", "5")))
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    parser.add_argument("--access-log", action="store_true", default=os.getenv("ACCESS_LOG", "").lower() in ("1", "true", "yes"))
+    args = parser.parse_args()
+    run(args.app, args.host, args.port, args.workers, args.graceful_timeout, args.keepalive_timeout, args.log_level, args.access_log)
+
+if __name__ == "__main__":
+    main()
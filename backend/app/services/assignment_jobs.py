@@ -0,0 +1,239 @@
+# backend/app/services/assignment_jobs.py
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from pymongo import ReturnDocument
+from pymongo.collection import Collection
+from ..services.repository import get_repository
+from ..services.task_allocation import assign_task
+from ..services.workload import NoFreeCapacity
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+# Every candidate was at capacity; the job is queued again when a slot frees up
+WAITING = "waiting"
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+class AssignmentQueue:
+    """
+    Background queue of assignment jobs drained by a fixed pool of async workers.
+    Job state lives in the assignment_jobs collection keyed on the task id, so
+    enqueueing the same task twice is a no-op and unfinished jobs are picked up
+    again after a restart. Failed attempts are retried with exponential backoff
+    up to max_attempts; ValueError from assign_task (task or employees missing)
+    is treated as permanent.
+    When every candidate is at EMPLOYEE_CAPACITY the job is WAITING rather
+    than failed. wake_waiting() queues the wake_batch longest-waiting jobs
+    again; the task routes call it when a task is completed or reassigned
+    away from someone, and each process calls it every waiting_retry seconds
+    to catch slots freed in other ways (new employees, skills, a recount).
+    Several processes may share the collection: a job another process is
+    running is only taken over once it has been running for stale_after seconds.
+    Every waiting_retry seconds each process also takes over such jobs, and
+    jobs queued that long without being picked up (they were only in the
+    memory of a process that died), so a worker that crashes and restarts
+    right away does not leave its jobs stuck.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        max_attempts: int = 3,
+        retry_delay: float = 1.0,
+        stale_after: float = 300.0,
+        waiting_retry: float = 60.0,
+        wake_batch: int = 32,
+    ):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.stale_after = stale_after
+        self.waiting_retry = waiting_retry
+        self.wake_batch = wake_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._retries = set()
+        self._in_flight = 0
+        self._draining = False
+
+    @property
+    def collection(self) -> Collection:
+        return get_repository().assignment_jobs
+
+    async def start(self):
+        """Start the workers and re-queue jobs left unfinished by a previous run."""
+        self._queue = asyncio.Queue()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._workers.append(asyncio.create_task(self._wake_loop()))
+        await self.requeue_stale(all_queued=True)
+
+    async def requeue_stale(self, all_queued: bool = False) -> int:
+        """
+        Queue the jobs no live process is working on: running jobs that have
+        not moved for stale_after seconds, and queued jobs that have waited
+        that long (or every queued job, on start). Returns how many were queued.
+        Queueing a job another process also holds is harmless, since only one
+        of them can move it from queued to running.
+        """
+        if self._queue is None:
+            return 0
+        stale = _now() - timedelta(seconds=self.stale_after)
+        requeued = 0
+        async for job in self.collection.find({"status": RUNNING, "updated_at": {"$lt": stale}}, {"updated_at": 1}):
+            # Matching updated_at keeps this from taking over a job its owner touched meanwhile
+            result = await self.collection.update_one(
+                {"_id": job["_id"], "status": RUNNING, "updated_at": job["updated_at"]},
+                {"$set": {"status": QUEUED, "updated_at": _now()}},
+            )
+            if result.modified_count:
+                self._queue.put_nowait(job["_id"])
+                requeued += 1
+        queued = {"status": QUEUED} if all_queued else {"status": QUEUED, "updated_at": {"$lt": stale}}
+        async for job in self.collection.find(queued, {"_id": 1}):
+            self._queue.put_nowait(job["_id"])
+            requeued += 1
+        return requeued
+
+    async def stop(self, drain_timeout: float = 0.0):
+        """Stop the workers, first giving jobs already running up to drain_timeout seconds to finish."""
+        self._draining = True
+        deadline = asyncio.get_running_loop().time() + drain_timeout
+        while self._in_flight and asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(0.05)
+        if self._in_flight:
+            logger.warning(f"Stopping with {self._in_flight} assignment job(s) still running; they are retried after stale_after")
+        for task in self._workers + list(self._retries):
+            task.cancel()
+        await asyncio.gather(*self._workers, *self._retries, return_exceptions=True)
+        self._workers = []
+        self._retries = set()
+        self._queue = None
+        self._draining = False
+
+    async def enqueue(self, task_id: str) -> dict:
+        """Record a job for task_id (once, unless it failed) and hand it to the workers."""
+        now = _now()
+        job = await self.collection.find_one_and_update(
+            {"_id": task_id},
+            {"$setOnInsert": {"status": QUEUED, "attempts": 0, "created_at": now, "updated_at": now}},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE,
+        )
+        if job is not None and job["status"] not in (FAILED, WAITING):
+            # Already queued, running or done; the existing job owns this task
+            return job
+        if job is not None:
+            # A failed or waiting job is started over
+            await self.collection.update_one(
+                {"_id": task_id, "status": job["status"]},
+                {"$set": {"status": QUEUED, "attempts": 0, "error": None, "updated_at": now}},
+            )
+        if self._queue is not None:
+            self._queue.put_nowait(task_id)
+        return await self.collection.find_one({"_id": task_id})
+
+    async def get_status(self, task_id: str) -> Optional[dict]:
+        return await self.collection.find_one({"_id": task_id})
+
+    async def wake_waiting(self, limit: Optional[int] = None) -> int:
+        """Queue jobs waiting for capacity again, longest-waiting first. Returns how many were queued."""
+        if self._queue is None:
+            return 0
+        waiting = self.collection.find({"status": WAITING}, {"_id": 1}).sort("updated_at", 1).limit(limit or self.wake_batch)
+        woken = 0
+        async for job in waiting:
+            # Another process may have woken it already; attempts restart since waiting is not a failure
+            result = await self.collection.update_one(
+                {"_id": job["_id"], "status": WAITING},
+                {"$set": {"status": QUEUED, "attempts": 0, "updated_at": _now()}},
+            )
+            if result.modified_count:
+                self._queue.put_nowait(job["_id"])
+                woken += 1
+        return woken
+
+    async def _wake_loop(self):
+        while True:
+            await asyncio.sleep(self.waiting_retry)
+            try:
+                await self.wake_waiting()
+                requeued = await self.requeue_stale()
+                if requeued:
+                    logger.info(f"Took over {requeued} stale assignment job(s)")
+            except Exception as e:
+                logger.warning(f"Assignment job maintenance failed: {e}")
+
+    async def _worker(self):
+        while True:
+            task_id = await self._queue.get()
+            if self._draining:
+                # Shutting down: leave the job queued for the next start
+                self._queue.task_done()
+                continue
+            self._in_flight += 1
+            try:
+                await self._run(task_id)
+            except Exception as e:
+                logger.error(f"Assignment job {task_id} crashed: {e}")
+            finally:
+                self._in_flight -= 1
+                self._queue.task_done()
+
+    async def _run(self, task_id: str):
+        # Claim the job so a duplicate queue entry cannot run it twice
+        job = await self.collection.find_one_and_update(
+            {"_id": task_id, "status": QUEUED},
+            {"$set": {"status": RUNNING, "updated_at": _now()}, "$inc": {"attempts": 1}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if job is None:
+            return
+        try:
+            employee_id = await assign_task(task_id)
+        except NoFreeCapacity as e:
+            await self._finish(task_id, WAITING, error=str(e))
+        except ValueError as e:
+            await self._finish(task_id, FAILED, error=str(e))
+        except Exception as e:
+            if job["attempts"] >= self.max_attempts:
+                await self._finish(task_id, FAILED, error=str(e))
+            else:
+                logger.warning(f"Assignment job {task_id} attempt {job['attempts']} failed: {e}")
+                await self._finish(task_id, QUEUED, error=str(e))
+                self._schedule_retry(task_id, self.retry_delay * 2 ** (job["attempts"] - 1))
+        else:
+            await self._finish(task_id, SUCCEEDED, assigned_to=employee_id)
+
+    async def _finish(self, task_id: str, status: str, **fields):
+        fields.setdefault("error", None)
+        await self.collection.update_one(
+            {"_id": task_id},
+            {"$set": {"status": status, "updated_at": _now(), **fields}},
+        )
+
+    def _schedule_retry(self, task_id: str, delay: float):
+        async def retry():
+            await asyncio.sleep(delay)
+            if self._queue is not None:
+                self._queue.put_nowait(task_id)
+
+        task = asyncio.create_task(retry())
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+assignment_queue = AssignmentQueue(
+    workers=int(os.getenv("ASSIGNMENT_WORKERS", "4")),
+    max_attempts=int(os.getenv("ASSIGNMENT_MAX_ATTEMPTS", "3")),
+    retry_delay=float(os.getenv("ASSIGNMENT_RETRY_DELAY", "1")),
+    stale_after=float(os.getenv("ASSIGNMENT_STALE_AFTER", "300")),
+    waiting_retry=float(os.getenv("ASSIGNMENT_WAITING_RETRY", "60")),
+    wake_batch=int(os.getenv("ASSIGNMENT_WAKE_BATCH", "32")),
+)
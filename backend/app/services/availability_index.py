@@ -0,0 +1,151 @@
+# backend/app/services/availability_index.py
+import os
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Tuple
+from pymongo.collection import Collection
+from ..services.cache import LRUCache
+from ..services.leases import leases
+
+# A "windows covering [start, end]" query walks one of two indexes: the windows
+# starting before start, or the windows ending after end. Which set is smaller
+# depends on where the range falls among all stored windows, so the lookup
+# hints whichever index the stored span says is more selective.
+COVERING_FROM_INDEX = "available_from_available_to"
+COVERING_TO_INDEX = "available_to_available_from"
+
+# Earliest start and latest end of the stored windows; only steers the index choice, so it may lag
+availability_span_cache = LRUCache(maxsize=1, ttl=float(os.getenv("AVAILABILITY_SPAN_TTL", "300")))
+
+def to_timestamp(value) -> float:
+    """Convert an ISO string or datetime to epoch seconds (naive values are treated as UTC)."""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def from_timestamp(value: float) -> datetime:
+    """Convert epoch seconds back to the naive UTC datetime MongoDB returns."""
+    return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+
+def merge_intervals(intervals: Iterable[Tuple[float, float]]) -> List[Tuple[float, float]]:
+    """Sort intervals and merge any that overlap or touch."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+class AvailabilityIntervals:
+    """A user's availability as sorted, merged epoch intervals with binary-search queries."""
+
+    def __init__(self, intervals: Iterable[Tuple[float, float]] = ()):
+        merged = merge_intervals(intervals)
+        # Merged intervals are disjoint, so both starts and ends are sorted
+        self.starts = [start for start, _ in merged]
+        self.ends = [end for _, end in merged]
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[dict]) -> "AvailabilityIntervals":
+        return cls(
+            (to_timestamp(doc["available_from"]), to_timestamp(doc["available_to"]))
+            for doc in documents
+        )
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        return iter(zip(self.starts, self.ends))
+
+    def covers(self, start: float, end: float) -> bool:
+        """True if a single window contains [start, end]."""
+        i = bisect_right(self.starts, start) - 1
+        return i >= 0 and self.ends[i] >= end
+
+    def best_overlap(self, start: float, end: float) -> float:
+        """Longest overlap, in seconds, between [start, end] and any one window."""
+        # Windows overlapping the range are those ending after start and starting before end
+        lo = bisect_right(self.ends, start)
+        hi = bisect_left(self.starts, end)
+        best = 0.0
+        for i in range(lo, hi):
+            best = max(best, min(end, self.ends[i]) - max(start, self.starts[i]))
+        return best
+
+def plan_compaction(user_id: str, existing: List[dict], new_windows: Iterable[Tuple[float, float]] = ()) -> Tuple[list, List[dict], List[dict]]:
+    """
+    Work out how to merge a user's stored window documents (plus new_windows)
+    into sorted, disjoint windows. Documents that already match a merged
+    window are kept as they are; ones stored under another key for the same
+    user (a clerk_id) are replaced by documents keyed by user_id.
+    Returns (ids of stale documents to delete, documents to insert, the
+    user's windows after compaction in start order).
+    """
+    intervals = [(to_timestamp(doc["available_from"]), to_timestamp(doc["available_to"])) for doc in existing]
+    merged = merge_intervals(intervals + list(new_windows))
+
+    keep = {}
+    stale = []
+    merged_set = set(merged)
+    for doc, interval in zip(existing, intervals):
+        if interval in merged_set and interval not in keep and doc["user_id"] == user_id:
+            keep[interval] = doc
+        else:
+            stale.append(doc["_id"])
+
+    now = datetime.now(timezone.utc)
+    missing = {
+        interval: {"user_id": user_id, "available_from": from_timestamp(interval[0]), "available_to": from_timestamp(interval[1]), "updated_at": now}
+        for interval in merged if interval not in keep
+    }
+    keep.update(missing)
+    return stale, list(missing.values()), [keep[interval] for interval in merged]
+
+def availability_lease(user_id: str) -> str:
+    return f"availability:{user_id}"
+
+async def compact_user_availability(collection: Collection, user_id: str, new_window: Tuple[float, float] = None, aliases: Iterable[str] = ()) -> List[dict]:
+    """
+    Merge a user's stored availability windows (plus new_window) so the
+    collection holds only sorted, disjoint windows for that user.
+    Windows still stored under one of aliases are folded in under user_id.
+    The read, delete and insert run under the user's lease, so concurrent
+    writers cannot each merge the same windows and leave overlapping ones.
+    Returns the user's windows after compaction; raises LeaseBusy if the
+    lease stays taken.
+    """
+    async with leases([availability_lease(user_id)]):
+        existing = await collection.find({"user_id": {"$in": [user_id, *aliases]}}).to_list(None)
+        stale, missing, windows = plan_compaction(user_id, existing, [new_window] if new_window is not None else [])
+        if stale:
+            await collection.delete_many({"_id": {"$in": stale}})
+        if missing:
+            # insert_many sets _id on the documents, which windows shares
+            await collection.insert_many(missing)
+    return windows
+
+async def availability_span(collection: Collection) -> Optional[Tuple[float, float]]:
+    """Epoch bounds of all stored windows, or None when there are none. Two index-only lookups, cached."""
+    span = availability_span_cache.get("span")
+    if span is None:
+        first = await collection.find({}, {"_id": 0, "available_from": 1}).sort("available_from", 1).limit(1).to_list(None)
+        last = await collection.find({}, {"_id": 0, "available_to": 1}).sort("available_to", -1).limit(1).to_list(None)
+        if not first or not last:
+            return None
+        span = (to_timestamp(first[0]["available_from"]), to_timestamp(last[0]["available_to"]))
+        availability_span_cache.put("span", span)
+    return span
+
+def covering_index(start: float, end: float, span: Tuple[float, float]) -> str:
+    """
+    The index for windows covering [start, end] whose bound matches fewer
+    windows, taking windows to be spread evenly over span: ranges near the
+    latest stored windows walk available_to, older ranges available_from.
+    """
+    first, last = span
+    return COVERING_FROM_INDEX if start - first <= last - end else COVERING_TO_INDEX
@@ -0,0 +1,68 @@
+# backend/app/services/batch_allocation.py
+from typing import Optional
+import numpy as np
+from pymongo.collection import Collection
+from ..services.repository import get_repository
+from ..services.profile_loader import load_employee_profiles
+from ..services.inference_client import get_inference_client
+from ..services.task_allocation import compute_feature_matrix
+from ..services.versions import bump_versions, task_resources
+from ..services.workload import EMPLOYEE_CAPACITY, claim_tasks, load_counts
+
+DEFAULT_CAPACITY = EMPLOYEE_CAPACITY
+
+def solve_assignment(scores: np.ndarray, capacities: np.ndarray):
+    """
+    Maximize the total score subject to each employee taking at most
+    capacities[j] tasks. Each employee column is repeated once per free slot
+    and the resulting rectangular problem is solved with the Hungarian method.
+    Returns (task_indices, employee_indices).
+    """
+    # scipy is heavy to import, so load it only when a batch is solved
+    from scipy.optimize import linear_sum_assignment
+
+    slot_owner = np.repeat(np.arange(len(capacities)), capacities)
+    if scores.size == 0 or slot_owner.size == 0:
+        return np.array([], dtype=int), np.array([], dtype=int)
+    task_indices, slot_indices = linear_sum_assignment(scores[:, slot_owner], maximize=True)
+    return task_indices, slot_owner[slot_indices]
+
+async def assign_pending_tasks(supervisor_id: Optional[str] = None, capacity: int = DEFAULT_CAPACITY) -> dict:
+    """Assign all pending, unassigned tasks at once with a global optimal matching."""
+    task_collection: Collection = get_repository().tasks
+    query = {"status": "pending", "assigned_to": None}
+    if supervisor_id:
+        query["supervisor_id"] = supervisor_id
+    tasks = await task_collection.find(query).to_list(None)
+    if not tasks:
+        return {"assigned": [], "unassigned": []}
+
+    employee_data = await load_employee_profiles()
+    if not employee_data:
+        raise ValueError("No employees available")
+
+    # Remaining capacity takes the employee's current open workload into account
+    open_counts = await load_counts(emp["id"] for emp in employee_data)
+    capacities = np.array([max(0, capacity - open_counts.get(emp["id"], 0)) for emp in employee_data])
+
+    # Score the full tasks x employees matrix in one pass
+    features = compute_feature_matrix(tasks, employee_data)
+    scores = (await get_inference_client().score(features.reshape(-1, 3))).reshape(len(tasks), len(employee_data))
+
+    task_indices, employee_indices = solve_assignment(scores, capacities)
+
+    # The pairs are claimed with the same conditions as a single assignment, in a few
+    # bulk_writes, so tasks or slots taken meanwhile by another worker or batch are skipped
+    pairs = list(zip(task_indices.tolist(), employee_indices.tolist()))
+    won = await claim_tasks([(tasks[i]["_id"], employee_data[j]["id"]) for i, j in pairs], capacity)
+    claimed = [pairs[index] for index in won]
+    assigned = [
+        {"task_id": str(tasks[i]["_id"]), "employee_id": employee_data[j]["id"], "score": float(scores[i, j])}
+        for i, j in claimed
+    ]
+    if claimed:
+        await bump_versions(task_resources(*({**tasks[i], "assigned_to": employee_data[j]["id"]} for i, j in claimed)))
+
+    assigned_tasks = {i for i, _ in claimed}
+    unassigned = [str(task["_id"]) for i, task in enumerate(tasks) if i not in assigned_tasks]
+    return {"assigned": assigned, "unassigned": unassigned}
@@ -0,0 +1,85 @@
+# backend/app/services/bulk.py
+"""
+Shared plumbing for the /bulk ingestion routes.
+Bodies are either a JSON array or, with Content-Type application/x-ndjson,
+one JSON object per line. NDJSON is parsed as it streams in and written in
+batches of BULK_BATCH_SIZE items, so a large import never sits in memory
+whole. Each batch costs at most one user lookup (see identity.resolve_users)
+and one unordered bulk_write.
+"""
+import json
+import os
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Tuple, Type
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+from pymongo.errors import BulkWriteError
+
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "1000"))
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+async def _iter_raw_items(request: Request) -> AsyncIterator:
+    """Items as dicts (JSON array body) or bytes lines (NDJSON body, read as it arrives)."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_TYPES:
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield line
+        if buffer.strip():
+            yield buffer
+        return
+
+    try:
+        items = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    for item in items:
+        yield item
+
+def _parse(raw, model: Type[BaseModel]) -> BaseModel:
+    item = json.loads(raw) if isinstance(raw, (bytes, str)) else raw
+    if not isinstance(item, dict):
+        raise ValueError("Item must be a JSON object")
+    return model(**item)
+
+def _describe(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        return "; ".join(f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors())
+    return str(error)
+
+def error_result(index: int, message: str) -> dict:
+    return {"index": index, "status": "error", "error": message}
+
+def write_errors(error: BulkWriteError) -> Dict[int, str]:
+    """Operation index -> message for the operations a bulk_write rejected."""
+    return {err["index"]: err.get("errmsg", "Write failed") for err in error.details.get("writeErrors", [])}
+
+# A batch handler receives (item index, validated model) pairs and returns one result per pair
+BatchHandler = Callable[[List[Tuple[int, BaseModel]]], Awaitable[List[dict]]]
+
+async def run_bulk(request: Request, model: Type[BaseModel], handle_batch: BatchHandler, batch_size: int = BULK_BATCH_SIZE) -> dict:
+    """Validate and hand the request's items to handle_batch in batches; collect per-item results."""
+    results: List[dict] = []
+    batch: List[Tuple[int, BaseModel]] = []
+    index = -1
+    async for raw in _iter_raw_items(request):
+        index += 1
+        try:
+            batch.append((index, _parse(raw, model)))
+        except (ValueError, TypeError) as e:
+            results.append(error_result(index, _describe(e)))
+            continue
+        if len(batch) >= batch_size:
+            results.extend(await handle_batch(batch))
+            batch = []
+    if batch:
+        results.extend(await handle_batch(batch))
+
+    results.sort(key=lambda result: result["index"])
+    failed = sum(result["status"] == "error" for result in results)
+    return {"received": index + 1, "succeeded": len(results) - failed, "failed": failed, "results": results}
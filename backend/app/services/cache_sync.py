@@ -0,0 +1,86 @@
+# backend/app/services/cache_sync.py
+"""
+Keeps this process's caches in step with writes made by other processes.
+
+The write routes invalidate the caches of the worker that served them, but
+identity_cache, profile_cache, score_cache and skill_index live in every
+worker (SERVE_WORKERS > 1) and on every host. CacheSync follows the same
+writes as the candidate score sync (see change_feed.py) and runs in every
+process, so a demoted user loses their role everywhere within
+CACHE_SYNC_INTERVAL seconds rather than after IDENTITY_CACHE_TTL.
+
+CACHE_SYNC selects auto (change streams when available), changestream, poll
+or off. Turn it off only when a single process serves the database.
+"""
+import os
+from datetime import datetime, timezone
+from typing import Optional
+from ..services.change_feed import IGNORED_TASK_FIELDS, ChangeFollower
+from ..services.identity import identity_cache, invalidate_user
+from ..services.profile_loader import invalidate_profile, profile_cache
+from ..services.skill_index import skill_index
+from ..services.task_allocation import score_cache
+
+class CacheSync(ChangeFollower):
+    """Drops cached identities, profiles and rankings built from documents another process changed."""
+
+    label = "cache invalidation"
+
+    def __init__(self, mode: str = "auto", interval: float = 1.0, poll_overlap: float = 5.0):
+        super().__init__(mode, interval, poll_overlap)
+        self.last_change: Optional[datetime] = None
+        self.invalidations = 0
+
+    def stats(self) -> dict:
+        return {"mode": self.active_mode or "off", "last_change": self.last_change, "invalidations": self.invalidations}
+
+    def _user_changed(self, user_key: str):
+        # The role or clerk_id may have changed, and the profile is keyed by the clerk_id
+        invalidate_user(user_key)
+        invalidate_profile(user_key)
+
+    def _counted(self):
+        self.invalidations += 1
+        self.last_change = datetime.now(timezone.utc)
+
+    def handle_change(self, change: dict):
+        collection = change["ns"]["coll"]
+        document = change.get("fullDocument") or {}
+        key = change.get("documentKey", {}).get("_id")
+        if collection in ("skills", "availability"):
+            # Deletes carry no user_id; availability compaction always pairs them with an insert
+            if not document.get("user_id"):
+                return
+            invalidate_profile(document["user_id"])
+            if collection == "skills" and "skill_name" in document:
+                skill_index.update(document["user_id"], document["skill_name"], document["proficiency_level"])
+        elif collection == "users":
+            self._user_changed(str(key))
+        elif collection == "tasks":
+            updated = set(change.get("updateDescription", {}).get("updatedFields", {}))
+            if change["operationType"] == "update" and updated <= IGNORED_TASK_FIELDS:
+                return
+            score_cache.pop(str(key))
+        self._counted()
+
+    def handle_polled(self, collection: str, doc: dict):
+        if collection in ("skills", "availability"):
+            invalidate_profile(doc["user_id"])
+            if collection == "skills":
+                skill_index.update(doc["user_id"], doc["skill_name"], doc["proficiency_level"])
+        elif collection == "users":
+            self._user_changed(str(doc["_id"]))
+        else:
+            score_cache.pop(str(doc["_id"]))
+        self._counted()
+
+    async def resync(self):
+        identity_cache.clear()
+        profile_cache.clear()
+        score_cache.clear()
+        skill_index.invalidate()
+
+cache_sync = CacheSync(
+    mode=os.getenv("CACHE_SYNC", "auto").lower(),
+    interval=float(os.getenv("CACHE_SYNC_INTERVAL", "1")),
+)
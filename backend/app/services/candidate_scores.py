@@ -0,0 +1,246 @@
+# backend/app/services/candidate_scores.py
+"""
+Materialized (open task, employee) scores in the candidate_scores collection,
+so the best candidates for a task are an indexed lookup instead of a fresh
+scoring pass over every employee.
+
+Only pairs where the employee holds at least one required skill are stored
+(the same cut assign_task makes). Each rescoring pass stamps rescored_at,
+and pairs in its scope that it did not rewrite are deleted afterwards.
+
+CandidateScoreSync keeps the collection current from writes to users,
+skills, availability and tasks, followed as change_feed.py describes. Dirty
+employees and tasks are collected and rescored together every
+CANDIDATE_SYNC_INTERVAL seconds. CANDIDATE_SYNC selects auto (change streams
+when available), changestream, poll or off; run it in one process only.
+Per-process caches are kept current by cache_sync.py in every process.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Set
+import numpy as np
+from bson import ObjectId
+from pymongo import DeleteMany, UpdateOne
+from ..services.repository import get_repository
+from ..services.change_feed import IGNORED_TASK_FIELDS, ChangeFollower
+from ..services.inference_client import get_inference_client
+from ..services.profile_loader import invalidate_profile, load_employee_profiles
+from ..services.skill_index import skill_index
+
+logger = logging.getLogger(__name__)
+
+OPEN_TASKS = {"status": {"$ne": "completed"}}
+TASK_CHUNK_SIZE = 256
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+async def _write_scores(tasks: List[dict], profiles: List[dict], rescored_at: datetime) -> int:
+    """Score every skill-matching pair of tasks x profiles and upsert it. Returns the number of pairs written."""
+    # task_allocation serves rankings from this collection, so import it lazily
+    from ..services.task_allocation import compute_feature_matrix
+
+    if not tasks or not profiles:
+        return 0
+    features = compute_feature_matrix(tasks, profiles)
+    task_index, employee_index = np.nonzero(features[:, :, 0] > 0)
+    if not len(task_index):
+        return 0
+    pair_features = features[task_index, employee_index]
+    scores = await get_inference_client().score(pair_features)
+
+    operations = []
+    for t, e, row, score in zip(task_index, employee_index, pair_features, scores):
+        task_id = str(tasks[t]["_id"])
+        employee_id = profiles[e]["id"]
+        operations.append(UpdateOne(
+            {"_id": f"{task_id}:{employee_id}"},
+            {"$set": {
+                "task_id": task_id,
+                "employee_id": employee_id,
+                "clerk_id": profiles[e].get("clerk_id"),
+                "score": float(score),
+                "features": [float(value) for value in row],
+                "rescored_at": rescored_at,
+            }},
+            upsert=True,
+        ))
+    await get_repository().candidate_scores.bulk_write(operations, ordered=False)
+    return len(operations)
+
+async def rescore_employees(employee_keys: Iterable[str]) -> int:
+    """
+    Rescore the given employees (ObjectId strings or clerk_ids) against all
+    open tasks and drop their stale pairs. Keys that no longer resolve to an
+    employee lose all their pairs.
+    """
+    employee_keys = list(employee_keys)
+    for key in employee_keys:
+        invalidate_profile(key)
+    profiles = await load_employee_profiles(employee_keys)
+    employee_ids = [profile["id"] for profile in profiles]
+    rescored_at = _now()
+
+    written = 0
+    if profiles:
+        # Walk the open tasks in chunks so the tasks x employees matrix stays bounded
+        chunk = []
+        async for task in get_repository().tasks.find(OPEN_TASKS, {"required_skills": 1, "start_date": 1, "due_date": 1}):
+            chunk.append(task)
+            if len(chunk) >= TASK_CHUNK_SIZE:
+                written += await _write_scores(chunk, profiles, rescored_at)
+                chunk = []
+        written += await _write_scores(chunk, profiles, rescored_at)
+
+    gone = [key for key in employee_keys if ObjectId.is_valid(key) and key not in employee_ids]
+    await get_repository().candidate_scores.bulk_write([
+        DeleteMany({"employee_id": {"$in": employee_ids}, "rescored_at": {"$lt": rescored_at}}),
+        DeleteMany({"employee_id": {"$in": gone}}),
+    ], ordered=False)
+    return written
+
+async def rescore_tasks(task_ids: Iterable[str]) -> int:
+    """Rescore the given tasks against every skill-matching employee. Closed or deleted tasks lose all their pairs."""
+    task_ids = [task_id for task_id in task_ids if ObjectId.is_valid(task_id)]
+    if not task_ids:
+        return 0
+    tasks = await get_repository().tasks.find({"_id": {"$in": [ObjectId(task_id) for task_id in task_ids]}, **OPEN_TASKS}).to_list(None)
+    rescored_at = _now()
+
+    written = 0
+    if tasks:
+        candidates: Set[str] = set()
+        for task in tasks:
+            candidates |= await skill_index.candidates(task["required_skills"])
+        profiles = await load_employee_profiles(candidates) if candidates else []
+        written = await _write_scores(tasks, profiles, rescored_at)
+
+    open_ids = [str(task["_id"]) for task in tasks]
+    closed_ids = [task_id for task_id in task_ids if task_id not in open_ids]
+    await get_repository().candidate_scores.bulk_write([
+        DeleteMany({"task_id": {"$in": open_ids}, "rescored_at": {"$lt": rescored_at}}),
+        DeleteMany({"task_id": {"$in": closed_ids}}),
+    ], ordered=False)
+    return written
+
+async def rebuild_candidate_scores() -> int:
+    """Rescore every employee against every open task and drop all older pairs."""
+    started = _now()
+    employees = await get_repository().users.find({"role": "employee"}, {"_id": 1}).to_list(None)
+    written = 0
+    for lo in range(0, len(employees), 500):
+        written += await rescore_employees(str(emp["_id"]) for emp in employees[lo:lo + 500])
+    await get_repository().candidate_scores.delete_many({"rescored_at": {"$lt": started}})
+    return written
+
+async def top_candidates(task_id: str, k: int, skip: int = 0) -> List[dict]:
+    """The k best stored candidates for a task after the first `skip`, best first (served by the task_id/score index)."""
+    cursor = get_repository().candidate_scores.find({"task_id": task_id}).sort("score", -1).skip(skip).limit(k)
+    return await cursor.to_list(None)
+
+async def count_candidates(task_id: str) -> int:
+    return await get_repository().candidate_scores.count_documents({"task_id": task_id})
+
+def stored_scores_enabled() -> bool:
+    """Whether some process keeps candidate_scores current (CANDIDATE_SYNC is not off)."""
+    return candidate_sync.mode != "off"
+
+class CandidateScoreSync(ChangeFollower):
+    """Background consumer that keeps candidate_scores in step with writes to the source collections."""
+
+    label = "candidate score updates"
+
+    def __init__(self, mode: str = "auto", interval: float = 1.0, poll_overlap: float = 5.0):
+        super().__init__(mode, interval, poll_overlap)
+        self.last_sync: Optional[datetime] = None
+        self.pairs_written = 0
+        self._dirty_employees: Set[str] = set()
+        self._dirty_tasks: Set[str] = set()
+
+    def mark_employee(self, key: str):
+        self._dirty_employees.add(str(key))
+
+    def mark_task(self, task_id: str):
+        self._dirty_tasks.add(str(task_id))
+
+    def background(self) -> list:
+        return [self._initial_build(), self._flush_loop()]
+
+    async def _initial_build(self):
+        """A fresh deployment starts from a full build, in the background so startup is not held up."""
+        try:
+            if await get_repository().candidate_scores.find_one({}, {"_id": 1}) is None:
+                self.pairs_written += await rebuild_candidate_scores()
+        except Exception as e:
+            logger.error(f"Initial candidate score build failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.active_mode or "off",
+            "last_sync": self.last_sync,
+            "pending_employees": len(self._dirty_employees),
+            "pending_tasks": len(self._dirty_tasks),
+            "pairs_written": self.pairs_written,
+        }
+
+    def handle_change(self, change: dict):
+        collection = change["ns"]["coll"]
+        operation = change["operationType"]
+        document = change.get("fullDocument") or {}
+        key = change.get("documentKey", {}).get("_id")
+        if collection in ("skills", "availability"):
+            # Deletes carry no user_id; availability compaction always pairs them with an insert
+            if document.get("user_id"):
+                self.mark_employee(document["user_id"])
+        elif collection == "users":
+            self.mark_employee(key)
+        elif collection == "tasks":
+            updated = set(change.get("updateDescription", {}).get("updatedFields", {}))
+            if operation == "update" and updated <= IGNORED_TASK_FIELDS:
+                return
+            self.mark_task(key)
+
+    def handle_polled(self, collection: str, doc: dict):
+        if collection in ("skills", "availability"):
+            self.mark_employee(doc["user_id"])
+        elif collection == "users":
+            self.mark_employee(str(doc["_id"]))
+        else:
+            self.mark_task(str(doc["_id"]))
+
+    async def resync(self):
+        self.pairs_written += await rebuild_candidate_scores()
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Candidate rescoring failed: {e}")
+
+    async def flush(self):
+        """Rescore everything marked dirty since the last flush."""
+        employees, self._dirty_employees = self._dirty_employees, set()
+        tasks, self._dirty_tasks = self._dirty_tasks, set()
+        try:
+            if employees:
+                self.pairs_written += await rescore_employees(employees)
+            if tasks:
+                self.pairs_written += await rescore_tasks(tasks)
+        except Exception:
+            # Keep the work for the next round
+            self._dirty_employees |= employees
+            self._dirty_tasks |= tasks
+            raise
+        if employees or tasks:
+            self.last_sync = _now()
+
+candidate_sync = CandidateScoreSync(
+    mode=os.getenv("CANDIDATE_SYNC", "auto").lower(),
+    interval=float(os.getenv("CANDIDATE_SYNC_INTERVAL", "1")),
+)
@@ -0,0 +1,134 @@
+# backend/app/services/change_feed.py
+"""
+Following writes to users, skills, availability and tasks made by any
+process: MongoDB change streams where the server supports them, else
+polling the updated_at stamps the write routes set.
+
+ChangeFollower does the following. Subclasses say what a change means
+(handle_change for change stream events, handle_polled for polled
+documents) and how to catch up after the stream lost its position (resync).
+mode selects auto (change streams when available), changestream, poll or off.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from pymongo.errors import OperationFailure, PyMongoError
+from ..services.repository import get_repository
+
+logger = logging.getLogger(__name__)
+
+WATCHED_COLLECTIONS = ["users", "skills", "availability", "tasks"]
+# What the poller reads from each watched collection
+POLLED_FIELDS = {
+    "skills": {"user_id": 1, "skill_name": 1, "proficiency_level": 1},
+    "availability": {"user_id": 1},
+    "users": {"_id": 1},
+    "tasks": {"_id": 1},
+}
+# Task updates touching only these fields change neither scores nor cached rankings
+IGNORED_TASK_FIELDS = {"assigned_to", "claim_token", "updated_at"}
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+class ChangeFollower:
+    """Base for background consumers of writes to WATCHED_COLLECTIONS."""
+
+    # What the follower keeps current, for log lines
+    label = "changes"
+
+    def __init__(self, mode: str = "auto", interval: float = 1.0, poll_overlap: float = 5.0):
+        self.mode = mode
+        self.interval = interval
+        self.poll_overlap = poll_overlap
+        self.active_mode: Optional[str] = None
+        self._tasks: List[asyncio.Task] = []
+        self._resume_token = None
+
+    async def start(self):
+        if self.mode == "off":
+            return
+        self.active_mode = "poll"
+        if self.mode in ("auto", "changestream"):
+            try:
+                # Opening the stream fails fast on a standalone server; keep its position to resume from
+                async with get_repository().database.watch(self._pipeline(), full_document="updateLookup") as stream:
+                    await stream.try_next()
+                    self._resume_token = stream.resume_token
+                self.active_mode = "changestream"
+            except (OperationFailure, NotImplementedError) as e:
+                if self.mode == "changestream":
+                    raise
+                logger.info(f"Change streams unavailable, polling for {self.label}: {e}")
+
+        consumer = self._watch() if self.active_mode == "changestream" else self._poll()
+        self._tasks = [asyncio.create_task(coroutine) for coroutine in (consumer, *self.background())]
+
+    def background(self) -> list:
+        """Coroutines to run alongside the consumer until stop()."""
+        return []
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.active_mode = None
+
+    def handle_change(self, change: dict):
+        raise NotImplementedError
+
+    def handle_polled(self, collection: str, doc: dict):
+        raise NotImplementedError
+
+    async def resync(self):
+        """Catch up after changes were missed."""
+        raise NotImplementedError
+
+    @staticmethod
+    def _pipeline() -> list:
+        return [{"$match": {"ns.coll": {"$in": WATCHED_COLLECTIONS}}}]
+
+    async def _watch(self):
+        database = get_repository().database
+        while True:
+            try:
+                async with database.watch(self._pipeline(), full_document="updateLookup", resume_after=self._resume_token) as stream:
+                    async for change in stream:
+                        self._resume_token = stream.resume_token
+                        self.handle_change(change)
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                # The resume point fell off the oplog; resync rather than miss changes
+                logger.warning(f"Change stream for {self.label} lost its position, resyncing: {e}")
+                self._resume_token = None
+                await self.resync()
+            except PyMongoError as e:
+                logger.warning(f"Change stream for {self.label} interrupted, resuming: {e}")
+                await asyncio.sleep(self.interval)
+
+    async def _poll(self):
+        repository = get_repository()
+        since = _now()
+        # (collection, _id) -> updated_at of documents already handled inside the look-back window
+        seen = {}
+        while True:
+            await asyncio.sleep(self.interval)
+            polled_at = _now()
+            # Look back a little so writes stamped just before a slow commit are not missed
+            query = {"updated_at": {"$gt": since - timedelta(seconds=self.poll_overlap)}}
+            fresh = {}
+            try:
+                for name, projection in POLLED_FIELDS.items():
+                    async for doc in repository.collection(name).find(query, {**projection, "updated_at": 1}):
+                        key = (name, doc["_id"])
+                        fresh[key] = doc["updated_at"]
+                        if seen.get(key) != doc["updated_at"]:
+                            self.handle_polled(name, doc)
+            except PyMongoError as e:
+                logger.warning(f"Poll for {self.label} failed: {e}")
+                continue
+            seen = fresh
+            since = polled_at
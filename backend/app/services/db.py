@@ -3,15 +3,23 @@ from pymongo.mongo_client import MongoClient
 from pymongo.server_api import ServerApi
 from dotenv import load_dotenv
 import os
-load_dotenv()
-uri = os.getenv("MONGO_URL")
 
-# Create a new client and connect to the server
-client = MongoClient(uri, server_api=ServerApi('1'))
+def ping(uri: str = None) -> bool:
+    """Connect to the deployment and send a ping. Run as a script to check connectivity."""
+    load_dotenv()
+    # Create a new client and connect to the server
+    client = MongoClient(uri or os.getenv("MONGO_URL"), server_api=ServerApi('1'))
 
-# Send a ping to confirm a successful connection
-try:
-    client.admin.command('ping')
-    print("Pinged your deployment. You successfully connected to MongoDB!")
-except Exception as e:
-    print(e)
\ No newline at end of file
+    # Send a ping to confirm a successful connection
+    try:
+        client.admin.command('ping')
+        print("Pinged your deployment. You successfully connected to MongoDB!")
+        return True
+    except Exception as e:
+        print(e)
+        return False
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    ping()
\ No newline at end of file
@@ -0,0 +1,30 @@
+# backend/app/services/features.py
+# Array kernels shared by the allocation service and the training data generator,
+# so both compute exactly the features compute_features defines.
+from typing import Tuple
+import numpy as np
+
+def skill_features(required: np.ndarray, has_skill: np.ndarray, proficiency: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Skill match ratio and average proficiency over matching skills.
+    required is (tasks, skills) 0/1, has_skill and proficiency are
+    (employees, skills). Returns two (tasks, employees) arrays.
+    """
+    match_count = required @ has_skill.T
+    required_count = required.sum(axis=1, keepdims=True)
+    ratio = np.divide(match_count, required_count, out=np.zeros_like(match_count), where=required_count > 0)
+    avg_proficiency = np.divide(required @ proficiency.T, match_count, out=np.zeros_like(match_count), where=match_count > 0)
+    return ratio, avg_proficiency
+
+def overlap_ratio(task_start: np.ndarray, task_end: np.ndarray, window_start: np.ndarray, window_end: np.ndarray) -> np.ndarray:
+    """
+    Fraction of each task's duration covered by each window.
+    Task bounds are (tasks, 1) and window bounds (windows,); returns (tasks, windows).
+    """
+    duration = task_end - task_start
+    overlap = np.clip(np.minimum(task_end, window_end) - np.maximum(task_start, window_start), 0, None)
+    return np.divide(overlap, duration, out=np.zeros_like(overlap), where=duration > 0)
+
+def target_score(skill_match_ratio: np.ndarray, availability_overlap: np.ndarray, avg_proficiency: np.ndarray) -> np.ndarray:
+    """Training target used for the linear model."""
+    return skill_match_ratio * (avg_proficiency / 5) * availability_overlap
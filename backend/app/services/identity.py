@@ -0,0 +1,196 @@
+# backend/app/services/identity.py
+"""
+Resolves a user key (ObjectId string or clerk_id) to the user it names with
+one indexed query, and remembers the answer in identity_cache under both
+keys. The user routes invalidate entries on create and update.
+
+Skills and availability store user_id in the canonical form, the user's
+ObjectId string. Older documents may still hold a clerk_id; migrate them with
+
+    python -m app.services.identity              # report what would change
+    python -m app.services.identity --apply      # rewrite user_id in place
+"""
+import argparse
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+from bson import ObjectId
+from pymongo import DeleteMany, InsertOne, UpdateOne
+from ..services.availability_index import plan_compaction
+from ..services.cache import LRUCache
+from ..services.repository import Repository, get_repository
+from ..services.versions import availability_resource, bump_versions, skills_resource
+
+logger = logging.getLogger(__name__)
+
+# Only what the routes need to authorise and key writes; full documents are read on demand
+IDENTITY_FIELDS = {"_id": 1, "clerk_id": 1, "role": 1}
+
+identity_cache = LRUCache(
+    maxsize=int(os.getenv("IDENTITY_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("IDENTITY_CACHE_TTL", "300")),
+)
+
+def user_query(user_key: str) -> dict:
+    """Filter matching a user by ObjectId string or clerk_id in one query."""
+    query = {"clerk_id": user_key}
+    if ObjectId.is_valid(user_key):
+        query = {"$or": [{"_id": ObjectId(user_key)}, query]}
+    return query
+
+def canonical_id(user: dict) -> str:
+    """The form user_id is stored in on skills and availability."""
+    return str(user["_id"])
+
+def user_keys(user: dict) -> List[str]:
+    """Every user_id a skill or availability document may still hold for this user."""
+    keys = [str(user["_id"])]
+    if user.get("clerk_id") and user["clerk_id"] != keys[0]:
+        keys.append(user["clerk_id"])
+    return keys
+
+def remember_user(user: dict):
+    identity = {field: user.get(field) for field in IDENTITY_FIELDS}
+    identity_cache.put(str(user["_id"]), identity)
+    if user.get("clerk_id"):
+        identity_cache.put(user["clerk_id"], identity)
+
+def invalidate_user(user_key: str):
+    """Drop a cached identity by either of its keys."""
+    user = identity_cache.pop(user_key)
+    if user is not None:
+        identity_cache.pop(str(user["_id"]))
+        if user.get("clerk_id"):
+            identity_cache.pop(user["clerk_id"])
+
+async def resolve_user(user_key: str, repo: Optional[Repository] = None) -> Optional[dict]:
+    """The {_id, clerk_id, role} of the user named by user_key, or None. Misses are not cached."""
+    user = identity_cache.get(user_key)
+    if user is not None:
+        return user
+    repo = repo or get_repository()
+    user = await repo.users.find_one(user_query(user_key), IDENTITY_FIELDS)
+    if user:
+        remember_user(user)
+    return user
+
+async def resolve_users(user_keys: Iterable[str], repo: Optional[Repository] = None) -> Dict[str, dict]:
+    """Resolve many keys, querying only the cache misses (in one query). Returns key -> user for the keys found."""
+    found = {}
+    misses = []
+    for key in set(user_keys):
+        user = identity_cache.get(key)
+        if user is not None:
+            found[key] = user
+        else:
+            misses.append(key)
+    if misses:
+        repo = repo or get_repository()
+        object_ids = [ObjectId(key) for key in misses if ObjectId.is_valid(key)]
+        users = await repo.users.find(
+            {"$or": [{"_id": {"$in": object_ids}}, {"clerk_id": {"$in": misses}}]}, IDENTITY_FIELDS
+        ).to_list(None)
+        by_key = {}
+        for user in users:
+            remember_user(user)
+            by_key[str(user["_id"])] = user
+            if user.get("clerk_id"):
+                by_key[user["clerk_id"]] = user
+        found.update((key, by_key[key]) for key in misses if key in by_key)
+    return found
+
+async def normalize_user_ids(repository: Repository, apply: bool = False) -> dict:
+    """
+    Rewrite skills and availability that reference a user by clerk_id to
+    the user's ObjectId string. Where a user has the same skill under both
+    keys, the most recently updated document wins; availability windows
+    under both keys are merged as POST /availability/ would. Documents
+    whose user_id matches no user are counted and left alone.
+    Returns per-collection counts; nothing is written unless apply is set.
+    """
+    canonical = {}
+    async for user in repository.users.find({"clerk_id": {"$ne": None}}, {"_id": 1, "clerk_id": 1}):
+        if user["clerk_id"] != str(user["_id"]):
+            canonical[user["clerk_id"]] = str(user["_id"])
+    report = {"skills": defaultdict(int), "availability": defaultdict(int)}
+    if not canonical:
+        return report
+
+    # Skills: the (user_id, skill_name) unique index means duplicates go before renames
+    skills = defaultdict(list)
+    async for skill in repository.skills.find({"user_id": {"$in": list(canonical) + list(canonical.values())}}):
+        skills[(canonical.get(skill["user_id"], skill["user_id"]), skill["skill_name"])].append(skill)
+    deletes, renames, migrated_skills = [], [], []
+    for (user_id, skill_name), docs in skills.items():
+        if all(doc["user_id"] == user_id for doc in docs):
+            continue
+        migrated_skills.append((user_id, skill_name))
+        docs.sort(key=lambda doc: (doc.get("updated_at") is not None, doc.get("updated_at") or 0, doc["user_id"] == user_id), reverse=True)
+        winner, losers = docs[0], docs[1:]
+        deletes.extend(doc["_id"] for doc in losers)
+        if winner["user_id"] != user_id:
+            renames.append(UpdateOne({"_id": winner["_id"]}, {"$set": {"user_id": user_id}}))
+    report["skills"]["renamed"] = len(renames)
+    report["skills"]["duplicates_removed"] = len(deletes)
+    skill_operations = ([DeleteMany({"_id": {"$in": deletes}})] if deletes else []) + renames
+
+    # Availability: re-merge each affected user's windows under the canonical key
+    windows = defaultdict(list)
+    async for doc in repository.availability.find({"user_id": {"$in": list(canonical) + list(canonical.values())}}):
+        windows[canonical.get(doc["user_id"], doc["user_id"])].append(doc)
+    availability_operations, migrated_windows = [], []
+    for user_id, docs in windows.items():
+        if all(doc["user_id"] == user_id for doc in docs):
+            continue
+        migrated_windows.append(user_id)
+        # Windows held under the clerk_id come back as stale and are re-inserted under user_id
+        stale, missing, _ = plan_compaction(user_id, docs, [])
+        if stale:
+            availability_operations.append(DeleteMany({"_id": {"$in": stale}}))
+        availability_operations.extend(InsertOne(doc) for doc in missing)
+        report["availability"]["users"] += 1
+        report["availability"]["removed"] += len(stale)
+        report["availability"]["inserted"] += len(missing)
+
+    known = set(canonical) | set(canonical.values())
+    async for user in repository.users.find({}, {"_id": 1}):
+        known.add(str(user["_id"]))
+    for name in ("skills", "availability"):
+        report[name]["orphaned"] = await repository.collection(name).count_documents({"user_id": {"$nin": list(known)}})
+
+    if apply:
+        if skill_operations:
+            await repository.skills.bulk_write(skill_operations, ordered=True)
+            await bump_versions((skills_resource(user_id) for user_id, _ in migrated_skills), repository)
+        if availability_operations:
+            await repository.availability.bulk_write(availability_operations, ordered=True)
+            await bump_versions((availability_resource(user_id) for user_id in migrated_windows), repository)
+        logger.info(f"Normalized user_id: {dict(report['skills'])} skills, {dict(report['availability'])} availability")
+    return report
+
+async def _main(apply: bool):
+    from dotenv import load_dotenv
+    from ..services.repository import DEFAULT_DB_NAME, create_client
+
+    load_dotenv()
+    client = create_client()
+    repository = Repository(client[os.getenv("MONGO_DB_NAME", DEFAULT_DB_NAME)])
+    try:
+        report = await normalize_user_ids(repository, apply)
+    finally:
+        client.close()
+    for name, counts in report.items():
+        print(f"{name}: " + (", ".join(f"{key}={value}" for key, value in counts.items()) or "nothing to do"))
+    if not apply:
+        print("Dry run; pass --apply to write the changes")
+
+def main():
+    parser = argparse.ArgumentParser(description="Normalize user_id on skills and availability to the user's ObjectId string.")
+    parser.add_argument("--apply", action="store_true", help="Write the changes instead of only reporting them")
+    args = parser.parse_args()
+    asyncio.run(_main(args.apply))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+# backend/app/services/indexes.py
+"""
+Indexes the hot queries rely on, created idempotently from the app lifespan,
+plus an explain() audit of each query shape that flags collection scans.
+
+    python -m app.services.indexes            # audit query plans
+    python -m app.services.indexes --create   # create indexes, then audit
+"""
+import argparse
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Dict, List
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from ..services.availability_index import COVERING_FROM_INDEX, COVERING_TO_INDEX
+from ..services.repository import Repository
+from ..services.task_summary import summary_pipeline
+
+logger = logging.getLogger(__name__)
+
+# Collection -> indexes. Names are fixed so re-running is a no-op.
+REQUIRED_INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("clerk_id", ASCENDING)], name="clerk_id_unique", unique=True),
+        IndexModel([("role", ASCENDING)], name="role"),
+        IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+    ],
+    "skills": [
+        # One document per user and skill; also serves user_id and user_id $in lookups
+        IndexModel([("user_id", ASCENDING), ("skill_name", ASCENDING)], name="user_id_skill_name_unique", unique=True),
+        IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+    ],
+    "availability": [
+        # Per-user windows in start order (compaction and profile loading)
+        IndexModel([("user_id", ASCENDING), ("available_from", ASCENDING)], name="user_id_available_from"),
+        # Who is free for a whole range (GET /availability/?from=&to=), walked from whichever bound is more selective
+        IndexModel([("available_from", ASCENDING), ("available_to", ASCENDING)], name=COVERING_FROM_INDEX),
+        IndexModel([("available_to", ASCENDING), ("available_from", ASCENDING)], name=COVERING_TO_INDEX),
+        IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+    ],
+    "tasks": [
+        # Keyset pagination of GET /tasks/ walks _id within one supervisor or assignee
+        IndexModel([("supervisor_id", ASCENDING), ("_id", ASCENDING)], name="supervisor_id_id"),
+        IndexModel([("assigned_to", ASCENDING), ("_id", ASCENDING)], name="assigned_to_id"),
+        # Covers the GET /tasks/summary aggregation over open tasks, so it never fetches task documents
+        IndexModel(
+            [("supervisor_id", ASCENDING), ("status", ASCENDING), ("assigned_to", ASCENDING), ("due_date", ASCENDING)],
+            name="supervisor_id_status_assigned_to_due_date",
+        ),
+        # Polled by the candidate score sync when change streams are unavailable (also on the collections above)
+        IndexModel([("updated_at", ASCENDING)], name="updated_at"),
+    ],
+    "assignment_jobs": [
+        IndexModel([("status", ASCENDING)], name="status"),
+    ],
+    "candidate_scores": [
+        # Best candidates for a task, and the stale-pair cleanup after a rescore
+        IndexModel([("task_id", ASCENDING), ("score", DESCENDING)], name="task_id_score"),
+        IndexModel([("employee_id", ASCENDING), ("rescored_at", ASCENDING)], name="employee_id_rescored_at"),
+    ],
+}
+
+def query_shapes() -> List[dict]:
+    """
+    The find/aggregate shapes issued by the routes and services, with
+    representative values, as explain command bodies. Shapes that read the
+    whole collection on purpose are marked full_scan.
+    """
+    some_id = ObjectId()
+    user_key = str(some_id)
+    now = datetime(2025, 1, 1)
+    return [
+        {"name": "users by clerk_id", "explain": {"find": "users", "filter": {"clerk_id": "clerk"}}},
+        {"name": "user by key", "explain": {"find": "users", "filter": {
+            "$or": [{"_id": some_id}, {"clerk_id": user_key}],
+        }}},
+        {"name": "employees by key", "explain": {"find": "users", "filter": {
+            "role": "employee", "$or": [{"_id": {"$in": [some_id]}}, {"clerk_id": {"$in": [user_key]}}],
+        }}},
+        {"name": "all employees", "explain": {"find": "users", "filter": {"role": "employee"}}},
+        {"name": "skill by user and name", "explain": {"find": "skills", "filter": {"user_id": {"$in": [user_key, "clerk"]}, "skill_name": "Python"}}},
+        {"name": "skills by users", "explain": {"find": "skills", "filter": {"user_id": {"$in": [user_key]}}}},
+        {"name": "skill index load", "explain": {"find": "skills", "filter": {}}, "full_scan": True},
+        {"name": "availability by user", "explain": {"find": "availability", "filter": {"user_id": {"$in": [user_key, "clerk"]}}}},
+        {"name": "availability by users", "explain": {
+            "find": "availability", "filter": {"user_id": {"$in": [user_key]}}, "sort": {"available_from": 1},
+        }},
+        {"name": "availability covering range from its start", "explain": {"find": "availability", "filter": {
+            "available_from": {"$lte": now}, "available_to": {"$gte": now},
+        }, "hint": COVERING_FROM_INDEX}},
+        {"name": "availability covering range from its end", "explain": {"find": "availability", "filter": {
+            "available_from": {"$lte": now}, "available_to": {"$gte": now},
+        }, "hint": COVERING_TO_INDEX}},
+        {"name": "availability span", "explain": {
+            "find": "availability", "filter": {}, "projection": {"_id": 0, "available_to": 1}, "sort": {"available_to": -1}, "limit": 1,
+        }},
+        {"name": "tasks by supervisor", "explain": {
+            "find": "tasks", "filter": {"supervisor_id": "clerk", "_id": {"$gt": some_id}}, "sort": {"_id": 1},
+        }},
+        {"name": "tasks by assignee", "explain": {
+            "find": "tasks", "filter": {"assigned_to": user_key, "_id": {"$gt": some_id}}, "sort": {"_id": 1},
+        }},
+        {"name": "task summary", "explain": {"aggregate": "tasks", "cursor": {}, "pipeline": summary_pipeline("clerk", now)}},
+        {"name": "completed task recount", "explain": {"aggregate": "tasks", "cursor": {}, "pipeline": [
+            {"$match": {"status": "completed"}},
+            {"$group": {"_id": "$supervisor_id", "count": {"$sum": 1}}},
+        ]}, "full_scan": True},
+        {"name": "pending tasks", "explain": {"find": "tasks", "filter": {"status": "pending", "assigned_to": None}}},
+        {"name": "open task recount", "explain": {"aggregate": "tasks", "cursor": {}, "pipeline": [
+            {"$match": {"assigned_to": {"$ne": None}, "status": {"$ne": "completed"}}},
+            {"$group": {"_id": "$assigned_to", "count": {"$sum": 1}}},
+        ]}, "full_scan": True},
+        {"name": "top candidates", "explain": {
+            "find": "candidate_scores", "filter": {"task_id": str(some_id)}, "sort": {"score": -1}, "limit": 10,
+        }},
+        {"name": "candidate score changes", "explain": {"find": "skills", "filter": {"updated_at": {"$gt": now}}}},
+        {"name": "unfinished assignment jobs", "explain": {
+            "find": "assignment_jobs", "filter": {"status": {"$in": ["queued", "running"]}},
+        }},
+    ]
+
+async def ensure_indexes(repository: Repository) -> Dict[str, List[str]]:
+    """
+    Create any missing required index. Existing indexes with the same name and
+    keys are left alone by the server. A failure on one collection (e.g. a
+    unique index over duplicate data) is logged and does not stop the others.
+    Returns the index names confirmed per collection.
+    """
+    confirmed = {}
+    for collection_name, indexes in REQUIRED_INDEXES.items():
+        try:
+            confirmed[collection_name] = await repository.collection(collection_name).create_indexes(indexes)
+        except OperationFailure as e:
+            logger.error(f"Could not create indexes on {collection_name}: {e}")
+    return confirmed
+
+def _plan_stages(plan) -> List[str]:
+    """All stage names in an explain plan tree."""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(_plan_stages(value))
+    return stages
+
+def _winning_plans(explain: dict) -> List[dict]:
+    """Winning plans of a find explain, or of each cursor stage of an aggregate explain."""
+    if "queryPlanner" in explain:
+        return [explain["queryPlanner"]["winningPlan"]]
+    plans = []
+    for stage in explain.get("stages", []):
+        cursor = stage.get("$cursor")
+        if cursor and "queryPlanner" in cursor:
+            plans.append(cursor["queryPlanner"]["winningPlan"])
+    return plans
+
+async def audit_query_plans(repository: Repository) -> List[dict]:
+    """Explain every query shape and report its plan stages, flagging unexpected COLLSCANs."""
+    report = []
+    for shape in query_shapes():
+        try:
+            explain = await repository.database.command({"explain": shape["explain"], "verbosity": "queryPlanner"})
+        except OperationFailure as e:
+            report.append({"name": shape["name"], "error": str(e)})
+            continue
+        stages = []
+        for plan in _winning_plans(explain):
+            stages.extend(_plan_stages(plan))
+        collscan = "COLLSCAN" in stages
+        report.append({
+            "name": shape["name"],
+            "collection": shape["explain"].get("find") or shape["explain"].get("aggregate"),
+            "stages": stages,
+            "collscan": collscan,
+            "flagged": collscan and not shape.get("full_scan", False),
+        })
+    return report
+
+async def _main(create: bool):
+    from dotenv import load_dotenv
+    from ..services.repository import DEFAULT_DB_NAME, create_client
+
+    load_dotenv()
+    client = create_client()
+    repository = Repository(client[os.getenv("MONGO_DB_NAME", DEFAULT_DB_NAME)])
+    try:
+        if create:
+            for collection_name, names in (await ensure_indexes(repository)).items():
+                print(f"{collection_name}: {', '.join(names)}")
+        report = await audit_query_plans(repository)
+    finally:
+        client.close()
+
+    flagged = 0
+    for entry in report:
+        if "error" in entry:
+            print(f"ERROR     {entry['name']}: {entry['error']}")
+            continue
+        status = "COLLSCAN" if entry["flagged"] else "ok"
+        flagged += entry["flagged"]
+        print(f"{status:<9} {entry['name']} ({entry['collection']}): {' > '.join(entry['stages'])}")
+    return flagged
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit MongoDB query plans for the API's query shapes.")
+    parser.add_argument("--create", action="store_true", help="Create the required indexes before auditing")
+    args = parser.parse_args()
+    flagged = asyncio.run(_main(args.create))
+    if flagged:
+        raise SystemExit(f"{flagged} query shape(s) fall back to a collection scan")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+# backend/app/services/inference_client.py
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from ..services.cache import LRUCache
+from ..services.metrics import inference_rows
+from ..services.scoring import get_scorer
+
+def model_key(scorer) -> str:
+    return getattr(scorer, "model_key", None) or f"{type(scorer).__name__}:{id(scorer)}"
+
+class ScoreMemo:
+    """
+    Scores already returned by the backend, keyed on the feature row.
+    compute_features emits few distinct rows (ratios of small integers, means
+    of 1-5 levels, overlap mostly 0 or 1), so after warm-up most rows never
+    reach the endpoint. Rows are rounded to decimals places, and the overlap
+    feature optionally to a multiple of overlap_step, before lookup and
+    before scoring, so a memoized score is exactly what the backend returns
+    for that key. Entries are dropped when the scorer's model_key changes and
+    expire after ttl seconds, which bounds staleness after a redeploy behind
+    the same endpoint name.
+    """
+
+    def __init__(self, maxsize: int = 100000, ttl: float = 3600.0, overlap_step: float = 0.0, decimals: int = 6):
+        self.cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.overlap_step = overlap_step
+        self.decimals = decimals
+        self.model_key: Optional[str] = None
+        self.invalidations = 0
+        self.rows = 0
+        self.rows_scored = 0
+
+    def bind(self, key: str):
+        """Forget every score if the model changed since the last call."""
+        if key != self.model_key:
+            if self.model_key is not None:
+                self.invalidations += 1
+            self.cache.clear()
+            self.model_key = key
+
+    def quantize(self, rows: np.ndarray) -> np.ndarray:
+        rows = np.round(rows, self.decimals)
+        if self.overlap_step:
+            rows[:, 1] = np.round(np.round(rows[:, 1] / self.overlap_step) * self.overlap_step, self.decimals)
+        return rows
+
+    def stats(self) -> dict:
+        return {
+            **self.cache.stats(),
+            "model_key": self.model_key,
+            "overlap_step": self.overlap_step,
+            "invalidations": self.invalidations,
+            "rows": self.rows,
+            "rows_scored": self.rows_scored,
+            "row_hit_rate": 1 - self.rows_scored / self.rows if self.rows else 0.0,
+        }
+
+class InferenceClient:
+    """
+    Async front for a synchronous scorer.
+    Feature rows from concurrent callers are coalesced into one backend call
+    when they arrive within max_wait seconds of each other (or as soon as
+    max_batch_rows rows are queued). Blocking backends run on a dedicated
+    thread pool so the event loop is never held for a network round trip,
+    at most max_concurrency backend calls are in flight at once, and larger
+    batches (e.g. a whole tasks x employees matrix) are sent as requests of
+    at most max_batch_rows rows, each with its own timeout.
+    Each caller gets back the slice of scores for its own rows.
+    With a memo, rows of blocking (remote) backends are deduplicated and only
+    rows the memo has not seen are sent; the in-process local scorer is
+    cheaper than the lookups and bypasses it.
+    """
+
+    def __init__(
+        self,
+        scorer,
+        max_batch_rows: int = 1000,
+        max_wait: float = 0.005,
+        max_concurrency: int = 4,
+        timeout: float = 10.0,
+        memo: Optional[ScoreMemo] = None,
+    ):
+        self.scorer = scorer
+        self.memo = memo
+        self.max_batch_rows = max_batch_rows
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="inference")
+        self._pending: List[Tuple[np.ndarray, asyncio.Future]] = []
+        self._pending_rows = 0
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._running = set()
+        self.batches = 0
+        self.rows = 0
+
+    async def score(self, features: Sequence[Sequence[float]]) -> np.ndarray:
+        """Score feature rows, sharing the backend call with concurrent callers."""
+        rows = np.asarray(features, dtype=np.float64).reshape(-1, 3)
+        if rows.shape[0] == 0:
+            return np.zeros(0)
+        if self.memo is None or not getattr(self.scorer, "blocking", True):
+            inference_rows.inc(rows.shape[0], source="backend")
+            return await self._score_rows(rows)
+        return await self._score_memoized(rows)
+
+    async def _score_memoized(self, rows: np.ndarray) -> np.ndarray:
+        memo = self.memo
+        memo.bind(model_key(self.scorer))
+        unique, inverse = np.unique(memo.quantize(rows), axis=0, return_inverse=True)
+        keys = [tuple(row) for row in unique.tolist()]
+        scores = np.empty(len(keys))
+        missing = []
+        for i, key in enumerate(keys):
+            score = memo.cache.get(key)
+            if score is None:
+                missing.append(i)
+            else:
+                scores[i] = score
+        if missing:
+            bound_to = memo.model_key
+            fresh = await self._score_rows(unique[missing])
+            scores[missing] = fresh
+            # Skip storing if the model was swapped while this batch was in flight
+            if memo.model_key == bound_to:
+                for i, score in zip(missing, fresh.tolist()):
+                    memo.cache.put(keys[i], score)
+        memo.rows += rows.shape[0]
+        memo.rows_scored += len(missing)
+        inference_rows.inc(rows.shape[0] - len(missing), source="memo")
+        inference_rows.inc(len(missing), source="backend")
+        return scores[inverse.reshape(-1)]
+
+    async def _score_rows(self, rows: np.ndarray) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((rows, future))
+        self._pending_rows += rows.shape[0]
+        if self._pending_rows >= self.max_batch_rows:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+        # One timeout per backend request the rows may be split into, plus one for queueing
+        requests = -(-rows.shape[0] // self.max_batch_rows)
+        return await asyncio.wait_for(future, self.timeout * (requests + 1))
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending, self._pending_rows = self._pending, [], 0
+        if batch:
+            # Hold a reference so the batch task is not garbage collected mid-flight
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch: List[Tuple[np.ndarray, asyncio.Future]]):
+        # Callers that already timed out do not need scoring
+        batch = [(rows, future) for rows, future in batch if not future.done()]
+        if not batch:
+            return
+        matrix = np.concatenate([rows for rows, _ in batch])
+        # Remote endpoints cap the payload, so no request carries more than max_batch_rows rows
+        step = self.max_batch_rows if getattr(self.scorer, "blocking", True) else matrix.shape[0]
+        chunks = [matrix[lo:lo + step] for lo in range(0, matrix.shape[0], step)]
+        try:
+            scores = np.concatenate(await asyncio.gather(*(self._call_backend(chunk) for chunk in chunks)))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.batches += len(chunks)
+        self.rows += matrix.shape[0]
+
+        # Route each slice of scores back to its caller
+        offset = 0
+        for rows, future in batch:
+            if not future.done():
+                future.set_result(scores[offset:offset + rows.shape[0]])
+            offset += rows.shape[0]
+
+    async def _call_backend(self, matrix: np.ndarray) -> np.ndarray:
+        async with self._semaphore:
+            if getattr(self.scorer, "blocking", True):
+                loop = asyncio.get_running_loop()
+                scores = await asyncio.wait_for(
+                    loop.run_in_executor(self._executor, self.scorer.score, matrix), self.timeout
+                )
+            else:
+                scores = self.scorer.score(matrix)
+        scores = np.asarray(scores, dtype=np.float64)
+        if scores.shape[0] != matrix.shape[0]:
+            raise RuntimeError(f"Scorer returned {scores.shape[0]} scores for {matrix.shape[0]} rows")
+        return scores
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+_client: Optional[InferenceClient] = None
+
+def create_score_memo() -> Optional[ScoreMemo]:
+    """Memo configured by SCORE_MEMO_SIZE (0 disables it), SCORE_MEMO_TTL and SCORE_MEMO_OVERLAP_STEP."""
+    maxsize = int(os.getenv("SCORE_MEMO_SIZE", "100000"))
+    if maxsize <= 0:
+        return None
+    return ScoreMemo(
+        maxsize=maxsize,
+        ttl=float(os.getenv("SCORE_MEMO_TTL", "3600")),
+        overlap_step=float(os.getenv("SCORE_MEMO_OVERLAP_STEP", "0")),
+    )
+
+def get_inference_client() -> InferenceClient:
+    """Return the shared inference client for the configured scorer, creating it on first use."""
+    global _client
+    scorer = get_scorer()
+    if _client is None:
+        _client = InferenceClient(
+            scorer,
+            max_batch_rows=int(os.getenv("INFERENCE_BATCH_ROWS", "1000")),
+            max_wait=float(os.getenv("INFERENCE_BATCH_WAIT_MS", "5")) / 1000,
+            max_concurrency=int(os.getenv("INFERENCE_MAX_CONCURRENCY", "4")),
+            timeout=float(os.getenv("INFERENCE_TIMEOUT", "10")),
+            memo=create_score_memo(),
+        )
+    elif _client.scorer is not scorer:
+        # The backend was rebuilt (scorers.reset() or a new SCORER_BACKEND); the memo notices the new model_key
+        _client.scorer = scorer
+    return _client
+
+def clear_score_memo():
+    if _client is not None and _client.memo is not None:
+        _client.memo.cache.clear()
+
+def score_memo_stats() -> Optional[dict]:
+    """Memo statistics, or None before the first scoring call or when the memo is disabled."""
+    if _client is None or _client.memo is None:
+        return None
+    return _client.memo.stats()
+
+def close_inference_client():
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
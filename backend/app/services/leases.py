@@ -0,0 +1,61 @@
+# backend/app/services/leases.py
+"""
+Short named leases in the leases collection, for read-modify-write
+sequences that must not interleave across workers or hosts (e.g. merging
+one user's availability windows).
+
+A lease is a {"_id": name, "token", "expires_at"} document. Taking it is a
+conditional upsert that only matches an expired lease, so exactly one caller
+wins; the others back off and retry until LEASE_WAIT seconds have passed.
+expires_at frees the lease if its holder dies, so keep the protected work
+well under LEASE_TTL.
+"""
+import asyncio
+import os
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Iterable, Optional
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+from ..services.repository import Repository, get_repository
+
+LEASE_TTL = float(os.getenv("LEASE_TTL", "10"))
+LEASE_WAIT = float(os.getenv("LEASE_WAIT", "5"))
+
+class LeaseBusy(Exception):
+    """Another caller held the lease for longer than the wait allowed."""
+
+async def acquire_lease(name: str, ttl: float = LEASE_TTL, wait: float = LEASE_WAIT, repo: Optional[Repository] = None) -> ObjectId:
+    """Take the lease, waiting up to `wait` seconds. Returns the token release_lease needs."""
+    collection = (repo or get_repository()).leases
+    token = ObjectId()
+    deadline = time.monotonic() + wait
+    delay = 0.005
+    while True:
+        now = time.time()
+        try:
+            await collection.update_one(
+                {"_id": name, "expires_at": {"$lt": now}},
+                {"$set": {"token": token, "expires_at": now + ttl}},
+                upsert=True,
+            )
+            return token
+        except DuplicateKeyError:
+            # Held and not expired, so the upsert tried to insert a second document
+            if time.monotonic() + delay > deadline:
+                raise LeaseBusy(name)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 0.1)
+
+async def release_lease(name: str, token: ObjectId, repo: Optional[Repository] = None):
+    # The token check keeps a holder that overran its TTL from freeing someone else's lease
+    await (repo or get_repository()).leases.delete_one({"_id": name, "token": token})
+
+@asynccontextmanager
+async def leases(names: Iterable[str], ttl: float = LEASE_TTL, wait: float = LEASE_WAIT, repo: Optional[Repository] = None):
+    """Hold every named lease for the duration of the block. Sorted order keeps two callers from each waiting on the other."""
+    async with AsyncExitStack() as stack:
+        for name in sorted(set(names)):
+            token = await acquire_lease(name, ttl, wait, repo)
+            stack.push_async_callback(release_lease, name, token, repo)
+        yield
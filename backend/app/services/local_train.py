@@ -0,0 +1,45 @@
+# backend/app/services/local_train.py
+"""
+Fit the 3-feature linear model locally, without S3 or SageMaker.
+
+    python -m app.services.local_train --data training_data.csv --out model.json
+    python -m app.services.local_train --generate --employees 5000 --tasks 4000 --format npy --data training_data_npy
+
+Point LOCAL_MODEL_PATH at the output and set SCORER_BACKEND=local to serve it.
+"""
+import argparse
+import os
+import time
+from ..services.scoring import LocalLinearScorer
+from ..services.training_data import generate, read_chunks
+
+def train(data_path, model_path, chunk_rows: int = 1_000_000) -> LocalLinearScorer:
+    scorer = LocalLinearScorer.fit_chunks(read_chunks(data_path, chunk_rows))
+    scorer.save(model_path)
+    return scorer
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the linear allocation model locally.")
+    parser.add_argument("--data", default=os.getenv("TRAINING_DATA_PATH", "training_data.csv"))
+    parser.add_argument("--out", default=os.getenv("LOCAL_MODEL_PATH", "model.json"))
+    parser.add_argument("--chunk-rows", type=int, default=1_000_000)
+    parser.add_argument("--generate", action="store_true", help="Generate the training data first")
+    parser.add_argument("--employees", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=100)
+    parser.add_argument("--skills", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=["csv", "npy"], default="csv")
+    args = parser.parse_args()
+
+    if args.generate:
+        started = time.perf_counter()
+        rows = generate(args.data, args.employees, args.tasks, args.skills, args.seed, fmt=args.format)
+        print(f"Generated {rows} rows in {time.perf_counter() - started:.1f}s: {args.data}")
+
+    started = time.perf_counter()
+    scorer = train(args.data, args.out, args.chunk_rows)
+    print(f"Fitted in {time.perf_counter() - started:.1f}s: weights={scorer.weights.tolist()} bias={scorer.bias}")
+    print(f"Model saved: {args.out}")
+
+if __name__ == "__main__":
+    main()
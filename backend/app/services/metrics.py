@@ -0,0 +1,242 @@
+# backend/app/services/metrics.py
+"""
+In-process metrics rendered in the Prometheus text format on GET /metrics.
+Counters, gauges and histograms are keyed by label values and guarded by a
+lock, since the Mongo command listener reports from the driver's threads.
+"""
+import bisect
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in self._values.items()]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (last one is +Inf), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter("http_requests_total", "HTTP requests by route and status.", ["method", "route", "status"])
+http_request_duration = registry.histogram("http_request_duration_seconds", "HTTP request latency by route.", ["method", "route"])
+http_requests_in_flight = registry.gauge("http_requests_in_flight", "HTTP requests currently being served.")
+http_mongo_operations = registry.counter("http_mongo_operations_total", "MongoDB commands issued while serving each route.", ["method", "route"])
+mongo_commands = registry.counter("mongo_commands_total", "MongoDB commands started.", ["command", "collection"])
+mongo_command_failures = registry.counter("mongo_command_failures_total", "MongoDB commands that failed.", ["command"])
+mongo_command_duration = registry.histogram("mongo_command_duration_seconds", "MongoDB command latency.", ["command"])
+inference_rows = registry.counter("inference_rows_total", "Feature rows scored, by whether the score came from the memo or the backend.", ["source"])
+assignment_claims = registry.counter("assignment_claims_total", "Task claim attempts, by outcome (claimed, employee_full, task_taken).", ["outcome"])
+assignment_stage_duration = registry.histogram("assignment_stage_duration_seconds", "Time spent in each stage of assign_task.", ["stage"])
+
+# Mongo command count of the request being served; Motor copies the context into its worker threads
+_request_mongo_operations: ContextVar[Optional[list]] = ContextVar("request_mongo_operations", default=None)
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Counts and times every command the driver sends, and attributes it to the current request."""
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        mongo_commands.inc(command=event.command_name, collection=collection if isinstance(collection, str) else "")
+        operations = _request_mongo_operations.get()
+        if operations is not None:
+            operations[0] += 1
+
+    def succeeded(self, event):
+        mongo_command_duration.observe(event.duration_micros / 1e6, command=event.command_name)
+
+    def failed(self, event):
+        mongo_command_duration.observe(event.duration_micros / 1e6, command=event.command_name)
+        mongo_command_failures.inc(command=event.command_name)
+
+mongo_command_metrics = MongoCommandMetrics()
+
+class StageTimer:
+    """Times the named stages of one operation into assignment_stage_duration (or another histogram)."""
+
+    def __init__(self, histogram: Histogram = assignment_stage_duration):
+        self.histogram = histogram
+        self.timings: Dict[str, float] = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.timings[name] = self.timings.get(name, 0.0) + elapsed
+            self.histogram.observe(elapsed, stage=name)
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self._started
+
+    def summary(self) -> str:
+        """Stage timings in milliseconds, for log lines."""
+        stages = " ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.timings.items())
+        return f"total={self.total * 1000:.1f}ms {stages}"
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route latency, status counts, in-flight
+    requests and the MongoDB commands each request issued. Requests slower
+    than slow_request_ms (SLOW_REQUEST_MS, off when unset) are logged.
+    """
+
+    def __init__(self, app, slow_request_ms: Optional[float] = None):
+        self.app = app
+        if slow_request_ms is None and os.getenv("SLOW_REQUEST_MS"):
+            slow_request_ms = float(os.getenv("SLOW_REQUEST_MS"))
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        operations = [0]
+        token = _request_mongo_operations.set(operations)
+        http_requests_in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_flight.dec()
+            _request_mongo_operations.reset(token)
+            # Label by route template rather than raw path to keep the series bounded
+            route = scope.get("route")
+            route = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+            http_requests.inc(method=method, route=route, status=status[0])
+            http_request_duration.observe(elapsed, method=method, route=route)
+            http_mongo_operations.inc(operations[0], method=method, route=route)
+            if self.slow_request_ms is not None and elapsed * 1000 >= self.slow_request_ms:
+                logger.warning(
+                    f"Slow request: {method} {scope['path']} -> {status[0]} in {elapsed * 1000:.1f} ms "
+                    f"({operations[0]} MongoDB commands)"
+                )
@@ -0,0 +1,51 @@
+# backend/app/services/process_lock.py
+import logging
+import os
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # No flock on Windows; every process there acts as the holder
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+class ProcessLock:
+    """
+    Non-blocking exclusive lock on a file, used to pick the one worker process
+    on a host that runs a singleton background job. The operating system
+    releases it when the holder exits, so a replacement worker can take over.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self) -> bool:
+        if self._fd is not None:
+            return True
+        if fcntl is None:
+            return True
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
@@ -0,0 +1,121 @@
+# backend/app/services/profile_loader.py
+import os
+from collections import defaultdict
+from typing import Iterable, List, Optional
+from pymongo.collection import Collection
+from bson.objectid import ObjectId
+from ..services.repository import get_repository
+from ..services.availability_index import AvailabilityIntervals
+from ..services.cache import LRUCache
+from ..services.identity import resolve_user
+from ..services.versions import availability_resource, current_etags, skills_resource
+
+# Composed profiles, stored under both the ObjectId string and the clerk_id.
+# Each records the skills and availability ETags read before its data, so
+# routes that answer with an ETag can tell a profile older than that ETag.
+profile_cache = LRUCache(
+    maxsize=int(os.getenv("PROFILE_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("PROFILE_CACHE_TTL", "60")),
+)
+
+def invalidate_profile(user_key: str):
+    """Drop a cached profile by either of its keys. Called by the user, skill and availability write routes."""
+    profile = profile_cache.pop(user_key)
+    if profile is not None:
+        profile_cache.pop(profile["id"])
+        if profile.get("clerk_id"):
+            profile_cache.pop(profile["clerk_id"])
+
+def _cache_profile(profile: dict):
+    profile_cache.put(profile["id"], profile)
+    if profile.get("clerk_id"):
+        profile_cache.put(profile["clerk_id"], profile)
+
+async def _compose_profiles(users: List[dict]) -> List[dict]:
+    """Attach skills and availability to user documents with one query per collection."""
+    # Skills and availability may reference a user by ObjectId string or clerk_id
+    owner_by_key = {}
+    for user in users:
+        user_id = str(user["_id"])
+        owner_by_key[user_id] = user_id
+        if user.get("clerk_id"):
+            owner_by_key[user["clerk_id"]] = user_id
+    keys = list(owner_by_key)
+
+    repository = get_repository()
+    # Read the stamps first: the data below is then at least as new as they say
+    user_ids = [str(user["_id"]) for user in users]
+    versions = await current_etags(
+        [skills_resource(user_id) for user_id in user_ids] + [availability_resource(user_id) for user_id in user_ids], repository,
+    )
+    skill_collection: Collection = repository.skills
+    availability_collection: Collection = repository.availability
+    skills = await skill_collection.find({"user_id": {"$in": keys}}).to_list(None)
+    availability = await availability_collection.find({"user_id": {"$in": keys}}).sort("available_from", 1).to_list(None)
+
+    skills_by_owner = defaultdict(list)
+    for skill in skills:
+        skills_by_owner[owner_by_key[skill["user_id"]]].append(skill)
+    availability_by_owner = defaultdict(list)
+    for avail in availability:
+        availability_by_owner[owner_by_key[avail["user_id"]]].append(avail)
+
+    profiles = []
+    for user in users:
+        user_id = str(user["_id"])
+        profile = {
+            "id": user_id,
+            "clerk_id": user.get("clerk_id"),
+            "skills": skills_by_owner[user_id],
+            "availability": availability_by_owner[user_id],
+            "intervals": AvailabilityIntervals.from_documents(availability_by_owner[user_id]),
+            "versions": {
+                resource: versions[resource] for resource in (skills_resource(user_id), availability_resource(user_id))
+            },
+        }
+        _cache_profile(profile)
+        profiles.append(profile)
+    return profiles
+
+async def load_employee_profiles(user_keys: Optional[Iterable[str]] = None) -> List[dict]:
+    """
+    Load employees together with their skills and availability.
+    Profiles come from profile_cache when present; the misses are composed
+    with one query per collection (skills, availability) regardless of
+    headcount, and grouped in memory.
+    When user_keys is given, only employees whose ObjectId string or clerk_id
+    is in it are loaded.
+    Returns records shaped like {"id", "clerk_id", "skills", "availability", "intervals", "versions"},
+    ready to be passed to compute_features.
+    """
+    user_collection: Collection = get_repository().users
+    query = {"role": "employee"}
+    if user_keys is not None:
+        user_keys = list(user_keys)
+        object_ids = [ObjectId(key) for key in user_keys if ObjectId.is_valid(key)]
+        query["$or"] = [{"_id": {"$in": object_ids}}, {"clerk_id": {"$in": user_keys}}]
+    employees = await user_collection.find(query, {"_id": 1, "clerk_id": 1}).to_list(None)
+    if not employees:
+        return []
+
+    profiles = [profile_cache.get(str(emp["_id"])) for emp in employees]
+    misses = [emp for emp, profile in zip(employees, profiles) if profile is None]
+    if misses:
+        composed = iter(await _compose_profiles(misses))
+        profiles = [profile if profile is not None else next(composed) for profile in profiles]
+    return profiles
+
+async def load_user_profile(user_key: str, versions: Optional[dict] = None) -> Optional[dict]:
+    """
+    Load one user's profile by ObjectId string or clerk_id, using the cache.
+    versions ({resource: etag}, as from current_etag) rejects a cached profile
+    loaded at any other version, e.g. one another worker has not invalidated
+    yet, so a body is never served under an ETag it does not match.
+    """
+    profile = profile_cache.get(user_key)
+    if profile is not None and all(profile["versions"].get(resource) == etag for resource, etag in (versions or {}).items()):
+        return profile
+    user = await resolve_user(user_key)
+    if not user:
+        return None
+    return (await _compose_profiles([user]))[0]
@@ -0,0 +1,71 @@
+# backend/app/services/repository.py
+import os
+from typing import Optional
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection, AsyncIOMotorDatabase
+from ..services.metrics import mongo_command_metrics
+
+DEFAULT_DB_NAME = "task_allocation_db"
+
+def get_pool_settings() -> dict:
+    """Motor connection pool settings, read from the environment."""
+    settings = {
+        "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "100")),
+        "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+        "maxIdleTimeMS": os.getenv("MONGO_MAX_IDLE_TIME_MS"),
+        "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "30000")),
+        "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "20000")),
+        "socketTimeoutMS": os.getenv("MONGO_SOCKET_TIMEOUT_MS"),
+        "waitQueueTimeoutMS": os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS"),
+    }
+    # Unset optional timeouts keep the driver defaults
+    return {key: int(value) for key, value in settings.items() if value is not None}
+
+def create_client(uri: Optional[str] = None, **overrides) -> AsyncIOMotorClient:
+    """Create the Motor client with the configured pool settings and command metrics."""
+    settings = get_pool_settings()
+    settings["event_listeners"] = [mongo_command_metrics]
+    settings.update(overrides)
+    return AsyncIOMotorClient(uri or os.getenv("MONGO_URL"), **settings)
+
+class Repository:
+    """Pre-resolved collection handles for the task allocation database."""
+
+    def __init__(self, database: AsyncIOMotorDatabase):
+        self.database = database
+        self.users: AsyncIOMotorCollection = database["users"]
+        self.tasks: AsyncIOMotorCollection = database["tasks"]
+        self.skills: AsyncIOMotorCollection = database["skills"]
+        self.availability: AsyncIOMotorCollection = database["availability"]
+        self.assignment_jobs: AsyncIOMotorCollection = database["assignment_jobs"]
+        self.candidate_scores: AsyncIOMotorCollection = database["candidate_scores"]
+        self.resource_versions: AsyncIOMotorCollection = database["resource_versions"]
+        self.employee_load: AsyncIOMotorCollection = database["employee_load"]
+        self.leases: AsyncIOMotorCollection = database["leases"]
+        self.completed_tasks: AsyncIOMotorCollection = database["completed_tasks"]
+
+    @property
+    def client(self) -> AsyncIOMotorClient:
+        return self.database.client
+
+    def collection(self, name: str) -> AsyncIOMotorCollection:
+        return self.database[name]
+
+_repository: Optional[Repository] = None
+
+def init_repository(database: AsyncIOMotorDatabase) -> Repository:
+    """Install the repository used by routes and services. Called from the app lifespan."""
+    global _repository
+    _repository = Repository(database)
+    return _repository
+
+def close_repository():
+    global _repository
+    if _repository is not None:
+        _repository.client.close()
+        _repository = None
+
+def get_repository() -> Repository:
+    """FastAPI dependency (and plain accessor for services) returning the repository."""
+    if _repository is None:
+        raise RuntimeError("MongoDB client not initialized. Make sure the app lifespan has run.")
+    return _repository
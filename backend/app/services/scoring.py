@@ -0,0 +1,244 @@
+# backend/app/services/scoring.py
+import csv
+import json
+import os
+import threading
+import time
+from io import BytesIO, StringIO
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+DEFAULT_TRAINING_DATA = BACKEND_DIR / "training_data.csv"
+DEFAULT_ENDPOINT_FILE = BACKEND_DIR / "endpoint_name.txt"
+
+FEATURE_NAMES = ["skill_match_ratio", "availability_overlap", "avg_proficiency"]
+
+class SageMakerScorer:
+    """Scores feature rows by invoking the deployed linear-learner endpoint."""
+
+    name = "sagemaker"
+
+    def __init__(self, endpoint_name: Optional[str] = None, runtime=None):
+        if endpoint_name is None:
+            endpoint_name = os.getenv("SAGEMAKER_ENDPOINT_NAME")
+        if endpoint_name is None:
+            # Fall back to the file written by the training step
+            endpoint_file = os.getenv("SAGEMAKER_ENDPOINT_FILE", DEFAULT_ENDPOINT_FILE)
+            with open(endpoint_file, "r") as f:
+                endpoint_name = f.read().strip()
+        self.endpoint_name = endpoint_name
+        if runtime is None:
+            import boto3
+            from botocore.config import Config
+
+            runtime = boto3.client("sagemaker-runtime", config=Config(
+                connect_timeout=float(os.getenv("SAGEMAKER_CONNECT_TIMEOUT", "5")),
+                read_timeout=float(os.getenv("SAGEMAKER_READ_TIMEOUT", "10")),
+                max_pool_connections=int(os.getenv("INFERENCE_MAX_CONCURRENCY", "4")),
+            ))
+        self.runtime = runtime
+
+    @property
+    def model_key(self) -> str:
+        """Identifies the model behind the scores, so memoized scores are dropped when it changes."""
+        return f"sagemaker:{self.endpoint_name}"
+
+    def score(self, features: Sequence[Sequence[float]]) -> np.ndarray:
+        # Prepare CSV for SageMaker batch inference
+        csv_buffer = StringIO()
+        writer = csv.writer(csv_buffer)
+        writer.writerows(features)
+
+        response = self.runtime.invoke_endpoint(
+            EndpointName=self.endpoint_name,
+            ContentType="text/csv",
+            Body=csv_buffer.getvalue()
+        )
+        body = response["Body"].read().decode("utf-8")
+        return np.array([float(score) for score in body.split("\n") if score])
+
+class LocalLinearScorer:
+    """Scores the whole feature matrix in-process with a single dot product."""
+
+    name = "local"
+    # Cheap enough to run on the event loop
+    blocking = False
+
+    def __init__(self, weights: Sequence[float], bias: float = 0.0):
+        self.weights = np.asarray(weights, dtype=np.float64)
+        self.bias = float(bias)
+        if self.weights.shape != (len(FEATURE_NAMES),):
+            raise ValueError(f"Expected {len(FEATURE_NAMES)} weights, got {self.weights.shape}")
+
+    @classmethod
+    def from_file(cls, path) -> "LocalLinearScorer":
+        """Load weights exported as {"weights": [...], "bias": ...}."""
+        with open(path, "r") as f:
+            model = json.load(f)
+        return cls(model["weights"], model.get("bias", 0.0))
+
+    @classmethod
+    def fit_chunks(cls, chunks: Iterable[np.ndarray]) -> "LocalLinearScorer":
+        """
+        Least-squares fit over (rows, features + target) chunks.
+        Only the normal equations are accumulated, so memory does not grow
+        with the number of rows.
+        """
+        size = len(FEATURE_NAMES) + 1
+        xtx = np.zeros((size, size))
+        xty = np.zeros(size)
+        for chunk in chunks:
+            # Append a column of ones so the bias is fitted alongside the weights
+            X = np.hstack([chunk[:, :-1], np.ones((chunk.shape[0], 1))])
+            xtx += X.T @ X
+            xty += X.T @ chunk[:, -1]
+        coef, *_ = np.linalg.lstsq(xtx, xty, rcond=None)
+        return cls(coef[:-1], coef[-1])
+
+    @classmethod
+    def fit_csv(cls, path=DEFAULT_TRAINING_DATA) -> "LocalLinearScorer":
+        """Fit the linear model on training data (CSV or npy column directory), streamed in chunks."""
+        from ..services.training_data import read_chunks
+
+        return cls.fit_chunks(read_chunks(path))
+
+    @property
+    def model_key(self) -> str:
+        return f"local:{self.weights.tolist()}:{self.bias}"
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump({"weights": self.weights.tolist(), "bias": self.bias}, f)
+
+    def score(self, features) -> np.ndarray:
+        matrix = np.asarray(features, dtype=np.float64)
+        if matrix.size == 0:
+            return np.zeros(0)
+        return matrix @ self.weights + self.bias
+
+class LocalEndpointRuntime:
+    """
+    Stand-in for the boto3 sagemaker-runtime client, answering invoke_endpoint
+    with a LocalLinearScorer. Lets SageMakerScorer and the inference client
+    be exercised without AWS; latency simulates the network round trip.
+    """
+
+    def __init__(self, scorer: Optional[LocalLinearScorer] = None, latency: float = 0.0):
+        self.scorer = scorer or LocalLinearScorer.fit_csv()
+        self.latency = latency
+        self.calls = 0
+
+    def invoke_endpoint(self, EndpointName: str, ContentType: str, Body: str) -> dict:
+        if ContentType != "text/csv":
+            raise ValueError(f"Unsupported content type: {ContentType}")
+        if self.latency:
+            time.sleep(self.latency)
+        self.calls += 1
+        rows = [[float(value) for value in line.split(",")] for line in Body.splitlines() if line]
+        scores = self.scorer.score(rows)
+        return {"Body": BytesIO("\n".join(repr(float(score)) for score in scores).encode("utf-8"))}
+
+def create_local_scorer() -> LocalLinearScorer:
+    """
+    Local backend: load LOCAL_MODEL_PATH when set, otherwise fit the weights
+    from TRAINING_DATA_PATH (training_data.csv by default).
+    """
+    model_path = os.getenv("LOCAL_MODEL_PATH")
+    if model_path:
+        return LocalLinearScorer.from_file(model_path)
+    return LocalLinearScorer.fit_csv(os.getenv("TRAINING_DATA_PATH", DEFAULT_TRAINING_DATA))
+
+class ScorerRegistry:
+    """
+    Named scorer backends, each built lazily on first use from a registered
+    factory. Nothing touches the network or the filesystem until a backend is
+    requested or explicitly warmed (e.g. from the FastAPI lifespan hook).
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], object]] = {}
+        self._instances: Dict[str, object] = {}
+        self._errors: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory: Callable[[], object]):
+        self._factories[name] = factory
+        self._instances.pop(name, None)
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._factories)
+
+    @property
+    def default(self) -> str:
+        """Backend selected by SCORER_BACKEND ("sagemaker" by default)."""
+        return os.getenv("SCORER_BACKEND", "sagemaker").lower()
+
+    def get(self, name: Optional[str] = None):
+        """Return the named (or default) backend, building it on first use."""
+        name = name or self.default
+        scorer = self._instances.get(name)
+        if scorer is not None:
+            return scorer
+        if name not in self._factories:
+            raise ValueError(f"Unknown scorer backend: {name}")
+        with self._lock:
+            scorer = self._instances.get(name)
+            if scorer is None:
+                try:
+                    scorer = self._factories[name]()
+                except Exception as e:
+                    self._errors[name] = str(e)
+                    raise
+                self._errors.pop(name, None)
+                self._instances[name] = scorer
+        return scorer
+
+    def warm(self, name: Optional[str] = None):
+        """Build the backend and push one row through it so the first request pays nothing."""
+        scorer = self.get(name)
+        scorer.score([[0.0] * len(FEATURE_NAMES)])
+        return scorer
+
+    def health(self, probe: bool = False) -> dict:
+        """
+        Report each backend's state. With probe, loaded backends also score a
+        dummy row and report the round-trip latency.
+        """
+        report = {}
+        for name in self._factories:
+            scorer = self._instances.get(name)
+            status = {"default": name == self.default, "loaded": scorer is not None}
+            if name in self._errors:
+                status["error"] = self._errors[name]
+            if probe and scorer is not None:
+                started = time.perf_counter()
+                try:
+                    scorer.score([[0.0] * len(FEATURE_NAMES)])
+                    status["healthy"] = True
+                except Exception as e:
+                    status["healthy"] = False
+                    status["error"] = str(e)
+                status["latency_ms"] = (time.perf_counter() - started) * 1000
+            report[name] = status
+        return report
+
+    def reset(self, name: Optional[str] = None):
+        """Drop built backends so they are rebuilt (e.g. after a redeploy) on next use."""
+        if name is None:
+            self._instances.clear()
+        else:
+            self._instances.pop(name, None)
+
+scorers = ScorerRegistry()
+scorers.register("sagemaker", SageMakerScorer)
+scorers.register("local", create_local_scorer)
+
+def get_scorer():
+    """Return the configured scorer, creating it on first use."""
+    return scorers.get()
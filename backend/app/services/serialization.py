@@ -0,0 +1,67 @@
+# backend/app/services/serialization.py
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the standard library encoder
+    orjson = None
+
+def _default(value: Any) -> Any:
+    """Encode the BSON values that JSON does not know about."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    """Render content (which may contain ObjectId and datetime values) as JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode("utf-8")
+
+class DocumentResponse(JSONResponse):
+    """JSON response for trusted database documents, rendered without re-validation."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+_MISSING = object()
+_field_specs: Dict[Type[BaseModel], List[Tuple[str, Any]]] = {}
+
+def _field_spec(model: Type[BaseModel]) -> List[Tuple[str, Any]]:
+    """Cached (name, default) pairs for a model's fields."""
+    spec = _field_specs.get(model)
+    if spec is None:
+        spec = [
+            (name, _MISSING if field.is_required() else field.get_default(call_default_factory=True))
+            for name, field in model.model_fields.items()
+        ]
+        _field_specs[model] = spec
+    return spec
+
+def serialize_document(document: dict, model: Optional[Type[BaseModel]] = None) -> dict:
+    """
+    Shape a database document for a response.
+    With a model, the result holds exactly the model's fields (defaults filled
+    in), matching what response_model would emit. Without one, _id is exposed
+    as id and every other field is kept.
+    """
+    if model is None:
+        result = {"id": document["_id"]} if "_id" in document else {}
+        result.update((key, value) for key, value in document.items() if key != "_id")
+        return result
+    result = {}
+    for name, default in _field_spec(model):
+        value = document.get(name, default)
+        if value is not _MISSING:
+            result[name] = value
+    return result
+
+def serialize_documents(documents: Iterable[dict], model: Optional[Type[BaseModel]] = None) -> List[dict]:
+    return [serialize_document(document, model) for document in documents]
@@ -0,0 +1,63 @@
+# backend/app/services/skill_index.py
+import asyncio
+import os
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, Set
+from pymongo.collection import Collection
+from ..services.repository import get_repository
+
+class SkillIndex:
+    """
+    In-memory inverted index from skill_name to the users holding it.
+    Users are keyed by the user_id stored on the skill document (ObjectId
+    string or clerk_id). The index is built from the skills collection on
+    first use, kept current by the skill write routes, and rebuilt after
+    max_age seconds so writes made by other processes are picked up.
+    """
+
+    def __init__(self, max_age: float = 300.0):
+        self.max_age = max_age
+        self._holders: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._loaded_at = None
+        self._lock = asyncio.Lock()
+
+    async def ensure_loaded(self):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.max_age:
+            return
+        async with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.max_age:
+                return
+            skill_collection: Collection = get_repository().skills
+            holders = defaultdict(dict)
+            projection = {"_id": 0, "user_id": 1, "skill_name": 1, "proficiency_level": 1}
+            async for skill in skill_collection.find({}, projection):
+                holders[skill["skill_name"]][skill["user_id"]] = skill["proficiency_level"]
+            self._holders = holders
+            self._loaded_at = time.monotonic()
+
+    def update(self, user_id: str, skill_name: str, proficiency_level: int):
+        """Record a skill write. Ignored until the index is loaded, since the load will include it."""
+        if self._loaded_at is not None:
+            self._holders[skill_name][user_id] = proficiency_level
+
+    def remove(self, user_id: str, skill_name: str):
+        if self._loaded_at is not None:
+            self._holders.get(skill_name, {}).pop(user_id, None)
+
+    def holders(self, skill_name: str) -> Dict[str, int]:
+        """Users holding skill_name, mapped to their proficiency level."""
+        return dict(self._holders.get(skill_name, {}))
+
+    async def candidates(self, required_skills: Iterable[str]) -> Set[str]:
+        """Users holding at least one of the required skills."""
+        await self.ensure_loaded()
+        result = set()
+        for skill_name in required_skills:
+            result.update(self._holders.get(skill_name, {}))
+        return result
+
+    def invalidate(self):
+        self._loaded_at = None
+
+skill_index = SkillIndex(max_age=float(os.getenv("SKILL_INDEX_MAX_AGE", "300")))
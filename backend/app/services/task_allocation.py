@@ -1,18 +1,25 @@
 # backend/app/services/task_allocation.py
-import csv
-from io import StringIO
-import boto3
-from datetime import datetime
+import logging
+import os
+from typing import List, Optional, Tuple
+import numpy as np
 from pymongo.collection import Collection
 from motor.motor_asyncio import AsyncIOMotorClient
 from bson.objectid import ObjectId
-from ..services.database import get_collection
+from ..services.repository import get_repository
+from ..services.availability_index import AvailabilityIntervals, to_timestamp
+from ..services.features import overlap_ratio, skill_features
+from ..services.profile_loader import load_employee_profiles
+from ..services.inference_client import get_inference_client
+from ..services.skill_index import skill_index
+from ..services.metrics import StageTimer
+from ..services.cache import LRUCache
+from ..services.scoring import FEATURE_NAMES
+from ..services.versions import bump_versions, task_resources
+from ..services.workload import CLAIMED, EMPLOYEE_CAPACITY, TASK_TAKEN, NoFreeCapacity, claim_task, load_counts
+from ..services.candidate_scores import count_candidates, stored_scores_enabled, top_candidates
 
-# Load SageMaker endpoint name (from training step)
-with open("../../endpoint_name.txt", "r") as f:
-    ENDPOINT_NAME = f.read().strip()
-
-runtime = boto3.client("sagemaker-runtime")
+logger = logging.getLogger(__name__)
 
 def compute_features(task: dict, employee: dict) -> list:
     """Compute features for a task-employee pair."""
@@ -27,62 +34,260 @@ def compute_features(task: dict, employee: dict) -> list:
         if skill_match_count > 0 else 0
     )
 
-    task_start = datetime.fromisoformat(task["start_date"])
-    task_end = datetime.fromisoformat(task["due_date"])
-    task_duration = (task_end - task_start).total_seconds()
-    availability_overlap = 0
-    for avail in employee["availability"]:
-        avail_start = datetime.fromisoformat(avail["available_from"])
-        avail_end = datetime.fromisoformat(avail["available_to"])
-        overlap_start = max(task_start, avail_start)
-        overlap_end = min(task_end, avail_end)
-        overlap = max(0, (overlap_end - overlap_start).total_seconds())
-        availability_overlap = max(availability_overlap, overlap / task_duration)
+    task_start = to_timestamp(task["start_date"])
+    task_end = to_timestamp(task["due_date"])
+    task_duration = task_end - task_start
+    intervals = employee.get("intervals")
+    if intervals is None:
+        intervals = AvailabilityIntervals.from_documents(employee["availability"])
+    availability_overlap = intervals.best_overlap(task_start, task_end) / task_duration
 
     return [skill_match_ratio, availability_overlap, avg_proficiency]
 
-async def assign_task(task_id: str):
-    """Assign a task to the most suitable employee using SageMaker."""
-    # Fetch task
-    task_collection: Collection = await get_collection("tasks")
-    task = await task_collection.find_one({"_id": ObjectId(task_id)})
-    if not task:
-        raise ValueError("Task not found")
+def compute_feature_matrix(tasks: List[dict], employees: List[dict], chunk_size: int = 256) -> np.ndarray:
+    """
+    Compute features for every task-employee pair at once.
+    Returns an array of shape (len(tasks), len(employees), 3) holding the same
+    values compute_features would produce for each pair.
+    """
+    features = np.zeros((len(tasks), len(employees), 3))
+    if not tasks or not employees:
+        return features
 
-    # Fetch employees
-    user_collection: Collection = await get_collection("users")
-    employees = await user_collection.find({"role": "employee"}).to_list(None)
-    if not employees:
-        raise ValueError("No employees available")
+    # Skill vocabulary restricted to what the tasks require
+    vocabulary = {}
+    for task in tasks:
+        for skill in task["required_skills"]:
+            vocabulary.setdefault(skill, len(vocabulary))
+    required = np.zeros((len(tasks), len(vocabulary)))
+    for i, task in enumerate(tasks):
+        for skill in task["required_skills"]:
+            required[i, vocabulary[skill]] = 1
+    has_skill = np.zeros((len(employees), len(vocabulary)))
+    proficiency = np.zeros((len(employees), len(vocabulary)))
+    for j, emp in enumerate(employees):
+        for skill in emp["skills"]:
+            k = vocabulary.get(skill["skill_name"])
+            if k is not None:
+                has_skill[j, k] = 1
+                proficiency[j, k] = skill["proficiency_level"]
+
+    features[:, :, 0], features[:, :, 2] = skill_features(required, has_skill, proficiency)
+
+    # Flatten all availability windows, remembering which employee owns each one
+    owners, window_start, window_end = [], [], []
+    for j, emp in enumerate(employees):
+        intervals = emp.get("intervals")
+        if intervals is None:
+            intervals = AvailabilityIntervals.from_documents(emp["availability"])
+        for start, end in intervals:
+            owners.append(j)
+            window_start.append(start)
+            window_end.append(end)
+    if not owners:
+        return features
+    # Windows are grouped by owner so the per-employee max is a single reduceat
+    owners = np.array(owners)
+    window_start = np.array(window_start)
+    window_end = np.array(window_end)
+    owner_ids, group_starts = np.unique(owners, return_index=True)
 
-    # Fetch skills and availability
-    skill_collection: Collection = await get_collection("skills")
-    availability_collection: Collection = await get_collection("availability")
-    employee_data = []
-    for emp in employees:
-        skills = await skill_collection.find({"user_id": str(emp["_id"])}).to_list(None)
-        availability = await availability_collection.find({"user_id": str(emp["_id"])}).to_list(None)
-        employee_data.append({"id": str(emp["_id"]), "skills": skills, "availability": availability})
+    task_start = np.array([to_timestamp(task["start_date"]) for task in tasks])
+    task_end = np.array([to_timestamp(task["due_date"]) for task in tasks])
+    # Process tasks in chunks so the tasks x windows matrix stays bounded
+    for lo in range(0, len(tasks), chunk_size):
+        hi = min(lo + chunk_size, len(tasks))
+        ratio = overlap_ratio(task_start[lo:hi, None], task_end[lo:hi, None], window_start, window_end)
+        features[lo:hi, owner_ids, 1] = np.maximum.reduceat(ratio, group_starts, axis=1)
+    return features
+
+# Recent per-task scoring results, so repeated candidate views do not re-run inference
+score_cache = LRUCache(
+    maxsize=int(os.getenv("SCORE_CACHE_SIZE", "1000")),
+    ttl=float(os.getenv("SCORE_CACHE_TTL", "30")),
+)
+
+async def score_task_candidates(task: dict, timer: Optional[StageTimer] = None) -> dict:
+    """
+    Score every candidate employee (those holding a required skill, or
+    everyone when nobody does) for a task document. Returns
+    {"employee_ids", "clerk_ids", "features" (n x 3 array), "scores" (n array)}
+    and stores it in score_cache under the task id.
+    """
+    timer = timer or StageTimer()
+
+    # Candidates must hold at least one required skill. This is a deliberate filter,
+    # not a shortcut: the scorers still give skill-less employees a score through
+    # availability and the intercept, but a task only goes to someone without any of
+    # its skills when nobody has one. candidate_scores stores the same cut.
+    with timer.stage("candidates"):
+        candidates = await skill_index.candidates(task["required_skills"])
+
+    # Fetch employees with their skills and availability in batched queries
+    with timer.stage("load_profiles"):
+        employee_data = await load_employee_profiles(candidates) if candidates else []
+        if not employee_data:
+            # Nobody matches on skills, so fall back to scoring everyone
+            employee_data = await load_employee_profiles()
+    if not employee_data:
+        raise ValueError("No employees available")
 
     # Compute features for each employee
-    features_list = [compute_features(task, emp) for emp in employee_data]
-
-    # Prepare CSV for SageMaker batch inference
-    csv_buffer = StringIO()
-    writer = csv.writer(csv_buffer)
-    writer.writerows(features_list)
-    csv_data = csv_buffer.getvalue()
-
-    # Call SageMaker endpoint
-    response = runtime.invoke_endpoint(
-        EndpointName=ENDPOINT_NAME,
-        ContentType="text/csv",
-        Body=csv_data
-    )
-    scores = [float(score) for score in response["Body"].read().decode("utf-8").split("\n") if score]
+    with timer.stage("features"):
+        features_list = [compute_features(task, emp) for emp in employee_data]
+
+    # Score all employees with the configured backend (SageMaker or local)
+    with timer.stage("score"):
+        scores = await get_inference_client().score(features_list)
+
+    result = {
+        "employee_ids": [emp["id"] for emp in employee_data],
+        "clerk_ids": [emp.get("clerk_id") for emp in employee_data],
+        "features": np.asarray(features_list, dtype=float),
+        "scores": np.asarray(scores, dtype=float),
+    }
+    score_cache.put(str(task["_id"]), result)
+    return result
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first. argpartition keeps this O(n + k log k)."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=int)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+async def rank_candidates(task_id: str, k: int) -> dict:
+    """
+    The k best employees for a task with their scores and feature breakdowns.
+    Served from score_cache when the task was scored within SCORE_CACHE_TTL
+    seconds, else from the materialized candidate_scores, and only scored
+    afresh when neither holds the task (e.g. CANDIDATE_SYNC=off, or a task
+    created since the last rescoring pass).
+    """
+    scored = score_cache.get(task_id)
+    if scored is not None:
+        source = "cache"
+    else:
+        rows = await top_candidates(task_id, k) if stored_scores_enabled() else []
+        if rows:
+            candidates = [
+                {
+                    "rank": rank,
+                    "employee_id": row["employee_id"],
+                    "clerk_id": row.get("clerk_id"),
+                    "score": row["score"],
+                    "features": dict(zip(FEATURE_NAMES, row["features"])),
+                }
+                for rank, row in enumerate(rows, start=1)
+            ]
+            scored_count = len(rows) if len(rows) < k else await count_candidates(task_id)
+            return {"task_id": task_id, "scored": scored_count, "cached": True, "source": "stored", "candidates": candidates}
+
+        task = await get_repository().tasks.find_one({"_id": ObjectId(task_id)})
+        if not task:
+            raise ValueError("Task not found")
+        scored = await score_task_candidates(task)
+        source = "scored"
+
+    candidates = []
+    for rank, i in enumerate(top_k_indices(scored["scores"], k), start=1):
+        candidates.append({
+            "rank": rank,
+            "employee_id": scored["employee_ids"][i],
+            "clerk_id": scored["clerk_ids"][i],
+            "score": float(scored["scores"][i]),
+            "features": dict(zip(FEATURE_NAMES, (float(value) for value in scored["features"][i]))),
+        })
+    return {"task_id": task_id, "scored": len(scored["scores"]), "cached": source == "cache", "source": source, "candidates": candidates}
+
+# Candidates whose load counters are fetched together before claiming
+CLAIM_BATCH = 32
+
+async def _claim_block(task: dict, block: List[str], capacity: int, timer: StageTimer) -> Tuple[Optional[str], bool]:
+    """
+    Try one block of candidates in rank order. Returns (employee_id, False)
+    on a claim, (None, True) when the task was taken meanwhile and
+    (None, False) when everyone in the block is full.
+    """
+    with timer.stage("update"):
+        # Skip candidates already known to be full without a failed claim each
+        counts = await load_counts(block)
+        for employee_id in block:
+            if counts.get(employee_id, 0) >= capacity:
+                continue
+            outcome = await claim_task(task["_id"], employee_id, capacity)
+            if outcome == CLAIMED:
+                return employee_id, False
+            if outcome == TASK_TAKEN:
+                return None, True
+    return None, False
+
+async def claim_best_candidate(task: dict, timer: Optional[StageTimer] = None, capacity: int = EMPLOYEE_CAPACITY) -> Optional[str]:
+    """
+    Claim the task for the best-ranked candidate with a free slot, walking
+    down the ranking when a candidate is full. The ranking is the task's
+    score_cache entry, else its stored candidate_scores rows (read CLAIM_BATCH
+    at a time), else a fresh score_task_candidates pass when no rows are
+    stored. Returns the employee id, or None if another worker assigned the
+    task first. Raises NoFreeCapacity when every candidate is full.
+    """
+    timer = timer or StageTimer()
+    task_id = str(task["_id"])
+    scored = score_cache.get(task_id)
+    if scored is None and stored_scores_enabled():
+        walked = 0
+        while True:
+            with timer.stage("candidates"):
+                rows = await top_candidates(task_id, CLAIM_BATCH, skip=walked)
+            if not rows:
+                break
+            employee_id, taken = await _claim_block(task, [row["employee_id"] for row in rows], capacity, timer)
+            if employee_id or taken:
+                return employee_id
+            walked += len(rows)
+        if walked:
+            raise NoFreeCapacity("Every candidate is at capacity")
+
+    if scored is None:
+        scored = await score_task_candidates(task, timer)
+    order = np.argsort(-scored["scores"], kind="stable")
+    for lo in range(0, len(order), CLAIM_BATCH):
+        block = [scored["employee_ids"][i] for i in order[lo:lo + CLAIM_BATCH]]
+        employee_id, taken = await _claim_block(task, block, capacity, timer)
+        if employee_id or taken:
+            return employee_id
+    raise NoFreeCapacity("Every candidate is at capacity")
+
+async def assign_task(task_id: str) -> str:
+    """
+    Assign a task to the most suitable employee with free capacity using the
+    configured scorer. Returns the employee id. Safe to run concurrently for
+    the same task: the first claim wins and the others return its assignee.
+    """
+    timer = StageTimer()
+
+    # Fetch task
+    task_collection: Collection = get_repository().tasks
+    with timer.stage("fetch_task"):
+        task = await task_collection.find_one({"_id": ObjectId(task_id)})
+    if not task:
+        raise ValueError("Task not found")
+    if task.get("assigned_to"):
+        # Assigned by a retried job, another worker or the supervisor
+        return task["assigned_to"]
+    if task.get("status") != "pending":
+        raise ValueError("Task is not pending")
 
-    # Assign to the highest-scoring employee
-    best_index = scores.index(max(scores))
-    best_employee_id = employee_data[best_index]["id"]
-    await task_collection.update_one({"_id": ObjectId(task_id)}, {"$set": {"assigned_to": best_employee_id}})
-    print(f"Task {task_id} assigned to employee {best_employee_id}")
\ No newline at end of file
+    # A recent or stored ranking is walked rather than re-running inference
+    employee_id = await claim_best_candidate(task, timer)
+    with timer.stage("update"):
+        if employee_id is None:
+            current = await task_collection.find_one({"_id": task["_id"]}, {"assigned_to": 1})
+            if current and current.get("assigned_to"):
+                logger.info(f"Task {task_id} was assigned to employee {current['assigned_to']} by another worker")
+                return current["assigned_to"]
+            raise ValueError("Task is not pending")
+        await bump_versions(task_resources({**task, "assigned_to": employee_id}))
+    logger.info(f"Task {task_id} assigned to employee {employee_id} ({timer.summary()})")
+    return employee_id
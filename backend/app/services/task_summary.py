@@ -0,0 +1,181 @@
+# backend/app/services/task_summary.py
+"""
+Dashboard summary of a supervisor's tasks: counts per status, overdue open
+tasks and open/overdue tasks per assignee.
+
+One $group over the supervisor's open (not completed) tasks does most of it.
+It only reads status, assigned_to and due_date, which the
+supervisor_id_status_assigned_to_due_date index holds, so the server answers
+from the index without fetching documents. Completed tasks pile up forever,
+so they are not scanned: completed_tasks holds one
+{"_id": supervisor_id, "count": n} counter per supervisor, kept by
+move_completed the way workload.py keeps employee_load. Recount with
+
+    python -m app.services.task_summary            # report counters that drifted
+    python -m app.services.task_summary --apply    # rewrite them
+
+Summaries are cached per supervisor together with the ETag of the
+supervisor's task list (see versions.py), so any task write shows up on the
+next request; the TTL only bounds how late a task turns overdue.
+"""
+import argparse
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Optional
+from pymongo import UpdateOne
+from ..services.availability_index import from_timestamp, to_timestamp
+from ..services.cache import LRUCache
+from ..services.repository import Repository, get_repository
+from ..services.versions import current_etag, supervisor_tasks_resource
+
+logger = logging.getLogger(__name__)
+
+summary_cache = LRUCache(
+    maxsize=int(os.getenv("TASK_SUMMARY_CACHE_SIZE", "1000")),
+    ttl=float(os.getenv("TASK_SUMMARY_CACHE_TTL", "30")),
+)
+
+def summary_pipeline(supervisor_id: str, now: datetime) -> list:
+    return [
+        {"$match": {"supervisor_id": supervisor_id, "status": {"$ne": "completed"}}},
+        {"$group": {
+            "_id": {"status": "$status", "assigned_to": "$assigned_to", "overdue": {"$lt": ["$due_date", now]}},
+            "count": {"$sum": 1},
+        }},
+    ]
+
+def build_summary(supervisor_id: str, groups: list, completed: int, now: datetime) -> dict:
+    """Fold the open tasks' (status, assignee, overdue) groups and the completed count into the dashboard counts."""
+    by_status = defaultdict(int)
+    if completed:
+        by_status["completed"] = completed
+    workload = defaultdict(lambda: {"open": 0, "overdue": 0})
+    overdue = unassigned = 0
+    for group in groups:
+        key, count = group["_id"], group["count"]
+        by_status[key.get("status")] += count
+        late = bool(key.get("overdue"))
+        overdue += count if late else 0
+        assignee = key.get("assigned_to")
+        if assignee:
+            workload[assignee]["open"] += count
+            workload[assignee]["overdue"] += count if late else 0
+        else:
+            unassigned += count
+    return {
+        "supervisor_id": supervisor_id,
+        "as_of": now,
+        "total": sum(by_status.values()),
+        "by_status": dict(by_status),
+        "overdue": overdue,
+        "unassigned": unassigned,
+        "workload": sorted(
+            ({"employee_id": employee_id, **counts} for employee_id, counts in workload.items()),
+            key=lambda row: (-row["open"], -row["overdue"], row["employee_id"]),
+        ),
+    }
+
+async def summarize_tasks(supervisor_id: str, now: Optional[datetime] = None) -> dict:
+    """Summary of a supervisor's tasks, served from summary_cache while their task list is unchanged."""
+    etag = await current_etag(supervisor_tasks_resource(supervisor_id))
+    cached = summary_cache.get(supervisor_id)
+    if cached is not None and cached[0] == etag:
+        return {**cached[1], "cached": True}
+
+    # Compare against due_date as MongoDB stores it: naive UTC
+    now = from_timestamp(to_timestamp(now or datetime.now(timezone.utc)))
+    repository = get_repository()
+    groups = await repository.tasks.aggregate(summary_pipeline(supervisor_id, now)).to_list(None)
+    counter = await repository.completed_tasks.find_one({"_id": supervisor_id})
+    summary = build_summary(supervisor_id, groups, counter["count"] if counter else 0, now)
+    summary_cache.put(supervisor_id, (etag, summary))
+    return {**summary, "cached": False}
+
+def completed_supervisor(task: Optional[dict]) -> Optional[str]:
+    """The supervisor whose completed count a task adds to, or None when it is not completed."""
+    if task and task.get("supervisor_id") and task.get("status") == "completed":
+        return task["supervisor_id"]
+    return None
+
+async def move_completed(before: Optional[dict], after: Optional[dict], repo: Optional[Repository] = None):
+    """
+    Update the completed counters after a task was created, completed,
+    reopened or moved to another supervisor. Call before bump_versions, so a
+    summary cached under the new ETag includes the change.
+    """
+    old, new = completed_supervisor(before), completed_supervisor(after)
+    if old == new:
+        return
+    operations = []
+    if old:
+        operations.append(UpdateOne({"_id": old, "count": {"$gt": 0}}, {"$inc": {"count": -1}}))
+    if new:
+        operations.append(UpdateOne({"_id": new}, {"$inc": {"count": 1}}, upsert=True))
+    await (repo or get_repository()).completed_tasks.bulk_write(operations, ordered=False)
+
+async def count_completed_tasks(repo: Repository) -> dict:
+    """Completed tasks per supervisor, counted from the tasks collection."""
+    pipeline = [
+        {"$match": {"status": "completed"}},
+        {"$group": {"_id": "$supervisor_id", "count": {"$sum": 1}}},
+    ]
+    return {doc["_id"]: doc["count"] async for doc in repo.tasks.aggregate(pipeline) if doc["_id"]}
+
+async def rebuild_completed_counters(repository: Repository, apply: bool = False) -> dict:
+    """
+    Compare every counter with a recount of the tasks collection and, when
+    apply is set, overwrite the ones that differ. Returns
+    {supervisor_id: (counter, recount)} for the counters that drifted.
+    """
+    actual = await count_completed_tasks(repository)
+    stored = {doc["_id"]: doc["count"] async for doc in repository.completed_tasks.find()}
+    drift = {
+        supervisor_id: (stored.get(supervisor_id, 0), actual.get(supervisor_id, 0))
+        for supervisor_id in set(actual) | set(stored)
+        if stored.get(supervisor_id, 0) != actual.get(supervisor_id, 0)
+    }
+    if apply and drift:
+        operations = [
+            UpdateOne({"_id": supervisor_id}, {"$set": {"count": count}}, upsert=True)
+            for supervisor_id, (_, count) in drift.items()
+        ]
+        await repository.completed_tasks.bulk_write(operations, ordered=False)
+        logger.info(f"Rewrote {len(drift)} completed task counter(s)")
+    return drift
+
+async def ensure_completed_counters(repository: Repository):
+    """Build the counters on first start, when tasks are already completed but nothing has been counted."""
+    if await repository.completed_tasks.find_one() is None:
+        drift = await rebuild_completed_counters(repository, apply=True)
+        if drift:
+            logger.info(f"Initialized completed task counters for {len(drift)} supervisor(s)")
+
+async def _main(apply: bool):
+    from dotenv import load_dotenv
+    from ..services.repository import DEFAULT_DB_NAME, create_client
+
+    load_dotenv()
+    client = create_client()
+    repository = Repository(client[os.getenv("MONGO_DB_NAME", DEFAULT_DB_NAME)])
+    try:
+        drift = await rebuild_completed_counters(repository, apply)
+    finally:
+        client.close()
+    for supervisor_id, (stored, actual) in sorted(drift.items()):
+        print(f"{supervisor_id}: counter={stored} completed={actual}")
+    if not drift:
+        print("All counters match")
+    elif not apply:
+        print("Dry run; pass --apply to write the changes")
+
+def main():
+    parser = argparse.ArgumentParser(description="Recount completed_tasks from the tasks collection.")
+    parser.add_argument("--apply", action="store_true", help="Rewrite counters that drifted instead of only reporting them")
+    args = parser.parse_args()
+    asyncio.run(_main(args.apply))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# backend/app/services/training_data.py
+"""
+Seeded synthetic training data for the task allocation model.
+
+Employees and tasks are drawn the same way sagemaker_train.py always did
+(1-5 skills at levels 1-5, 1-3 required skills, one 1-30 day availability
+window or task span starting within a year), but features and targets are
+computed with NumPy a chunk of tasks at a time and streamed to disk, so
+memory stays bounded by chunk_tasks x num_employees rather than the total
+number of pairs.
+
+    python -m app.services.training_data --employees 5000 --tasks 4000 --out training_data.csv
+    python -m app.services.training_data --format npy --out training_data_npy
+"""
+import argparse
+import os
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, Tuple
+import numpy as np
+from ..services.features import overlap_ratio, skill_features, target_score
+
+COLUMNS = ["skill_match_ratio", "availability_overlap", "avg_proficiency", "target_score"]
+
+def _random_subsets(rng: np.random.Generator, rows: int, num_skills: int, low: int, high: int) -> np.ndarray:
+    """0/1 matrix where each row picks between low and high distinct skills at random."""
+    counts = rng.integers(low, min(high, num_skills) + 1, size=(rows, 1))
+    ranks = rng.random((rows, num_skills)).argsort(axis=1).argsort(axis=1)
+    return (ranks < counts).astype(np.float64)
+
+def _spans(rng: np.random.Generator, rows: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Start within a year and a 1-30 day length, in days."""
+    start = rng.integers(0, 366, size=rows).astype(np.float64)
+    return start, start + rng.integers(1, 31, size=rows)
+
+def iter_training_chunks(
+    num_employees: int = 50,
+    num_tasks: int = 100,
+    num_skills: int = 7,
+    seed: int = 0,
+    chunk_tasks: int = 256,
+) -> Iterator[np.ndarray]:
+    """Yield (chunk_tasks * num_employees, 4) arrays of features plus target, task-major."""
+    rng = np.random.default_rng(seed)
+    has_skill = _random_subsets(rng, num_employees, num_skills, 1, 5)
+    proficiency = has_skill * rng.integers(1, 6, size=(num_employees, num_skills))
+    window_start, window_end = _spans(rng, num_employees)
+
+    for lo in range(0, num_tasks, chunk_tasks):
+        size = min(chunk_tasks, num_tasks - lo)
+        required = _random_subsets(rng, size, num_skills, 1, 3)
+        task_start, task_end = _spans(rng, size)
+
+        ratio, avg_proficiency = skill_features(required, has_skill, proficiency)
+        # One window per employee, so the window overlap is the employee overlap
+        overlap = overlap_ratio(task_start[:, None], task_end[:, None], window_start, window_end)
+        chunk = np.empty((size * num_employees, len(COLUMNS)))
+        chunk[:, 0] = ratio.ravel()
+        chunk[:, 1] = overlap.ravel()
+        chunk[:, 2] = avg_proficiency.ravel()
+        chunk[:, 3] = target_score(chunk[:, 0], chunk[:, 1], chunk[:, 2])
+        yield chunk
+
+def write_csv(path, chunks) -> int:
+    rows = 0
+    with open(path, "w", newline="") as f:
+        f.write(",".join(COLUMNS) + "\n")
+        for chunk in chunks:
+            np.savetxt(f, chunk, delimiter=",", fmt="%.10g")
+            rows += chunk.shape[0]
+    return rows
+
+def write_npy(directory, chunks, total_rows: int) -> int:
+    """Write one .npy file per column, filled chunk by chunk through memory maps."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    columns = [
+        np.lib.format.open_memmap(directory / f"{name}.npy", mode="w+", dtype=np.float64, shape=(total_rows,))
+        for name in COLUMNS
+    ]
+    rows = 0
+    for chunk in chunks:
+        for i, column in enumerate(columns):
+            column[rows:rows + chunk.shape[0]] = chunk[:, i]
+        rows += chunk.shape[0]
+    for column in columns:
+        column.flush()
+    return rows
+
+def generate(
+    path="training_data.csv",
+    num_employees: int = 50,
+    num_tasks: int = 100,
+    num_skills: int = 7,
+    seed: int = 0,
+    chunk_tasks: int = 256,
+    fmt: str = "csv",
+) -> int:
+    """Generate num_tasks x num_employees rows to path. Returns the number of rows written."""
+    chunks = iter_training_chunks(num_employees, num_tasks, num_skills, seed, chunk_tasks)
+    if fmt == "csv":
+        return write_csv(path, chunks)
+    if fmt == "npy":
+        return write_npy(path, chunks, num_employees * num_tasks)
+    raise ValueError(f"Unknown format: {fmt}")
+
+def read_chunks(path, chunk_rows: int = 1_000_000) -> Iterator[np.ndarray]:
+    """Stream (rows, 4) arrays back from a CSV file or an npy column directory."""
+    path = Path(path)
+    if path.is_dir():
+        columns = [np.load(path / f"{name}.npy", mmap_mode="r") for name in COLUMNS]
+        for lo in range(0, columns[0].shape[0], chunk_rows):
+            yield np.column_stack([column[lo:lo + chunk_rows] for column in columns])
+        return
+    with open(path, "r") as f:
+        f.readline()  # Header
+        while True:
+            lines = list(islice(f, chunk_rows))
+            if not lines:
+                return
+            yield np.loadtxt(lines, delimiter=",", ndmin=2)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic task allocation training data.")
+    parser.add_argument("--employees", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=100)
+    parser.add_argument("--skills", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-tasks", type=int, default=256)
+    parser.add_argument("--format", choices=["csv", "npy"], default="csv")
+    parser.add_argument("--out", default=os.getenv("TRAINING_DATA_PATH", "training_data.csv"))
+    args = parser.parse_args()
+
+    rows = generate(args.out, args.employees, args.tasks, args.skills, args.seed, args.chunk_tasks, args.format)
+    print(f"Training data generated: {args.out} ({rows} rows)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# backend/app/services/versions.py
+"""
+Version stamps for the lists the frontend polls, so GET routes can answer
+If-None-Match with a 304 after one _id lookup instead of re-reading and
+re-serializing unchanged documents.
+
+Each resource (one user's skills, one user's availability, the tasks of one
+supervisor or assignee) has a document in resource_versions whose version
+the write routes $inc after writing. The epoch is set when the document is
+first created, so ETags handed out before the collection was dropped or
+reset can never match again.
+"""
+import hashlib
+from typing import Iterable, Optional
+from bson import ObjectId
+from fastapi import Request, Response
+from pymongo import UpdateOne
+from ..services.repository import Repository, get_repository
+
+def skills_resource(user_id: str) -> str:
+    return f"skills:{user_id}"
+
+def availability_resource(user_id: str) -> str:
+    return f"availability:{user_id}"
+
+def supervisor_tasks_resource(supervisor_id: str) -> str:
+    return f"tasks:supervisor:{supervisor_id}"
+
+def assignee_tasks_resource(employee_id: str) -> str:
+    return f"tasks:assignee:{employee_id}"
+
+def task_resources(*tasks: Optional[dict]) -> list:
+    """The task lists a task document appears in (GET /tasks/ per supervisor and per assignee)."""
+    resources = []
+    for task in tasks:
+        if not task:
+            continue
+        if task.get("supervisor_id"):
+            resources.append(supervisor_tasks_resource(task["supervisor_id"]))
+        if task.get("assigned_to"):
+            resources.append(assignee_tasks_resource(task["assigned_to"]))
+    return resources
+
+async def bump_versions(resources: Iterable[str], repo: Optional[Repository] = None):
+    """Mark resources as changed. Call after the write, so a stamp never runs ahead of the data."""
+    resources = sorted(set(resources))
+    if not resources:
+        return
+    operations = [
+        UpdateOne({"_id": resource}, {"$inc": {"version": 1}, "$setOnInsert": {"epoch": str(ObjectId())}}, upsert=True)
+        for resource in resources
+    ]
+    await (repo or get_repository()).resource_versions.bulk_write(operations, ordered=False)
+
+def _etag(stamp: Optional[dict], variant: str = "") -> str:
+    etag = f"{stamp['epoch']}-{stamp['version']}" if stamp else "0"
+    if variant:
+        etag += "-" + hashlib.blake2s(variant.encode("utf-8"), digest_size=6).hexdigest()
+    return f'"{etag}"'
+
+async def current_etag(resource: str, variant: str = "") -> str:
+    """
+    ETag for the current version of resource. variant distinguishes
+    representations of the same resource (e.g. the query string of a
+    paginated or projected list).
+    """
+    return _etag(await get_repository().resource_versions.find_one({"_id": resource}), variant)
+
+async def current_etags(resources: Iterable[str], repo: Optional[Repository] = None) -> dict:
+    """ETags for many resources with one query, as {resource: etag}."""
+    resources = list(resources)
+    cursor = (repo or get_repository()).resource_versions.find({"_id": {"$in": resources}})
+    stamps = {stamp["_id"]: stamp async for stamp in cursor}
+    return {resource: _etag(stamps.get(resource)) for resource in resources}
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison against an If-None-Match header, as used for GET."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (value.strip() for value in if_none_match.split(","))
+    return etag in (value[2:] if value.startswith("W/") else value for value in candidates)
+
+def etag_headers(etag: str) -> dict:
+    # no-cache lets browsers keep the body but revalidate every time
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A 304 response if the client already holds etag, else None."""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=etag_headers(etag))
+    return None
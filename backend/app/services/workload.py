@@ -0,0 +1,238 @@
+# backend/app/services/workload.py
+"""
+Per-employee open-task counters, so tasks can be assigned from several
+workers or hosts at once without double-assigning a task or overbooking an
+employee.
+
+employee_load holds one {"_id": employee_id, "open_tasks": n} document per
+employee. claim_task first reserves a slot with a conditional $inc that only
+matches while open_tasks < capacity, then claims the task with an update that
+only matches while it is still pending and unassigned. A claim that loses
+either race gives the slot back and reports why, so the caller moves on to its
+next candidate; no lock is held while scoring.
+
+When every candidate for a task is full, assignment raises NoFreeCapacity
+and the assignment job waits (see assignment_jobs.py) instead of failing;
+it is retried when a task is completed or reassigned away from someone, and
+every ASSIGNMENT_WAITING_RETRY seconds.
+
+The two updates are not one transaction (standalone servers have none), so a
+process killed between them can leave a reserved slot behind. Recount from
+the tasks collection with
+
+    python -m app.services.workload            # report counters that drifted
+    python -m app.services.workload --apply    # rewrite them
+"""
+import argparse
+import asyncio
+import logging
+import os
+from typing import Iterable, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from ..services.bulk import write_errors
+from ..services.metrics import assignment_claims
+from ..services.repository import Repository, get_repository
+
+logger = logging.getLogger(__name__)
+
+# Open tasks an employee may hold before assignment skips them
+EMPLOYEE_CAPACITY = int(os.getenv("EMPLOYEE_CAPACITY", "3"))
+
+class NoFreeCapacity(ValueError):
+    """Every candidate for the task holds EMPLOYEE_CAPACITY open tasks; retry once a slot frees up."""
+
+CLAIMED = "claimed"
+EMPLOYEE_FULL = "employee_full"
+TASK_TAKEN = "task_taken"
+
+def open_assignee(task: Optional[dict]) -> Optional[str]:
+    """The employee a task counts against, or None when it is unassigned or completed."""
+    if task and task.get("assigned_to") and task.get("status") != "completed":
+        return task["assigned_to"]
+    return None
+
+async def load_counts(employee_ids: Iterable[str], repo: Optional[Repository] = None) -> dict:
+    """Current open-task counts; employees without a counter are missing (zero)."""
+    repo = repo or get_repository()
+    cursor = repo.employee_load.find({"_id": {"$in": list(employee_ids)}})
+    return {doc["_id"]: doc["open_tasks"] async for doc in cursor}
+
+async def reserve_slot(employee_id: str, capacity: int, repo: Optional[Repository] = None) -> bool:
+    repo = repo or get_repository()
+    try:
+        await repo.employee_load.update_one(
+            {"_id": employee_id, "open_tasks": {"$lt": capacity}}, {"$inc": {"open_tasks": 1}}, upsert=True,
+        )
+    except DuplicateKeyError:
+        # The counter exists but is at capacity, so the upsert tried to insert a second one
+        return False
+    return True
+
+async def release_slot(employee_id: str, repo: Optional[Repository] = None):
+    repo = repo or get_repository()
+    await repo.employee_load.update_one({"_id": employee_id, "open_tasks": {"$gt": 0}}, {"$inc": {"open_tasks": -1}})
+
+async def claim_task(task_id: ObjectId, employee_id: str, capacity: int = EMPLOYEE_CAPACITY, repo: Optional[Repository] = None) -> str:
+    """
+    Assign a pending, unassigned task to employee_id if they have a free slot.
+    Returns CLAIMED, EMPLOYEE_FULL (try the next candidate) or TASK_TAKEN
+    (another worker assigned it, or it is no longer pending).
+    """
+    repo = repo or get_repository()
+    if not await reserve_slot(employee_id, capacity, repo):
+        assignment_claims.inc(outcome=EMPLOYEE_FULL)
+        return EMPLOYEE_FULL
+    result = await repo.tasks.update_one(
+        {"_id": task_id, "assigned_to": None, "status": "pending"}, {"$set": {"assigned_to": employee_id}},
+    )
+    if result.modified_count == 0:
+        await release_slot(employee_id, repo)
+        assignment_claims.inc(outcome=TASK_TAKEN)
+        return TASK_TAKEN
+    assignment_claims.inc(outcome=CLAIMED)
+    return CLAIMED
+
+async def claim_tasks(pairs: List[Tuple[ObjectId, str]], capacity: int = EMPLOYEE_CAPACITY, repo: Optional[Repository] = None) -> List[int]:
+    """
+    claim_task for many (task_id, employee_id) pairs in three unordered
+    bulk_writes, however many pairs there are: reserve every slot, claim every
+    task whose slot was reserved, then give back the slots of the claims that
+    lost. Returns the indexes of the pairs that were claimed.
+    """
+    repo = repo or get_repository()
+    if not pairs:
+        return []
+
+    # Each $inc is checked against the counter as the server applies it, so
+    # an employee matched several times stops at capacity; the rest fail as duplicate upserts
+    try:
+        await repo.employee_load.bulk_write([
+            UpdateOne({"_id": employee_id, "open_tasks": {"$lt": capacity}}, {"$inc": {"open_tasks": 1}}, upsert=True)
+            for _, employee_id in pairs
+        ], ordered=False)
+        full = set()
+    except BulkWriteError as e:
+        full = set(write_errors(e))
+    reserved = [index for index in range(len(pairs)) if index not in full]
+
+    # The token tells this batch's claims apart from claims of the same pairs made meanwhile elsewhere
+    token = ObjectId()
+    claims = [
+        UpdateOne(
+            {"_id": pairs[index][0], "assigned_to": None, "status": "pending"},
+            {"$set": {"assigned_to": pairs[index][1], "claim_token": token}},
+        )
+        for index in reserved
+    ]
+    try:
+        modified = (await repo.tasks.bulk_write(claims, ordered=False)).modified_count if claims else 0
+    except BulkWriteError as e:
+        modified = -1
+        logger.warning(f"Batch claim rejected {len(write_errors(e))} task update(s)")
+    if modified == len(claims):
+        claimed = reserved
+    else:
+        cursor = repo.tasks.find({"_id": {"$in": [pairs[index][0] for index in reserved]}, "claim_token": token}, {"assigned_to": 1})
+        won = {doc["_id"]: doc["assigned_to"] async for doc in cursor}
+        claimed = []
+        for index in reserved:
+            # A task paired twice in the batch is claimed by at most one of its pairs
+            task_id, employee_id = pairs[index]
+            if won.get(task_id) == employee_id:
+                claimed.append(index)
+                del won[task_id]
+
+    lost = [pairs[index][1] for index in sorted(set(reserved) - set(claimed))]
+    if lost:
+        await repo.employee_load.bulk_write([
+            UpdateOne({"_id": employee_id, "open_tasks": {"$gt": 0}}, {"$inc": {"open_tasks": -1}}) for employee_id in lost
+        ], ordered=False)
+
+    assignment_claims.inc(len(claimed), outcome=CLAIMED)
+    assignment_claims.inc(len(full), outcome=EMPLOYEE_FULL)
+    assignment_claims.inc(len(lost), outcome=TASK_TAKEN)
+    return claimed
+
+async def move_load(before: Optional[dict], after: Optional[dict], repo: Optional[Repository] = None) -> Optional[str]:
+    """
+    Update the counters after a task was created, reassigned, completed or
+    reopened outside claim_task. Not capacity-checked: a supervisor may
+    overbook someone by hand. Returns the employee who got a slot back, if any.
+    """
+    old, new = open_assignee(before), open_assignee(after)
+    if old == new:
+        return None
+    operations = []
+    if old:
+        operations.append(UpdateOne({"_id": old, "open_tasks": {"$gt": 0}}, {"$inc": {"open_tasks": -1}}))
+    if new:
+        operations.append(UpdateOne({"_id": new}, {"$inc": {"open_tasks": 1}}, upsert=True))
+    await (repo or get_repository()).employee_load.bulk_write(operations, ordered=False)
+    return old
+
+async def count_open_tasks(repo: Repository) -> dict:
+    """Open (assigned, not completed) tasks per employee, counted from the tasks collection."""
+    pipeline = [
+        {"$match": {"assigned_to": {"$ne": None}, "status": {"$ne": "completed"}}},
+        {"$group": {"_id": "$assigned_to", "count": {"$sum": 1}}},
+    ]
+    return {doc["_id"]: doc["count"] async for doc in repo.tasks.aggregate(pipeline)}
+
+async def rebuild_load_counters(repository: Repository, apply: bool = False) -> dict:
+    """
+    Compare every counter with a recount of the tasks collection and, when
+    apply is set, overwrite the ones that differ. Returns
+    {employee_id: (counter, recount)} for the counters that drifted.
+    Claims made while this runs can be lost, so run it when assignment is quiet.
+    """
+    actual = await count_open_tasks(repository)
+    stored = {doc["_id"]: doc["open_tasks"] async for doc in repository.employee_load.find()}
+    drift = {
+        employee_id: (stored.get(employee_id, 0), actual.get(employee_id, 0))
+        for employee_id in set(actual) | set(stored)
+        if stored.get(employee_id, 0) != actual.get(employee_id, 0)
+    }
+    if apply and drift:
+        operations = [
+            UpdateOne({"_id": employee_id}, {"$set": {"open_tasks": count}}, upsert=True)
+            for employee_id, (_, count) in drift.items()
+        ]
+        await repository.employee_load.bulk_write(operations, ordered=False)
+        logger.info(f"Rewrote {len(drift)} employee load counter(s)")
+    return drift
+
+async def ensure_load_counters(repository: Repository):
+    """Build the counters on first start, when tasks are already assigned but nothing has been counted."""
+    if await repository.employee_load.find_one() is None:
+        drift = await rebuild_load_counters(repository, apply=True)
+        if drift:
+            logger.info(f"Initialized load counters for {len(drift)} employee(s)")
+
+async def _main(apply: bool):
+    from dotenv import load_dotenv
+    from ..services.repository import DEFAULT_DB_NAME, create_client
+
+    load_dotenv()
+    client = create_client()
+    repository = Repository(client[os.getenv("MONGO_DB_NAME", DEFAULT_DB_NAME)])
+    try:
+        drift = await rebuild_load_counters(repository, apply)
+    finally:
+        client.close()
+    for employee_id, (stored, actual) in sorted(drift.items()):
+        print(f"{employee_id}: counter={stored} open_tasks={actual}")
+    if not drift:
+        print("All counters match")
+    elif not apply:
+        print("Dry run; pass --apply to write the changes")
+
+def main():
+    parser = argparse.ArgumentParser(description="Recount employee_load from the tasks collection.")
+    parser.add_argument("--apply", action="store_true", help="Rewrite counters that drifted instead of only reporting them")
+    args = parser.parse_args()
+    asyncio.run(_main(args.apply))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# backend/benchmarks/bench_assignment.py
+"""
+Measure assign_task latency as the organisation grows, against the in-memory
+database and the stub scorer. For each employee count it reports cold latency
+(profile cache and skill index dropped before every call), warm latency,
+feature computation on its own, and the peak Python heap of one cold call.
+
+    python -m benchmarks.bench_assignment --employees 10,100,1000,5000 --output assignment.json
+"""
+import argparse
+import asyncio
+import time
+from app.models.task import Task
+from app.services.profile_loader import load_employee_profiles
+from app.services.task_allocation import assign_task, compute_feature_matrix, compute_features, score_cache
+from bson import ObjectId
+from benchmarks.harness import emit, memory_backend, peak_memory_kb, reset_assignments, reset_caches, seed_org, summarize
+
+async def measure_calls(repository, task_ids, cold: bool) -> dict:
+    # An assigned task returns straight away, so every pass starts from unassigned tasks
+    await reset_assignments(repository)
+    samples = []
+    for task_id in task_ids:
+        if cold:
+            reset_caches()
+        else:
+            # Time scoring with warm profiles, not the reuse of the previous pass's scores
+            score_cache.clear()
+        started = time.perf_counter()
+        await assign_task(task_id)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+async def measure_features(repository, task_id: str, repeat: int) -> dict:
+    task = await repository.tasks.find_one({"_id": ObjectId(task_id)})
+    profiles = await load_employee_profiles()
+    loop_best = matrix_best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        [compute_features(task, profile) for profile in profiles]
+        loop_best = min(loop_best, time.perf_counter() - started)
+        started = time.perf_counter()
+        compute_feature_matrix([task], profiles)
+        matrix_best = min(matrix_best, time.perf_counter() - started)
+    return {"features_loop_ms": loop_best * 1000, "feature_matrix_ms": matrix_best * 1000}
+
+async def run(employee_counts, tasks: int, samples: int, db_latency: float, scorer_latency: float, seed: int) -> list:
+    results = []
+    for employees in employee_counts:
+        async with memory_backend(db_latency, scorer_latency) as repository:
+            org = await seed_org(repository, employees, tasks, seed)
+            task_ids = org["tasks"][:samples]
+            result = {"employees": employees}
+            result["cold"] = await measure_calls(repository, task_ids, cold=True)
+            result["warm"] = await measure_calls(repository, task_ids, cold=False)
+            result.update(await measure_features(repository, task_ids[0], repeat=3))
+            reset_caches()
+            await reset_assignments(repository)
+            result["cold_peak_kb"] = await peak_memory_kb(assign_task, task_ids[0])
+            results.append(result)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark assign_task latency against organisation size.")
+    parser.add_argument("--employees", default="10,100,1000", help="Comma-separated employee counts")
+    parser.add_argument("--tasks", type=int, default=50, help="Tasks seeded per organisation")
+    parser.add_argument("--samples", type=int, default=20, help="assign_task calls timed per organisation")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="Simulated database round trip")
+    parser.add_argument("--scorer-latency-ms", type=float, default=0.0, help="Simulated endpoint round trip")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    employee_counts = [int(count) for count in args.employees.split(",") if count]
+    samples = min(args.samples, args.tasks)
+    results = asyncio.run(run(
+        employee_counts, args.tasks, samples, args.db_latency_ms / 1000, args.scorer_latency_ms / 1000, args.seed
+    ))
+    parameters = {
+        "employees": employee_counts,
+        "tasks": args.tasks,
+        "samples": samples,
+        "db_latency_ms": args.db_latency_ms,
+        "scorer_latency_ms": args.scorer_latency_ms,
+        "seed": args.seed,
+    }
+    emit("assignment", parameters, results, args.output)
+
+if __name__ == "__main__":
+    main()
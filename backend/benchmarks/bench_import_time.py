@@ -0,0 +1,53 @@
+# backend/benchmarks/bench_import_time.py
+"""
+Measure how long `import app.main` takes in a fresh interpreter and fail
+when it exceeds the budget. Importing the app must not touch the network,
+so this also catches import-time side effects creeping back in.
+
+    python -m benchmarks.bench_import_time --budget-ms 1000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+def import_time_ms(module: str) -> float:
+    """Cumulative import time of module, as reported by -X importtime."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1000
+    raise RuntimeError(f"No import time reported for {module}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "1000")))
+    args = parser.parse_args()
+
+    samples = [import_time_ms(args.module) for _ in range(args.repeat)]
+    best = min(samples)
+    print(json.dumps({
+        "benchmark": "import_time",
+        "module": args.module,
+        "best_ms": best,
+        "samples_ms": samples,
+        "budget_ms": args.budget_ms,
+        "within_budget": best <= args.budget_ms,
+    }, indent=2))
+    sys.exit(0 if best <= args.budget_ms else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# backend/benchmarks/bench_routes.py
+"""
+Measure throughput and latency of each route under concurrent clients. The
+app is driven in-process through httpx's ASGI transport, against the
+in-memory database and the stub scorer, so only the app's own overhead (plus
+any simulated latency) is measured.
+
+    python -m benchmarks.bench_routes --employees 500 --requests 500 --concurrency 1,16,64 --output routes.json
+"""
+import argparse
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Callable, Dict, Tuple
+import httpx
+from app.main import app
+from app.services.assignment_jobs import assignment_queue
+from benchmarks.harness import ORG_START, SKILLS, emit, memory_backend, seed_org, summarize
+
+# Each scenario builds (method, url, json body) for the i-th request
+Request = Tuple[str, str, dict]
+
+def scenarios(org: dict) -> Dict[str, Callable[[int], Request]]:
+    employees = org["employees"]
+    clerk_ids = org["employee_clerk_ids"]
+    tasks = org["tasks"]
+    supervisor = org["supervisor"]
+
+    def pick(items, i):
+        return items[i % len(items)]
+
+    def window(i):
+        start = ORG_START + timedelta(days=i % 300)
+        return start.isoformat(), (start + timedelta(days=3)).isoformat()
+
+    def add_availability(i):
+        available_from, available_to = window(i)
+        return "POST", "/availability/", {"user_id": pick(employees, i), "available_from": available_from, "available_to": available_to}
+
+    def create_task(i):
+        start, due = window(i)
+        body = {"supervisor_id": supervisor, "description": f"Benchmark task {i}", "required_skills": [pick(SKILLS, i)], "start_date": start, "due_date": due}
+        return "POST", "/tasks/", body
+
+    return {
+        "get_user": lambda i: ("GET", f"/users/{pick(clerk_ids, i)}", None),
+        "get_skills": lambda i: ("GET", f"/skills/{pick(employees, i)}", None),
+        "get_availability": lambda i: ("GET", f"/availability/{pick(employees, i)}", None),
+        "find_available": lambda i: ("GET", "/availability/?from={}&to={}".format(*window(i)), None),
+        "list_tasks": lambda i: ("GET", f"/tasks/?user_id={supervisor}&role=supervisor&limit=100", None),
+        "task_summary": lambda i: ("GET", f"/tasks/summary?supervisor_id={supervisor}", None),
+        # A new skill name per request, so every call takes the insert path
+        "add_skill": lambda i: ("POST", "/skills/", {"user_id": pick(employees, i), "skill_name": f"Skill {i}", "proficiency_level": i % 5 + 1}),
+        "add_availability": add_availability,
+        "update_task": lambda i: ("PATCH", f"/tasks/{pick(tasks, i)}", {"status": "in_progress" if i % 2 else "pending"}),
+        "create_task": create_task,
+    }
+
+async def drive(client: httpx.AsyncClient, build: Callable[[int], Request], start: int, requests: int, concurrency: int) -> dict:
+    """Send requests start..start+requests from `concurrency` clients pulling from a shared counter."""
+    counter = iter(range(start, start + requests))
+    samples, errors = [], 0
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            method, url, body = build(i)
+            started = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            samples.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {"requests_per_sec": requests / elapsed, "errors": errors, **summarize(samples)}
+
+async def run(employees: int, tasks: int, requests: int, concurrency_levels, selected, db_latency: float, scorer_latency: float, seed: int) -> dict:
+    results = {}
+    async with memory_backend(db_latency, scorer_latency) as repository:
+        org = await seed_org(repository, employees, tasks, seed)
+        # POST /tasks/ enqueues background assignment, so keep the workers running like the app does
+        await assignment_queue.start()
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+                for name, build in scenarios(org).items():
+                    if selected and name not in selected:
+                        continue
+                    results[name] = {}
+                    # Later levels continue the request numbering so writes never repeat
+                    for level, concurrency in enumerate(concurrency_levels):
+                        results[name][f"c{concurrency}"] = await drive(client, build, level * requests, requests, concurrency)
+        finally:
+            await assignment_queue.stop()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark route throughput under concurrent clients.")
+    parser.add_argument("--employees", type=int, default=200)
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=300, help="Requests per route and concurrency level")
+    parser.add_argument("--concurrency", default="1,16", help="Comma-separated client counts")
+    parser.add_argument("--routes", default="", help="Comma-separated scenario names (default: all)")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0)
+    parser.add_argument("--scorer-latency-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    # The availability router turns on INFO logging, which would log every request
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    concurrency_levels = [int(level) for level in args.concurrency.split(",") if level]
+    selected = {name for name in args.routes.split(",") if name}
+    results = asyncio.run(run(
+        args.employees, args.tasks, args.requests, concurrency_levels, selected,
+        args.db_latency_ms / 1000, args.scorer_latency_ms / 1000, args.seed,
+    ))
+    parameters = {
+        "employees": args.employees,
+        "tasks": args.tasks,
+        "requests": args.requests,
+        "concurrency": concurrency_levels,
+        "db_latency_ms": args.db_latency_ms,
+        "scorer_latency_ms": args.scorer_latency_ms,
+        "seed": args.seed,
+    }
+    emit("routes", parameters, results, args.output)
+
+if __name__ == "__main__":
+    main()
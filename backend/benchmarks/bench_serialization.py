@@ -0,0 +1,74 @@
+# backend/benchmarks/bench_serialization.py
+"""
+Compare the previous per-document response path for list routes with the
+shared serialization layer in app/services/serialization.py.
+
+    python -m benchmarks.bench_serialization --documents 10000
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+from typing import List
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from app.models.task import Task
+from app.services.serialization import dumps, serialize_documents
+
+def make_tasks(count: int) -> List[dict]:
+    start = datetime(2025, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "supervisor_id": "supervisor",
+            "description": f"Task {i}",
+            "required_skills": ["Python", "AWS"],
+            "start_date": start + timedelta(days=i % 365),
+            "due_date": start + timedelta(days=i % 365 + 7),
+            "assigned_to": None,
+            "status": "pending",
+        }
+        for i in range(count)
+    ]
+
+def previous_path(documents: List[dict]) -> bytes:
+    """JSON round trip, model validation, then response_model re-validation and encoding."""
+    models = []
+    for document in documents:
+        document = dict(document)
+        document["id"] = str(document["_id"])
+        models.append(Task(**json.loads(json.dumps(document, default=str))))
+    validated = TypeAdapter(List[Task]).validate_python(models, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+def shared_path(documents: List[dict]) -> bytes:
+    return dumps(serialize_documents(documents, Task))
+
+def measure(function, documents, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(documents)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--documents", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    documents = make_tasks(args.documents)
+    previous = measure(previous_path, documents, args.repeat)
+    shared = measure(shared_path, documents, args.repeat)
+    print(json.dumps({
+        "benchmark": "serialization",
+        "documents": args.documents,
+        "previous_docs_per_sec": args.documents / previous,
+        "shared_docs_per_sec": args.documents / shared,
+        "speedup": previous / shared,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
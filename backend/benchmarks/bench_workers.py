@@ -0,0 +1,191 @@
+# backend/benchmarks/bench_workers.py
+"""
+Load test for the production server: starts `python -m app.serve` at each
+worker count, drives it over real HTTP from concurrent clients for a fixed
+time per route, and reports throughput and latency per worker count, plus
+the speedup over the first count.
+
+Without MongoDB every worker serves its own in-memory copy of a seeded
+organisation (benchmarks.memory_app):
+
+    python -m benchmarks.bench_workers --workers 1,2,4,8 --concurrency 64 --output workers.json
+
+Against a real server, a scratch database is seeded, served and dropped
+afterwards (the database named by --database must not hold real data):
+
+    python -m benchmarks.bench_workers --mongo-url mongodb://localhost:27017 --workers 1,2,4
+
+The load generator is one Python process and needs a core of its own, so
+the speedup flattens once the workers plus the client exceed the cores. For
+higher rates, start the server with `python -m app.serve` and drive it from
+another host with a dedicated tool, e.g.
+`hey -z 30s -c 64 http://host:8000/skills/employee-1` or `wrk`.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict
+import httpx
+from benchmarks.harness import emit, seed_org, summarize
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+def scenarios(employees: int) -> Dict[str, Callable[[int], str]]:
+    """Read routes the frontend polls, addressed by clerk_id so every worker can answer them."""
+
+    def employee(i):
+        return f"employee-{i % employees}"
+
+    return {
+        "get_user": lambda i: f"/users/{employee(i)}",
+        "get_skills": lambda i: f"/skills/{employee(i)}",
+        "get_availability": lambda i: f"/availability/{employee(i)}",
+        "list_tasks": lambda i: "/tasks/?user_id=supervisor-0&role=supervisor&limit=50",
+    }
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not become ready")
+
+async def drive(client: httpx.AsyncClient, build: Callable[[int], str], duration: float, concurrency: int) -> dict:
+    """GET build(i) from `concurrency` clients for `duration` seconds."""
+    samples, errors = [], 0
+    counter = iter(range(sys.maxsize))
+    stop_at = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < stop_at:
+            url = build(next(counter))
+            started = time.perf_counter()
+            try:
+                response = await client.get(url)
+                failed = response.status_code >= 400
+            except httpx.TransportError:
+                failed = True
+            samples.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {"requests_per_sec": len(samples) / elapsed, "requests": len(samples), "errors": errors, **summarize(samples)}
+
+def start_server(workers: int, port: int, env: dict, app: str) -> subprocess.Popen:
+    command = [sys.executable, "-m", "app.serve", "--app", app, "--workers", str(workers), "--port", str(port), "--host", "127.0.0.1", "--log-level", "warning"]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env={**os.environ, **env})
+
+def stop_server(process: subprocess.Popen):
+    """SIGTERM, as a process manager would, so shutdown goes through the graceful path."""
+    process.terminate()
+    try:
+        process.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+async def measure(url: str, routes: Dict[str, Callable[[int], str]], duration: float, warmup: float, concurrency: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+        await wait_until_ready(client)
+        results = {}
+        for name, build in routes.items():
+            # Warm caches and open keep-alive connections to every worker before measuring
+            await drive(client, build, warmup, concurrency)
+            results[name] = await drive(client, build, duration, concurrency)
+        return results
+
+async def seed_database(mongo_url: str, database: str, employees: int, tasks: int, seed: int):
+    from app.services.repository import Repository, create_client
+
+    client = create_client(mongo_url)
+    try:
+        await client.drop_database(database)
+        await seed_org(Repository(client[database]), employees, tasks, seed)
+    finally:
+        client.close()
+
+async def drop_database(mongo_url: str, database: str):
+    from app.services.repository import create_client
+
+    client = create_client(mongo_url)
+    try:
+        await client.drop_database(database)
+    finally:
+        client.close()
+
+def run(args, worker_counts, selected) -> dict:
+    routes = {name: build for name, build in scenarios(args.employees).items() if not selected or name in selected}
+    env = {"BENCH_EMPLOYEES": str(args.employees), "BENCH_TASKS": str(args.tasks), "BENCH_SEED": str(args.seed)}
+    app = "benchmarks.memory_app:app"
+    if args.mongo_url:
+        asyncio.run(seed_database(args.mongo_url, args.database, args.employees, args.tasks, args.seed))
+        env.update({"MONGO_URL": args.mongo_url, "MONGO_DB_NAME": args.database})
+        app = "app.main:app"
+
+    results = {}
+    try:
+        for workers in worker_counts:
+            process = start_server(workers, args.port, env, app)
+            try:
+                results[f"workers_{workers}"] = asyncio.run(measure(
+                    f"http://127.0.0.1:{args.port}", routes, args.duration, args.warmup, args.concurrency,
+                ))
+            finally:
+                stop_server(process)
+    finally:
+        if args.mongo_url:
+            asyncio.run(drop_database(args.mongo_url, args.database))
+
+    # Throughput relative to the first worker count, per route
+    baseline = results.get(f"workers_{worker_counts[0]}", {})
+    for key, routes_result in results.items():
+        for name, result in routes_result.items():
+            base = baseline.get(name, {}).get("requests_per_sec")
+            result["speedup"] = result["requests_per_sec"] / base if base else None
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test app.serve at several worker counts.")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--concurrency", type=int, default=64, help="Concurrent client connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per route")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds per route")
+    parser.add_argument("--routes", default="", help="Comma-separated scenario names (default: all)")
+    parser.add_argument("--employees", type=int, default=200)
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--mongo-url", help="Serve from a real MongoDB instead of per-worker in-memory data")
+    parser.add_argument("--database", default="task_allocation_bench", help="Scratch database (dropped) with --mongo-url")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    worker_counts = [int(count) for count in args.workers.split(",") if count]
+    selected = {name for name in args.routes.split(",") if name}
+    results = run(args, worker_counts, selected)
+    parameters = {
+        "workers": worker_counts,
+        "concurrency": args.concurrency,
+        "duration_s": args.duration,
+        "employees": args.employees,
+        "tasks": args.tasks,
+        "seed": args.seed,
+        "backend": "mongodb" if args.mongo_url else "memory",
+        "cores": os.cpu_count(),
+    }
+    emit("workers", parameters, results, args.output)
+
+if __name__ == "__main__":
+    main()
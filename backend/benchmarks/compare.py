@@ -0,0 +1,83 @@
+# backend/benchmarks/compare.py
+"""
+Compare two JSON reports from the same benchmark (e.g. from two commits) and
+exit non-zero when any metric regressed by more than the threshold.
+Metrics ending in _ms or _kb count as lower-is-better, metrics ending in
+_per_sec (and speedup) as higher-is-better; everything else is ignored.
+
+    python -m benchmarks.compare baseline.json current.json --threshold 0.15
+"""
+import argparse
+import json
+import sys
+from typing import Dict
+
+LOWER_IS_BETTER = ("_ms", "_kb")
+HIGHER_IS_BETTER = ("_per_sec", "speedup")
+
+def flatten(value, prefix: str = "") -> Dict[str, float]:
+    """Numeric leaves keyed by their path; list items are keyed by their employees/documents field when present."""
+    metrics = {}
+    if isinstance(value, dict):
+        for key, item in value.items():
+            metrics.update(flatten(item, f"{prefix}.{key}" if prefix else key))
+    elif isinstance(value, list):
+        for index, item in enumerate(value):
+            label = index
+            if isinstance(item, dict):
+                label = next((f"{key}={item[key]}" for key in ("employees", "documents") if key in item), index)
+            metrics.update(flatten(item, f"{prefix}[{label}]"))
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        metrics[prefix] = float(value)
+    return metrics
+
+def direction(name: str) -> int:
+    """+1 when higher is better, -1 when lower is better, 0 when the metric is not compared."""
+    leaf = name.rsplit(".", 1)[-1]
+    if leaf.endswith(HIGHER_IS_BETTER):
+        return 1
+    if leaf.endswith(LOWER_IS_BETTER):
+        return -1
+    return 0
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    before = flatten(baseline.get("results", {}))
+    after = flatten(current.get("results", {}))
+    rows = []
+    for name, old in before.items():
+        sign = direction(name)
+        new = after.get(name)
+        if not sign or new is None or old == 0:
+            continue
+        change = (new - old) / old
+        rows.append({"metric": name, "baseline": old, "current": new, "change": change, "regressed": sign * change < -threshold})
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark reports.")
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed relative regression (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    if baseline.get("benchmark") != current.get("benchmark"):
+        sys.exit(f"Reports are from different benchmarks: {baseline.get('benchmark')} vs {current.get('benchmark')}")
+
+    rows = compare(baseline, current, args.threshold)
+    print(json.dumps({
+        "benchmark": current.get("benchmark"),
+        "baseline_commit": baseline.get("commit"),
+        "current_commit": current.get("commit"),
+        "threshold": args.threshold,
+        "regressions": [row for row in rows if row["regressed"]],
+        "metrics": rows,
+    }, indent=2))
+    if any(row["regressed"] for row in rows):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# backend/benchmarks/harness.py
+"""
+Shared setup for the allocation and route benchmarks: an in-memory database
+seeded with a synthetic organisation, a stub scorer in place of SageMaker,
+and JSON result output stamped with the commit it was measured on.
+"""
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tracemalloc
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List, Optional
+from bson import ObjectId
+from app.services.availability_index import availability_span_cache
+from app.services.repository import DEFAULT_DB_NAME, close_repository, init_repository
+from app.services.scoring import LocalEndpointRuntime, LocalLinearScorer, SageMakerScorer, scorers
+from app.services.inference_client import clear_score_memo, close_inference_client
+from app.services.identity import identity_cache
+from app.services.profile_loader import profile_cache
+from app.services.skill_index import skill_index
+from app.services.task_allocation import score_cache
+from app.services.task_summary import summary_cache
+from benchmarks.memory_mongo import MemoryClient
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+SKILLS = [
+    "Python", "JavaScript", "TypeScript", "Go", "Rust", "SQL", "AWS", "Docker",
+    "Kubernetes", "React", "FastAPI", "MongoDB", "Terraform", "Linux", "Java",
+]
+# Roughly what the linear learner converges to on the synthetic data
+STUB_WEIGHTS = [0.35, 0.45, 0.04]
+ORG_START = datetime(2025, 1, 1)
+
+def install_stub_scorer(latency: float = 0.0):
+    """
+    Route scoring through the real SageMakerScorer code path, but against an
+    in-process endpoint that sleeps latency seconds per call instead of AWS.
+    """
+    runtime = LocalEndpointRuntime(LocalLinearScorer(STUB_WEIGHTS), latency=latency)
+    scorers.register("stub", lambda: SageMakerScorer("benchmark-endpoint", runtime=runtime))
+    os.environ["SCORER_BACKEND"] = "stub"
+    close_inference_client()
+
+def reset_caches():
+    """Drop in-process caches so the next request pays the cold path."""
+    profile_cache.clear()
+    identity_cache.clear()
+    score_cache.clear()
+    summary_cache.clear()
+    availability_span_cache.clear()
+    clear_score_memo()
+    skill_index.invalidate()
+
+async def reset_assignments(repository):
+    """Unassign every task and drop the load counters, so assign_task can be timed on the same tasks again."""
+    await repository.tasks.update_many({}, {"$set": {"assigned_to": None}})
+    await repository.employee_load.delete_many({})
+
+@asynccontextmanager
+async def memory_backend(db_latency: float = 0.0, scorer_latency: float = 0.0):
+    """Install the in-memory repository and stub scorer for the duration of a benchmark."""
+    client = MemoryClient(latency=db_latency)
+    repository = init_repository(client[DEFAULT_DB_NAME])
+    install_stub_scorer(scorer_latency)
+    reset_caches()
+    try:
+        yield repository
+    finally:
+        close_inference_client()
+        close_repository()
+        reset_caches()
+
+async def seed_org(repository, employees: int, tasks: int, seed: int = 0) -> dict:
+    """
+    Insert one supervisor, `employees` employees with 1-5 skills and 1-3
+    availability windows each, and `tasks` pending tasks requiring 1-3 skills.
+    Skills and availability reference employees by ObjectId string, tasks
+    reference the supervisor by clerk_id, as the routes store them.
+    """
+    rng = random.Random(seed)
+    supervisor = {"clerk_id": "supervisor-0", "role": "supervisor", "name": "Supervisor", "email": "supervisor@example.com"}
+    users = [supervisor] + [
+        {"clerk_id": f"employee-{i}", "role": "employee", "name": f"Employee {i}", "email": f"employee{i}@example.com"}
+        for i in range(employees)
+    ]
+    for user in users:
+        user["_id"] = ObjectId()
+    employee_ids = [str(user["_id"]) for user in users[1:]]
+
+    skills, availability = [], []
+    for user_id in employee_ids:
+        for skill_name in rng.sample(SKILLS, rng.randint(1, 5)):
+            skills.append({"user_id": user_id, "skill_name": skill_name, "proficiency_level": rng.randint(1, 5)})
+        start = ORG_START
+        for _ in range(rng.randint(1, 3)):
+            start += timedelta(days=rng.randint(0, 60))
+            end = start + timedelta(days=rng.randint(1, 30))
+            availability.append({"user_id": user_id, "available_from": start, "available_to": end})
+            start = end + timedelta(days=1)
+
+    task_docs = []
+    for i in range(tasks):
+        start = ORG_START + timedelta(days=rng.randint(0, 120))
+        task_docs.append({
+            "supervisor_id": supervisor["clerk_id"],
+            "description": f"Task {i}",
+            "required_skills": rng.sample(SKILLS, rng.randint(1, 3)),
+            "start_date": start,
+            "due_date": start + timedelta(days=rng.randint(1, 14)),
+            "assigned_to": None,
+            "status": "pending",
+        })
+
+    await repository.users.insert_many(users)
+    if skills:
+        await repository.skills.insert_many(skills)
+    if availability:
+        await repository.availability.insert_many(availability)
+    task_ids = []
+    if task_docs:
+        result = await repository.tasks.insert_many(task_docs)
+        task_ids = [str(task_id) for task_id in result.inserted_ids]
+    return {
+        "supervisor": supervisor["clerk_id"],
+        "supervisor_id": str(supervisor["_id"]),
+        "employees": employee_ids,
+        "employee_clerk_ids": [user["clerk_id"] for user in users[1:]],
+        "tasks": task_ids,
+    }
+
+def summarize(samples: List[float]) -> dict:
+    """Mean and percentiles of latency samples given in seconds, reported in milliseconds."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {}
+
+    def percentile(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+
+    return {
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": ordered[-1] * 1000,
+    }
+
+async def peak_memory_kb(coroutine_function, *args) -> float:
+    """Peak Python heap allocated while awaiting coroutine_function(*args), via tracemalloc."""
+    tracemalloc.start()
+    try:
+        await coroutine_function(*args)
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+def max_rss_kb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    return float(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+def git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+def emit(benchmark: str, parameters: dict, results, output: Optional[str] = None) -> dict:
+    """Print (and optionally write) the results as JSON with enough context to compare runs."""
+    report = {
+        "benchmark": benchmark,
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "parameters": parameters,
+        "results": results,
+        "max_rss_kb": max_rss_kb(),
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if output:
+        Path(output).write_text(text + "\n")
+    return report
@@ -0,0 +1,32 @@
+# backend/benchmarks/memory_app.py
+"""
+app.main with its lifespan swapped for the in-memory database and stub
+scorer, seeded from BENCH_EMPLOYEES, BENCH_TASKS and BENCH_SEED. It lets
+the multi-worker server be load tested without MongoDB:
+
+    python -m app.serve --app benchmarks.memory_app:app --workers 4
+
+Every worker seeds its own copy of the same organisation. Users are
+addressed by clerk_id, so a request returns the same data whichever worker
+serves it. ObjectIds differ between workers, and writes stay in the worker
+that made them.
+"""
+import os
+from contextlib import asynccontextmanager
+from app.main import app
+from benchmarks.harness import memory_backend, seed_org
+
+@asynccontextmanager
+async def lifespan(app):
+    db_latency = float(os.getenv("BENCH_DB_LATENCY_MS", "0")) / 1000
+    scorer_latency = float(os.getenv("BENCH_SCORER_LATENCY_MS", "0")) / 1000
+    async with memory_backend(db_latency, scorer_latency) as repository:
+        await seed_org(
+            repository,
+            employees=int(os.getenv("BENCH_EMPLOYEES", "200")),
+            tasks=int(os.getenv("BENCH_TASKS", "200")),
+            seed=int(os.getenv("BENCH_SEED", "0")),
+        )
+        yield
+
+app.router.lifespan_context = lifespan
@@ -0,0 +1,180 @@
+# backend/benchmarks/memory_mongo.py
+"""
+In-memory stand-in for the Motor client, so benchmarks run without a MongoDB
+server. Query matching comes from mongomock; this module only adds the async
+Motor surface the app uses (awaitable methods, cursors with to_list and
+async iteration) and a bulk_write that works with the pinned pymongo.
+
+latency adds an asyncio.sleep to every operation to approximate the network
+round trip to a real server, so concurrency effects stay visible.
+"""
+import asyncio
+from itertools import islice
+from typing import Optional
+import mongomock
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+from pymongo.results import BulkWriteResult
+
+class MemoryCursor:
+    """Motor-style cursor over a mongomock cursor."""
+
+    def __init__(self, cursor, latency: float = 0.0):
+        self._cursor = cursor
+        self._latency = latency
+
+    def sort(self, *args, **kwargs):
+        self._cursor.sort(*args, **kwargs)
+        return self
+
+    def limit(self, limit: int):
+        self._cursor.limit(limit)
+        return self
+
+    def skip(self, skip: int):
+        self._cursor.skip(skip)
+        return self
+
+    def hint(self, index):
+        self._cursor.hint(index)
+        return self
+
+    async def to_list(self, length: Optional[int] = None) -> list:
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        return list(self._cursor if length is None else islice(self._cursor, length))
+
+    async def _iterate(self):
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        for document in self._cursor:
+            yield document
+
+    def __aiter__(self):
+        return self._iterate()
+
+class MemoryCollection:
+    """Awaitable wrapper around a mongomock collection."""
+
+    def __init__(self, collection: mongomock.Collection, database: "MemoryDatabase", latency: float = 0.0):
+        self._collection = collection
+        self.database = database
+        self.name = collection.name
+        self._latency = latency
+
+    def find(self, *args, **kwargs) -> MemoryCursor:
+        return MemoryCursor(self._collection.find(*args, **kwargs), self._latency)
+
+    def aggregate(self, pipeline, **kwargs) -> MemoryCursor:
+        return MemoryCursor(self._collection.aggregate(pipeline, **kwargs), self._latency)
+
+    def list_indexes(self) -> MemoryCursor:
+        return MemoryCursor(self._collection.list_indexes(), self._latency)
+
+    async def bulk_write(self, requests, ordered: bool = True, **kwargs) -> BulkWriteResult:
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        result = {
+            "nInserted": 0, "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0,
+            "upserted": [], "writeErrors": [], "writeConcernErrors": [],
+        }
+        for index, request in enumerate(requests):
+            try:
+                self._apply(index, request, result)
+            except OperationFailure as e:
+                result["writeErrors"].append({"index": index, "code": e.code, "errmsg": str(e), "op": request})
+                if ordered:
+                    break
+        if result["writeErrors"]:
+            raise BulkWriteError(result)
+        return BulkWriteResult(result, True)
+
+    def _apply(self, index: int, request, result: dict):
+        collection = self._collection
+        if isinstance(request, InsertOne):
+            collection.insert_one(request._doc)
+            result["nInserted"] += 1
+            return
+        if isinstance(request, (DeleteOne, DeleteMany)):
+            delete = collection.delete_one if isinstance(request, DeleteOne) else collection.delete_many
+            result["nRemoved"] += delete(request._filter).deleted_count
+            return
+        if isinstance(request, ReplaceOne):
+            outcome = collection.replace_one(request._filter, request._doc, upsert=request._upsert)
+        elif isinstance(request, (UpdateOne, UpdateMany)):
+            update = collection.update_one if isinstance(request, UpdateOne) else collection.update_many
+            outcome = update(request._filter, request._doc, upsert=request._upsert)
+        else:
+            raise TypeError(f"Unsupported bulk operation: {request!r}")
+        if outcome.upserted_id is not None:
+            result["nUpserted"] += 1
+            result["upserted"].append({"index": index, "_id": outcome.upserted_id})
+        else:
+            result["nMatched"] += outcome.matched_count
+            result["nModified"] += outcome.modified_count
+
+    def __getattr__(self, name):
+        attribute = getattr(self._collection, name)
+        if not callable(attribute):
+            return attribute
+
+        async def method(*args, **kwargs):
+            if self._latency:
+                await asyncio.sleep(self._latency)
+            return attribute(*args, **kwargs)
+        return method
+
+class MemoryDatabase:
+    def __init__(self, database: mongomock.Database, client: "MemoryClient", latency: float = 0.0):
+        self._database = database
+        self.client = client
+        self.name = database.name
+        self._latency = latency
+        self._collections = {}
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = MemoryCollection(self._database[name], self, self._latency)
+        return collection
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def command(self, command, **kwargs) -> dict:
+        if self._latency:
+            await asyncio.sleep(self._latency)
+        if command == "ping":
+            return {"ok": 1.0}
+        return self._database.command(command, **kwargs)
+
+    async def list_collection_names(self) -> list:
+        return self._database.list_collection_names()
+
+    def watch(self, *args, **kwargs):
+        # Behave like a standalone server, which has no change streams
+        raise OperationFailure("The $changeStream stage is only supported on replica sets", code=40573)
+
+class MemoryClient:
+    """Drop-in for AsyncIOMotorClient backed by process memory."""
+
+    def __init__(self, latency: float = 0.0):
+        self._client = mongomock.MongoClient()
+        self._latency = latency
+        self._databases = {}
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        database = self._databases.get(name)
+        if database is None:
+            database = self._databases[name] = MemoryDatabase(self._client[name], self, self._latency)
+        return database
+
+    def __getattr__(self, name: str) -> MemoryDatabase:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def close(self):
+        self._databases.clear()
@@ -0,0 +1,44 @@
+# backend/tests/conftest.py
+"""
+The in-memory database every test runs against, with scoring routed through
+the real SageMakerScorer code path to an in-process linear model, and the
+app's process-wide caches dropped on both sides of each test.
+"""
+import pytest
+from app.services.availability_index import availability_span_cache
+from app.services.identity import identity_cache
+from app.services.inference_client import clear_score_memo, close_inference_client
+from app.services.profile_loader import profile_cache
+from app.services.repository import DEFAULT_DB_NAME, close_repository, init_repository
+from app.services.scoring import LocalEndpointRuntime, LocalLinearScorer, SageMakerScorer, scorers
+from app.services.skill_index import skill_index
+from app.services.task_allocation import score_cache
+from app.services.task_summary import summary_cache
+from benchmarks.memory_mongo import MemoryClient
+from tests.support import DB_LATENCY
+
+# Weighs availability above skill, so tests can tell the two apart
+SCORER_WEIGHTS = [0.35, 0.45, 0.04]
+
+def _clear_caches():
+    profile_cache.clear()
+    identity_cache.clear()
+    score_cache.clear()
+    summary_cache.clear()
+    availability_span_cache.clear()
+    clear_score_memo()
+    skill_index.invalidate()
+
+@pytest.fixture
+def repository(monkeypatch):
+    """A fresh in-memory repository installed for the routes and services under test."""
+    runtime = LocalEndpointRuntime(LocalLinearScorer(SCORER_WEIGHTS))
+    scorers.register("test", lambda: SageMakerScorer("test-endpoint", runtime=runtime))
+    monkeypatch.setenv("SCORER_BACKEND", "test")
+    close_inference_client()
+    repository = init_repository(MemoryClient(latency=DB_LATENCY)[DEFAULT_DB_NAME])
+    _clear_caches()
+    yield repository
+    close_inference_client()
+    close_repository()
+    _clear_caches()
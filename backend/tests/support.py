@@ -0,0 +1,54 @@
+# backend/tests/support.py
+"""Seeding and event-loop helpers shared by the tests."""
+import asyncio
+from collections import Counter
+from datetime import datetime
+from bson import ObjectId
+from app.services.assignment_jobs import AssignmentQueue
+
+# A little database latency lets coroutines interleave between reads and writes
+DB_LATENCY = 0.001
+
+# One loop for the whole run: app singletons such as skill_index hold asyncio primitives bound to the first loop that used them
+_loop = asyncio.new_event_loop()
+
+def run_async(coroutine):
+    return _loop.run_until_complete(coroutine)
+
+async def seed(repository, employees: int, tasks: int) -> dict:
+    """Employees who all hold the skill every task requires and are free for all of them."""
+    users = [{"_id": ObjectId(), "clerk_id": f"employee-{i}", "role": "employee", "name": f"Employee {i}"} for i in range(employees)]
+    employee_ids = [str(user["_id"]) for user in users]
+    await repository.users.insert_many(users)
+    await repository.skills.insert_many([
+        {"user_id": user_id, "skill_name": "Python", "proficiency_level": level % 5 + 1} for level, user_id in enumerate(employee_ids)
+    ])
+    await repository.availability.insert_many([
+        {"user_id": user_id, "available_from": datetime(2025, 1, 1), "available_to": datetime(2025, 3, 1)} for user_id in employee_ids
+    ])
+    result = await repository.tasks.insert_many([
+        {
+            "supervisor_id": "supervisor-0",
+            "description": f"Task {i}",
+            "required_skills": ["Python"],
+            "start_date": datetime(2025, 1, 2),
+            "due_date": datetime(2025, 1, 9),
+            "assigned_to": None,
+            "status": "pending",
+        }
+        for i in range(tasks)
+    ])
+    return {"employees": employee_ids, "tasks": [str(task_id) for task_id in result.inserted_ids]}
+
+async def open_tasks_per_employee(repository) -> Counter:
+    tasks = await repository.tasks.find({"assigned_to": {"$ne": None}, "status": {"$ne": "completed"}}).to_list(None)
+    return Counter(task["assigned_to"] for task in tasks)
+
+async def wait_for_job(queue: AssignmentQueue, task_id: str, status: str, timeout: float = 5.0) -> dict:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while True:
+        job = await queue.get_status(task_id)
+        if job and job["status"] == status:
+            return job
+        assert asyncio.get_running_loop().time() < deadline, job
+        await asyncio.sleep(0.01)
@@ -0,0 +1,43 @@
+# backend/tests/test_assignment_jobs.py
+"""Assignment jobs left behind by a process that died after its replacement started."""
+from datetime import datetime, timedelta, timezone
+from app.services.assignment_jobs import QUEUED, RUNNING, SUCCEEDED, AssignmentQueue
+from tests.support import run_async, seed, wait_for_job
+
+def test_running_loop_takes_over_jobs_of_a_dead_process(repository):
+    async def run():
+        org = await seed(repository, employees=2, tasks=2)
+        queue = AssignmentQueue(workers=2, stale_after=0.2, waiting_retry=0.05)
+        await queue.start()
+        try:
+            # Written by a process that died after this one started: one job mid-run, one only in its memory
+            now = datetime.now(timezone.utc)
+            running, queued = org["tasks"]
+            await repository.assignment_jobs.insert_many([
+                {"_id": running, "status": RUNNING, "attempts": 1, "created_at": now, "updated_at": now},
+                {"_id": queued, "status": QUEUED, "attempts": 0, "created_at": now, "updated_at": now - timedelta(seconds=0.1)},
+            ])
+            for task_id in org["tasks"]:
+                job = await wait_for_job(queue, task_id, SUCCEEDED)
+                assert job["assigned_to"] in org["employees"]
+        finally:
+            await queue.stop()
+
+    run_async(run())
+
+def test_fresh_running_jobs_are_left_to_their_owner(repository):
+    async def run():
+        org = await seed(repository, employees=1, tasks=1)
+        queue = AssignmentQueue(workers=1, stale_after=60, waiting_retry=3600)
+        await queue.start()
+        try:
+            now = datetime.now(timezone.utc)
+            await repository.assignment_jobs.insert_one(
+                {"_id": org["tasks"][0], "status": RUNNING, "attempts": 1, "created_at": now, "updated_at": now},
+            )
+            assert await queue.requeue_stale() == 0
+            assert (await queue.get_status(org["tasks"][0]))["status"] == RUNNING
+        finally:
+            await queue.stop()
+
+    run_async(run())
@@ -0,0 +1,40 @@
+# backend/tests/test_availability.py
+"""Who is free for a whole range, looked up from either end of the stored windows."""
+import json
+from datetime import datetime
+from app.routes.availability import find_available
+from app.services.availability_index import COVERING_FROM_INDEX, COVERING_TO_INDEX, availability_span, covering_index, to_timestamp
+from tests.support import run_async
+
+WINDOWS = {
+    "early": (datetime(2025, 1, 1), datetime(2025, 1, 20)),
+    "long": (datetime(2025, 1, 5), datetime(2025, 12, 1)),
+    "late": (datetime(2025, 11, 1), datetime(2025, 12, 31)),
+}
+
+async def free_users(repository, start: datetime, end: datetime) -> set:
+    response = await find_available(repository, start, end)
+    return {window["user_id"] for window in json.loads(response.body)}
+
+def test_covering_windows_are_found_through_either_index(repository):
+    async def run():
+        await repository.availability.insert_many([
+            {"user_id": user_id, "available_from": start, "available_to": end} for user_id, (start, end) in WINDOWS.items()
+        ])
+        span = await availability_span(repository.availability)
+        assert span == (to_timestamp(datetime(2025, 1, 1)), to_timestamp(datetime(2025, 12, 31)))
+
+        early, late = (datetime(2025, 1, 6), datetime(2025, 1, 10)), (datetime(2025, 11, 2), datetime(2025, 11, 30))
+        assert covering_index(*map(to_timestamp, early), span) == COVERING_FROM_INDEX
+        assert covering_index(*map(to_timestamp, late), span) == COVERING_TO_INDEX
+        assert await free_users(repository, *early) == {"early", "long"}
+        assert await free_users(repository, *late) == {"long", "late"}
+        assert await free_users(repository, datetime(2025, 1, 10), datetime(2025, 12, 20)) == set()
+
+    run_async(run())
+
+def test_no_stored_windows_means_nobody_is_free(repository):
+    async def run():
+        assert await free_users(repository, datetime(2025, 1, 1), datetime(2025, 1, 2)) == set()
+
+    run_async(run())
@@ -0,0 +1,47 @@
+# backend/tests/test_task_allocation.py
+"""Who counts as a candidate for a task."""
+from datetime import datetime
+from bson import ObjectId
+from app.services.task_allocation import assign_task, score_task_candidates
+from tests.support import run_async
+
+async def seed_pair(repository, required_skill: str) -> dict:
+    """
+    A skilled employee with no availability and an unskilled one free for the
+    whole task: without the skill filter the stub scorer ranks the unskilled one first.
+    """
+    skilled, free = ObjectId(), ObjectId()
+    await repository.users.insert_many([
+        {"_id": skilled, "clerk_id": "skilled", "role": "employee"},
+        {"_id": free, "clerk_id": "free", "role": "employee"},
+    ])
+    await repository.skills.insert_one({"user_id": str(skilled), "skill_name": "Python", "proficiency_level": 1})
+    await repository.availability.insert_one({"user_id": str(free), "available_from": datetime(2025, 1, 1), "available_to": datetime(2025, 3, 1)})
+    result = await repository.tasks.insert_one({
+        "supervisor_id": "supervisor-0",
+        "description": "Task",
+        "required_skills": [required_skill],
+        "start_date": datetime(2025, 1, 2),
+        "due_date": datetime(2025, 1, 9),
+        "assigned_to": None,
+        "status": "pending",
+    })
+    return {"skilled": str(skilled), "free": str(free), "task": await repository.tasks.find_one({"_id": result.inserted_id})}
+
+def test_employees_without_a_required_skill_are_not_candidates(repository):
+    async def run():
+        org = await seed_pair(repository, "Python")
+        scored = await score_task_candidates(org["task"])
+        assert scored["employee_ids"] == [org["skilled"]]
+        assert await assign_task(str(org["task"]["_id"])) == org["skilled"]
+
+    run_async(run())
+
+def test_everyone_is_a_candidate_when_nobody_has_a_required_skill(repository):
+    async def run():
+        org = await seed_pair(repository, "Rust")
+        scored = await score_task_candidates(org["task"])
+        assert set(scored["employee_ids"]) == {org["skilled"], org["free"]}
+        assert await assign_task(str(org["task"]["_id"])) == org["free"]
+
+    run_async(run())
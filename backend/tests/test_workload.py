@@ -0,0 +1,110 @@
+# backend/tests/test_workload.py
+"""
+Concurrent assignment against the in-memory database: claims of one task,
+employees at capacity, and task updates racing each other.
+"""
+import asyncio
+from collections import Counter
+from bson import ObjectId
+from app.routes.task import update_task
+from app.services.batch_allocation import assign_pending_tasks
+from app.services.assignment_jobs import SUCCEEDED, WAITING, AssignmentQueue
+from app.services.task_allocation import assign_task
+from app.services.workload import CLAIMED, EMPLOYEE_CAPACITY, EMPLOYEE_FULL, NoFreeCapacity, claim_task, claim_tasks, rebuild_load_counters
+from tests.support import open_tasks_per_employee, run_async, seed, wait_for_job
+
+def test_concurrent_claims_of_one_task_pick_one_assignee(repository):
+    async def run():
+        org = await seed(repository, employees=5, tasks=1)
+        assignees = await asyncio.gather(*(assign_task(org["tasks"][0]) for _ in range(10)))
+        assert len(set(assignees)) == 1
+        assert await open_tasks_per_employee(repository) == {assignees[0]: 1}
+        assert await rebuild_load_counters(repository) == {}
+
+    run_async(run())
+
+def test_concurrent_assignment_never_exceeds_capacity(repository):
+    async def run():
+        org = await seed(repository, employees=2, tasks=2 * EMPLOYEE_CAPACITY + 3)
+        results = await asyncio.gather(*(assign_task(task_id) for task_id in org["tasks"]), return_exceptions=True)
+        assigned = [result for result in results if isinstance(result, str)]
+        assert len(assigned) == 2 * EMPLOYEE_CAPACITY
+        assert all(isinstance(result, NoFreeCapacity) for result in results if not isinstance(result, str))
+        assert set((await open_tasks_per_employee(repository)).values()) == {EMPLOYEE_CAPACITY}
+        assert await rebuild_load_counters(repository) == {}
+
+    run_async(run())
+
+def test_claims_for_one_free_slot_admit_one_task(repository):
+    async def run():
+        org = await seed(repository, employees=1, tasks=6)
+        employee_id = org["employees"][0]
+        outcomes = await asyncio.gather(*(claim_task(ObjectId(task_id), employee_id, capacity=1) for task_id in org["tasks"]))
+        assert Counter(outcomes) == {CLAIMED: 1, EMPLOYEE_FULL: 5}
+        assert await rebuild_load_counters(repository) == {}
+
+    run_async(run())
+
+def test_batch_claims_skip_full_employees_and_taken_tasks(repository):
+    async def run():
+        org = await seed(repository, employees=2, tasks=4)
+        (a, b), tasks = org["employees"], [ObjectId(task_id) for task_id in org["tasks"]]
+        await claim_task(tasks[0], b, capacity=2)
+        # tasks[0] is taken, tasks[1] is wanted twice, and b's last slot goes to the losing claim on tasks[1]
+        pairs = [(tasks[0], a), (tasks[1], a), (tasks[1], b), (tasks[2], b), (tasks[3], a)]
+        claimed = await claim_tasks(pairs, capacity=2)
+        assert claimed == [1]
+        assert await open_tasks_per_employee(repository) == {a: 1, b: 1}
+        assert await rebuild_load_counters(repository) == {}
+
+    run_async(run())
+
+def test_batch_and_single_assignment_share_capacity(repository):
+    async def run():
+        org = await seed(repository, employees=3, tasks=40)
+        singles = [assign_task(task_id) for task_id in org["tasks"][:5]]
+        results = await asyncio.gather(assign_pending_tasks(), assign_pending_tasks(), *singles, return_exceptions=True)
+        batched = [pair["task_id"] for result in results[:2] for pair in result["assigned"]]
+        assert len(batched) == len(set(batched))
+        assert set((await open_tasks_per_employee(repository)).values()) == {EMPLOYEE_CAPACITY}
+        assert await rebuild_load_counters(repository) == {}
+
+    run_async(run())
+
+def test_concurrent_reassignments_keep_counters_exact(repository):
+    async def run():
+        org = await seed(repository, employees=4, tasks=1)
+        task_id = org["tasks"][0]
+        await assign_task(task_id)
+        updates = [{"assigned_to": employee_id} for employee_id in org["employees"]] * 3 + [{"status": "completed"}]
+        await asyncio.gather(*(update_task(task_id, update, repository) for update in updates))
+        assert await rebuild_load_counters(repository) == {}
+
+    run_async(run())
+
+def test_job_waits_for_capacity_and_runs_when_a_slot_frees(repository, monkeypatch):
+    queue = AssignmentQueue(workers=2, waiting_retry=3600)
+    # The task routes wake this queue's waiting jobs
+    monkeypatch.setattr("app.routes.task.assignment_queue", queue)
+
+    async def run():
+        org = await seed(repository, employees=1, tasks=EMPLOYEE_CAPACITY + 1)
+        *first, last = org["tasks"]
+        for task_id in first:
+            await assign_task(task_id)
+
+        await queue.start()
+        try:
+            await queue.enqueue(last)
+            job = await wait_for_job(queue, last, WAITING)
+            assert job["attempts"] == 1
+
+            # Completing a task gives its slot back, and the route wakes the waiting job
+            await update_task(first[0], {"status": "completed"}, repository)
+            job = await wait_for_job(queue, last, SUCCEEDED)
+            assert job["assigned_to"] == org["employees"][0]
+            assert await rebuild_load_counters(repository) == {}
+        finally:
+            await queue.stop()
+
+    run_async(run())